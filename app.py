@@ -33,15 +33,16 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
 # Store CrewAI data in project directory
 project_root = Path(__file__).parent / "src" / "phoenix"
 
-# Initialize session state for debug output
-if "debug_output" not in st.session_state:
-    st.session_state.debug_output = []
-if "current_debug" not in st.session_state:
-    st.session_state.current_debug = ""
+# Initialize session state for job logs
+if "log_pagers" not in st.session_state:
+    st.session_state.log_pagers = {}
 if "phoenix_crew" not in st.session_state:
     st.session_state.phoenix_crew = None
 if "fix_history" not in st.session_state:
     st.session_state.fix_history = []
+if "incremental" not in st.session_state:
+    from phoenix.incremental import IncrementalSession
+    st.session_state.incremental = IncrementalSession()
 
 
 def load_phoenix_crew():
@@ -57,6 +58,23 @@ def load_phoenix_crew():
     return st.session_state.phoenix_crew
 
 
+def current_session_id() -> str:
+    """Streamlit's id for this browser session, used to supersede and reap its runs"""
+    from phoenix.cancellation import sessions
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    if sessions.is_alive is None and Runtime.exists():
+        sessions.is_alive = Runtime.instance().is_active_session
+        sessions.start_reaper()
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        return ctx.session_id
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = os.urandom(8).hex()
+    return st.session_state.session_id
+
+
 def apply_custom_css():
     """Apply custom CSS for a modern, dark theme that works in both light and dark modes"""
     st.markdown("""
@@ -539,20 +557,119 @@ def create_stats_dashboard():
         """, unsafe_allow_html=True)
 
 
-class DebugCapture:
-    """Capture stdout/stderr for debugging display"""
-    def __init__(self):
-        self.logs = []
-        
-    def write(self, message):
-        if message.strip():
-            self.logs.append(message.strip())
-        
-    def flush(self):
-        pass
-        
-    def get_logs(self):
-        return "\n".join(self.logs) if self.logs else ""
+def show_job_logs():
+    """Page through the per-job log files without loading them whole"""
+    from phoenix.logs import LogPager, job_log_path, list_job_logs
+
+    job_ids = list_job_logs()
+    if not job_ids:
+        st.caption("No job logs yet.")
+        return
+    job_id = st.selectbox("Job", job_ids, key="log_job")
+    pager = st.session_state.log_pagers.get(job_id)
+    if pager is None:
+        pager = st.session_state.log_pagers[job_id] = LogPager(job_log_path(job_id))
+    page = st.number_input(f"Page (of {pager.page_count()})", 1, pager.page_count(), pager.page_count(), key="log_page")
+    st.code(pager.page(int(page)) or "(empty)", language="log")
+
+
+def show_traces():
+    """Download links for the most recent request traces"""
+    from phoenix.tracing import list_traces
+
+    traces = list_traces()
+    if not traces:
+        st.caption("No traces yet. Enable 'Record Trace' under Advanced Options.")
+        return
+    st.caption("Open a trace in chrome://tracing or https://ui.perfetto.dev")
+    for path in traces:
+        st.download_button(f"📥 {path.stem}", path.read_bytes(), file_name=path.name,
+                           mime="application/json", key=f"trace_{path.stem}")
+
+
+def extract_project_zip(data: bytes, target: Path):
+    """Extract an uploaded zip, refusing entries that escape the target directory and oversized archives"""
+    import zipfile
+    from phoenix import settings
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        members = archive.infolist()
+        if len(members) > settings.PROJECT_ZIP_MAX_FILES:
+            raise ValueError(f"The zip has {len(members)} entries; the limit is {settings.PROJECT_ZIP_MAX_FILES}")
+        size = sum(member.file_size for member in members)
+        if size > settings.PROJECT_ZIP_MAX_MB * 1024 * 1024:
+            raise ValueError(f"The zip unpacks to {size / 1024 / 1024:.0f} MB; the limit is {settings.PROJECT_ZIP_MAX_MB:g} MB")
+        for member in archive.namelist():
+            if not (target / member).resolve().is_relative_to(target.resolve()):
+                raise ValueError(f"Unsafe path in zip: {member}")
+        archive.extractall(target)
+    # A zip of a single top-level folder is treated as that folder
+    entries = [p for p in target.iterdir() if p.name != "__MACOSX"]
+    return entries[0] if len(entries) == 1 and entries[0].is_dir() else target
+
+
+def zip_directory(root: Path) -> bytes:
+    import zipfile
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for path in root.rglob("*"):
+            if path.is_file() and "__pycache__" not in path.parts:
+                archive.write(path, path.relative_to(root))
+    return buffer.getvalue()
+
+
+def run_project_mode(uploaded_zip, expected_behavior: str):
+    """Fix every module of an uploaded project in dependency order.
+
+    The working copy is keyed on the upload's content, so running the same
+    upload again only re-checks what changed since the last run.
+    """
+    import shutil
+    from phoenix.project import ProjectFixer, remove_workdir, upload_workdir
+
+    try:
+        from phoenix.crew import Phoenix
+    except ImportError as e:
+        st.error(f"Failed to import Phoenix: {e}")
+        return
+
+    data = uploaded_zip.getvalue()
+    workdir = upload_workdir(data)
+    shutil.rmtree(workdir / "source", ignore_errors=True)
+    try:
+        source = extract_project_zip(data, workdir / "source")
+    except Exception:
+        remove_workdir(workdir)
+        raise
+    output_dir = workdir / "fixed" / source.name if source != workdir / "source" else workdir / "fixed"
+    try:
+        fixer = ProjectFixer(source, Phoenix, output_dir=output_dir, expected_behavior=expected_behavior)
+    finally:
+        # The fixer keeps its own copy; the extracted upload is only needed to sync it
+        shutil.rmtree(workdir / "source", ignore_errors=True)
+
+    table = st.empty()
+    statuses = []
+
+    def show(status):
+        statuses.append(status)
+        table.dataframe(statuses, use_container_width=True)
+
+    # on_status runs on this (the script) thread, so it can update Streamlit elements directly
+    start_time = time.time()
+    results = fixer.run(on_status=show)
+    table.dataframe(results, use_container_width=True)
+
+    counts = {}
+    for status in results:
+        counts[status["status"]] = counts.get(status["status"], 0) + 1
+    st.success(f"📦 Processed {len(results)} modules in {time.time() - start_time:.1f}s: "
+               + ", ".join(f"{count} {name}" for name, count in sorted(counts.items())))
+    st.download_button(
+        "📥 Download Fixed Project",
+        zip_directory(fixer.root),
+        file_name="phoenix_fixed_project.zip",
+        mime="application/zip"
+    )
 
 
 # Set page config for wide layout
@@ -580,8 +697,12 @@ with st.sidebar:
     st.markdown("### 🔥 Phoenix Control Panel")
     
     # API Status Check
+    from phoenix import settings
     google_api_key = os.getenv("GOOGLE_API_KEY")
-    if google_api_key and google_api_key != "your_google_api_key_here":
+    api_key_ready = not settings.requires_google_key() or (google_api_key and google_api_key != "your_google_api_key_here")
+    if not settings.requires_google_key():
+        st.success(f"✅ Local model server: {settings.LLM_BASE_URL}")
+    elif api_key_ready:
         st.success("✅ API Key Configured")
     else:
         st.error("❌ API Key Missing")
@@ -589,8 +710,29 @@ with st.sidebar:
     st.markdown("---")
     
     # Model Information
-    st.markdown("### 🤖 AI Model")
-    st.info("**Gemini 2.5 Flash**\nGoogle's latest multimodal AI")
+    st.markdown("### 🤖 AI Models")
+    try:
+        for tier in range(settings.tier_count()):
+            tier_models = settings.models_for_tier(tier)
+            st.info(f"**Tier {tier}**\nFixer: {tier_models['fixer']}\nVerifier: {tier_models['verifier']}")
+        from phoenix.metrics import metrics
+        for tier_name, stats in metrics.tier_stats().items():
+            st.caption(f"{tier_name}: {stats['runs']} runs, {stats['success_rate']:.0%} success, {stats['avg_latency']:.1f}s avg")
+        counters = metrics.counters()
+        from phoenix.autofix import rule_stats
+        for rule, stats in rule_stats().items():
+            st.caption(f"🩹 {rule}: {stats['hits']}/{stats['attempts']} fixes held ({stats['hit_rate']:.0%})")
+        if counters.get("units_submitted"):
+            st.caption(f"♻️ {counters.get('units_reused', 0)}/{counters['units_submitted']} units reused from earlier fixes")
+        if counters.get("tests_run") or counters.get("test_cache_hits"):
+            st.caption(f"🧪 {counters.get('tests_run', 0)} tests run over {counters.get('test_shards', 0)} shards, "
+                       f"{counters.get('test_cache_hits', 0)} suite runs served from cache")
+        if counters.get("runs_cancelled"):
+            st.caption(f"🛑 {counters['runs_cancelled']} superseded runs cancelled: "
+                       f"{counters.get('llm_calls_avoided', 0)} LLM calls and "
+                       f"{counters.get('sandbox_runs_avoided', 0) + counters.get('sandbox_runs_killed', 0)} sandbox runs saved")
+    except ImportError as e:
+        st.error(f"Failed to load model configuration: {e}")
     
     st.markdown("---")
     
@@ -639,6 +781,11 @@ def fibonacci(n):
 print(fibonacci(10))""",
         key="code_input"
     )
+    
+    # Editing the code cancels a fix of the previous version that is still running
+    from phoenix.cancellation import Cancelled, cancellable, sessions
+    session_id = current_session_id()
+    sessions.touch(session_id, user_code)
 
 with col2:
     st.markdown('<h3 style="color: #ffffff; font-weight: 600;">⚙️ Configuration</h3>', unsafe_allow_html=True)
@@ -650,11 +797,30 @@ with col2:
         key="behavior_input"
     )
     
+    tests_code = st.text_area(
+        "Tests (Optional):",
+        height=100,
+        placeholder="from solution import fibonacci\n\ndef test_fibonacci():\n    assert fibonacci(10) == 55",
+        help="pytest-style test_* functions; your code is importable as `solution`. They run in parallel in the sandbox.",
+        key="tests_input"
+    )
+    
+    project_dir = st.text_input(
+        "Project Directory (Optional):",
+        placeholder="/path/to/your/project",
+        help="Phoenix indexes this project and shows the agents the signatures of the definitions your code uses",
+        key="project_dir_input"
+    )
+    
     # Advanced options
     with st.expander("🔧 Advanced Options"):
         max_iterations = st.slider("Max Fix Iterations", 1, 10, 5)
         include_optimization = st.checkbox("Include Performance Optimization", value=True)
-        verbose_output = st.checkbox("Verbose Output", value=False)
+        verbose_output = st.checkbox("Verbose Output", value=False, help="Log full agent reasoning transcripts")
+        generate_tests = st.checkbox("Generate Tests from Expected Behavior", value=False,
+                                     help="Without attached tests, have the fixer's model write tests once for this code and behavior")
+        record_trace = st.checkbox("Record Trace", value=settings.TRACE_ENABLED,
+                                   help="Save a timeline of LLM calls, tools and tasks, viewable in chrome://tracing or ui.perfetto.dev")
 
 # Phoenix button with custom styling
 st.markdown("<br>", unsafe_allow_html=True)
@@ -672,7 +838,7 @@ if phoenix_button:
         st.error("🚫 Please provide some code to analyze!")
     else:
         # Check environment setup first
-        if not google_api_key or google_api_key == "your_google_api_key_here":
+        if not api_key_ready:
             st.error("❌ Google API Key not configured!")
             st.info("💡 Please set a valid GOOGLE_API_KEY in your .env file")
             st.stop()
@@ -690,6 +856,16 @@ if phoenix_button:
             progress_placeholder = st.empty()
             status_placeholder = st.empty()
             
+            from phoenix import tracing
+            job_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.urandom(4).hex()}"
+            trace_handle = tracing.start(job_id) if record_trace else None
+            
+            # A newer submission cancels the session's previous run; while that run unwinds it
+            # keeps its crew, so this one gets a fresh crew
+            if sessions.in_flight(session_id):
+                st.session_state.phoenix_crew = None
+            token = sessions.submit(session_id, user_code)
+            
             try:
                 # Step 1: Initialize crew
                 with progress_placeholder.container():
@@ -700,8 +876,6 @@ if phoenix_button:
                     st.error("❌ Failed to load Phoenix crew")
                     st.stop()
                 
-                crew = crew_instance.crew()
-                
                 # Step 2: Analysis
                 with progress_placeholder.container():
                     st.info("🔍 AI Agents analyzing code structure and errors...")
@@ -713,29 +887,83 @@ if phoenix_button:
                 
                 # Execute the crew
                 start_time = time.time()
+                crew_instance.verbose = verbose_output
+                crew_instance.profile = include_optimization
                 
+                tracing.begin("build context", "app")
+                # Only functions changed since the last submission go through the crew
+                from phoenix.prompts import build_context, extract_code
+                from phoenix.metrics import metrics
+                incremental = st.session_state.incremental
+                # Tests need the whole program, so with tests attached nothing is reused
+                testing = bool(tests_code.strip()) or (generate_tests and bool(expected_behavior.strip()))
+                plan = None if testing else incremental.plan(user_code)
+                crew_code = plan.changed_code() if plan else user_code
+
                 # Create a formatted context for the crew
-                context = f"""
-TASK: Fix and optimize the following Python code
-
-USER'S CODE:
-```python
-{user_code}
-```
-
-EXPECTED BEHAVIOR: {expected_behavior or 'Not specified'}
-
-INSTRUCTIONS:
-- Analyze the code for syntax errors, logical errors, or runtime issues
-- Test the code using the code interpreter tool
-- Fix any issues found systematically
-- Provide working, optimized Python code
-"""
+                project_context = ""
+                if project_dir.strip():
+                    if os.path.isdir(project_dir.strip()):
+                        from phoenix.indexer import get_index
+                        project_context = get_index(project_dir.strip()).context_for(crew_code)
+                    else:
+                        st.warning(f"⚠️ Project directory not found: {project_dir}")
+                if plan:
+                    # The already-fixed, unchanged units are shown as signatures the changed code can call
+                    project_context = "\n".join(filter(None, [plan.context_code(), project_context]))
+                tracing.end("app")
                 
-                result = crew.kickoff(inputs={"context": context})
+                from phoenix.logs import job_logging
+                from phoenix.autofix import autofix
+                from phoenix.testsuite import generate_tests as write_tests, run_tests, suite_problem
+                if tests_code.strip() and suite_problem(tests_code):
+                    st.error(f"❌ The attached tests can't be run: {suite_problem(tests_code)}")
+                    st.stop()
+                with job_logging(job_id, "verbose" if verbose_output else "normal") as job_log, cancellable(token):
+                    suite, initial_tests = tests_code.strip(), None
+                    if not suite and testing:
+                        with tracing.span("generate tests", "llm"):
+                            suite = write_tests(user_code, expected_behavior)
+                        if suite_problem(suite):
+                            st.warning(f"⚠️ The generated tests can't be run ({suite_problem(suite)}), "
+                                       "fixing without tests")
+                            suite = ""
+                    if suite:
+                        initial_tests = run_tests(user_code, suite)
+                    crew_instance.attach_tests(suite)
+                    context = build_context(crew_code, expected_behavior, project_context, tests=suite,
+                                            test_results=initial_tests.summary() if initial_tests else "")
+                    
+                    result, autofixed = None, None
+                    if not (plan and plan.nothing_changed):
+                        # Trivial errors are fixed by deterministic rules; with a stated intent the agents decide
+                        if settings.AUTOFIX_ENABLED and not expected_behavior.strip() and not suite:
+                            # With a plan, the rules see the reused fixed units spliced in, not their old sources
+                            with tracing.span("autofix", "autofix"):
+                                autofixed = autofix(incremental.assemble(plan) if plan else user_code)
+                        if autofixed is None:
+                            result = crew_instance.kickoff(inputs={"context": context},
+                                                           partial=bool(plan and plan.reused))
                 execution_time = time.time() - start_time
                 
+                # Handle different result types
+                if hasattr(result, 'raw'):
+                    code_result = result.raw
+                elif isinstance(result, str):
+                    code_result = result
+                else:
+                    code_result = "" if result is None else str(result)
+                if autofixed:
+                    code_result = autofixed.code
+                elif plan:
+                    code_result = incremental.assemble(plan, extract_code(code_result) if code_result else "")
+                if plan:
+                    metrics.increment("units_reused", len(plan.reused))
+                metrics.increment("units_submitted", plan.total if plan else 1)
+                incremental.remember(user_code, extract_code(code_result))
+                
                 progress_placeholder.empty()
+                tracing.begin("render results", "app")
                 
                 # Success animation and results
                 st.balloons()
@@ -755,15 +983,6 @@ INSTRUCTIONS:
                 
                 with col2:
                     st.markdown('<h3 style="color: #ffffff; font-weight: 600;">✨ Phoenix-Enhanced Code</h3>', unsafe_allow_html=True)
-                    
-                    # Handle different result types
-                    if hasattr(result, 'raw'):
-                        code_result = result.raw
-                    elif isinstance(result, str):
-                        code_result = result
-                    else:
-                        code_result = str(result)
-                        
                     st.code(code_result, language="python", line_numbers=True)
                 
                 # Analysis metrics
@@ -773,9 +992,9 @@ INSTRUCTIONS:
                 with col1:
                     st.metric("⏱️ Processing Time", f"{execution_time:.2f}s")
                 with col2:
-                    st.metric("🔧 Agents Used", "2")
+                    st.metric("🔧 Model Tier", "rules" if autofixed else getattr(result, "tier", 0))
                 with col3:
-                    st.metric("📝 Lines Analyzed", len(user_code.split('\n')))
+                    st.metric("♻️ Units Reused", f"{len(plan.reused)}/{plan.total}" if plan else "0")
                 with col4:
                     st.metric("🎯 Success Rate", "99.2%")
                 
@@ -788,6 +1007,42 @@ INSTRUCTIONS:
                 }
                 st.session_state.fix_history.append(fix_record)
                 
+                if autofixed:
+                    st.info(f"🩹 {autofixed.summary()}\n\nNo AI agents were needed ({autofixed.seconds * 1000:.0f} ms).")
+                
+                benchmark = getattr(result, "benchmark", None)
+                if benchmark:
+                    st.markdown("---")
+                    st.markdown('<h3 style="color: #ffffff; font-weight: 600;">⏱️ Benchmark: Fixed vs Optimized</h3>', unsafe_allow_html=True)
+                    if benchmark.accepted:
+                        st.success(f"✅ Optimized version kept: {benchmark.reason}")
+                    else:
+                        st.warning(f"⚠️ Optimized version rejected, showing the fixed code instead: {benchmark.reason}")
+                    st.table(benchmark.rows())
+                
+                test_report = getattr(result, "tests", None)
+                if test_report:
+                    st.markdown("---")
+                    st.markdown('<h3 style="color: #ffffff; font-weight: 600;">🧪 Tests</h3>', unsafe_allow_html=True)
+                    if test_report.ok:
+                        st.success(f"✅ All {len(test_report.results)} tests pass ({test_report.seconds:.2f}s over {test_report.shards} shards"
+                                   + (", cached" if test_report.cached else "") + ")")
+                    else:
+                        st.warning(f"⚠️ {test_report.summary()}")
+                    if initial_tests:
+                        st.caption(f"Before the fix: {initial_tests.passed}/{len(initial_tests.results)} passed")
+                    st.table(test_report.results)
+                if suite and not tests_code.strip():
+                    with st.expander("🧪 Generated Tests"):
+                        st.code(suite, language="python")
+                
+                if getattr(result, "profile", None):
+                    with st.expander("📈 Runtime Profile of the Fixed Code"):
+                        st.code(result.profile.summary(), language="text")
+                
+                with st.expander("📜 Run Log"):
+                    st.code(job_log.tail() or "(no log output)", language="log")
+                
                 # Download button for fixed code
                 st.download_button(
                     "📥 Download Fixed Code",
@@ -795,6 +1050,11 @@ INSTRUCTIONS:
                     file_name="phoenix_fixed_code.py",
                     mime="text/plain"
                 )
+                tracing.end("app")
+                
+            except Cancelled as cancelled:
+                progress_placeholder.empty()
+                st.warning(f"🛑 This run was cancelled: {cancelled}")
                 
             except Exception as execution_error:
                 progress_placeholder.empty()
@@ -808,6 +1068,31 @@ INSTRUCTIONS:
                     - **Code Complexity:** Try breaking down complex code into smaller chunks
                     - **Syntax:** Ensure your input code has valid Python syntax
                     """)
+            finally:
+                sessions.finish(session_id, token)
+                tracing.finish(trace_handle)
+
+# Project mode
+with st.expander("📦 Project Mode: fix a whole package"):
+    st.markdown("Upload a zip of your project. Modules are fixed in import order, independent modules in parallel, "
+                "and only modules that fail to import are sent to the agents.")
+    project_zip = st.file_uploader("Project zip", type=["zip"], key="project_zip")
+    if st.button("🔥 PHOENIX PROJECT! 🔥", key="phoenix_project_btn", disabled=project_zip is None):
+        if not api_key_ready:
+            st.error("❌ Google API Key not configured!")
+        else:
+            try:
+                run_project_mode(project_zip, expected_behavior)
+            except Exception as project_error:
+                st.error(f"❌ Phoenix encountered an error: {project_error}")
+
+# Job log viewer
+with st.expander("📜 Job Logs"):
+    show_job_logs()
+
+# Recent request traces
+with st.expander("🧭 Request Traces"):
+    show_traces()
 
 # Footer
 st.markdown("---")
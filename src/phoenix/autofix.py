@@ -0,0 +1,392 @@
+import ast
+import builtins
+import difflib
+import io
+import logging
+import re
+import sys
+import time
+import tokenize
+
+from phoenix import settings
+from phoenix.metrics import metrics
+from phoenix.sandbox import run_python
+
+logger = logging.getLogger(__name__)
+
+ERROR_LINE_PATTERN = re.compile(r"^(\w+(?:\.\w+)*):\s*(.*)$")
+TRACEBACK_LINE_PATTERN = re.compile(r'^\s*File "[^"]*main\.py", line (\d+)')
+PY2_PRINT_PATTERN = re.compile(r"^(\s*)print\s+(?![\s(=.,)\]}])(.+)$")
+COMPOUND_PATTERN = re.compile(r"^\s*(?:if|elif|else|while|for|def|class|with|try|except|finally|async\s+def|async\s+for|async\s+with)\b")
+OPENERS = {")": "(", "]": "[", "}": "{"}
+CLOSERS = {opener: closer for closer, opener in OPENERS.items()}
+
+# Frequently used names that live in a stdlib module other than their own name
+STDLIB_NAMES = {
+    "defaultdict": "collections", "Counter": "collections", "namedtuple": "collections", "deque": "collections",
+    "OrderedDict": "collections", "sqrt": "math", "pi": "math", "floor": "math", "ceil": "math",
+    "randint": "random", "choice": "random", "shuffle": "random", "sleep": "time", "reduce": "functools",
+    "partial": "functools", "lru_cache": "functools", "wraps": "functools", "Path": "pathlib",
+    "dataclass": "dataclasses", "field": "dataclasses", "List": "typing", "Dict": "typing", "Tuple": "typing",
+    "Set": "typing", "Optional": "typing", "Any": "typing", "Union": "typing", "Callable": "typing",
+    "Iterable": "typing", "chain": "itertools", "permutations": "itertools", "combinations": "itertools",
+    "product": "itertools", "pprint": "pprint", "deepcopy": "copy", "heappush": "heapq", "heappop": "heapq",
+}
+
+
+class CodeError:
+    """The first error a program hits: exception type, message and line"""
+
+    def __init__(self, kind: str, message: str, line: int = None, offset: int = None):
+        self.kind = kind
+        self.message = message
+        self.line = line
+        self.offset = offset
+
+    def __str__(self):
+        return f"{self.kind}: {self.message}" + (f" (line {self.line})" if self.line else "")
+
+
+def find_error(code: str, timeout: float = None, cwd=None, extra_path: list = None):
+    """Compile in-process (cheap, nothing runs), then run in the sandbox; None when the code runs cleanly.
+
+    `cwd` and `extra_path` are passed to the sandbox, e.g. so a file can
+    import its sibling modules.
+    """
+    try:
+        compile(code, "main.py", "exec")
+    except SyntaxError as e:
+        return CodeError(type(e).__name__, e.msg, e.lineno, e.offset)
+    result = run_python(code, timeout=timeout, cwd=cwd, extra_path=extra_path)
+    if result.ok:
+        return None
+    if result.timed_out:
+        return CodeError("TimeoutError", "execution exceeded the time limit")
+    match = ERROR_LINE_PATTERN.match(result.error())
+    lines = [int(m.group(1)) for m in map(TRACEBACK_LINE_PATTERN.match, result.stderr.splitlines()) if m]
+    if match is None:
+        return CodeError("Error", result.error(), lines[-1] if lines else None)
+    return CodeError(match.group(1), match.group(2), lines[-1] if lines else None)
+
+
+def _lines(code: str) -> list:
+    return code.splitlines()
+
+
+def _join(lines: list) -> str:
+    return "\n".join(lines) + "\n"
+
+
+def _indent(line: str) -> str:
+    return line[:len(line) - len(line.lstrip())]
+
+
+def _split_comment(text: str):
+    """Split a line into (code, comment) using the tokenizer so '#' inside strings is kept"""
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(text).readline):
+            if token.type == tokenize.COMMENT:
+                return text[:token.start[1]].rstrip(), text[token.start[1]:]
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        pass
+    return text.rstrip(), ""
+
+
+def _defined_names(code: str) -> set:
+    names = set(dir(builtins))
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return names
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            names.add(node.id)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            names.update((alias.asname or alias.name).split(".")[0] for alias in node.names)
+    return names
+
+
+def _insert_import(code: str, statement: str) -> str:
+    """Add an import after the module docstring and any __future__ imports"""
+    lines = _lines(code)
+    position = 0
+    try:
+        tree = ast.parse(code)
+        for node in tree.body:
+            is_docstring = isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str)
+            if (is_docstring and position == 0) or (isinstance(node, ast.ImportFrom) and node.module == "__future__"):
+                position = node.end_lineno
+            else:
+                break
+    except SyntaxError:
+        pass
+    while position < len(lines) and lines[position].startswith("#!"):
+        position += 1
+    return _join(lines[:position] + [statement] + lines[position:])
+
+
+def _rename(code: str, old: str, new: str) -> str:
+    """Replace every NAME token `old` (not attributes, strings or comments) with `new`"""
+    tokens = list(tokenize.generate_tokens(io.StringIO(code).readline))
+    lines = code.splitlines(keepends=True)
+    for index in range(len(tokens) - 1, -1, -1):
+        token = tokens[index]
+        if token.type != tokenize.NAME or token.string != old:
+            continue
+        if index > 0 and tokens[index - 1].string == ".":
+            continue
+        row, col = token.start
+        line = lines[row - 1]
+        lines[row - 1] = line[:col] + new + line[col + len(old):]
+    return "".join(lines)
+
+
+# --- Rules -----------------------------------------------------------------
+# Each rule takes (code, error) and returns the rewritten code, or None when it doesn't apply.
+
+NAME_ERROR_PATTERN = re.compile(r"name '(\w+)' is not defined(?:\. Did you mean: '(\w+)'\?)?")
+
+
+def _import_for(name: str):
+    """The stdlib import that would define `name`, or None"""
+    if name in sys.stdlib_module_names and not name.startswith("_"):
+        return f"import {name}"
+    if name in STDLIB_NAMES:
+        return f"from {STDLIB_NAMES[name]} import {name}"
+    return None
+
+
+def fix_misspelled_name(code: str, error: CodeError):
+    match = NAME_ERROR_PATTERN.match(error.message)
+    if error.kind != "NameError" or not match:
+        return None
+    name, suggestion = match.groups()
+    if not suggestion:
+        candidates = _defined_names(code) - {name}
+        matches = difflib.get_close_matches(name, candidates, n=2, cutoff=0.8)
+        if len(matches) != 1:
+            return None  # nothing close enough, or ambiguous
+        suggestion = matches[0]
+    if _import_for(name) and suggestion not in _defined_names(code) - set(dir(builtins)):
+        return None  # e.g. `math` -> `max`: only a builtin is close, so the missing import is likelier
+    return _rename(code, name, suggestion)
+
+
+def fix_missing_import(code: str, error: CodeError):
+    """Import a stdlib name; runs after fix_misspelled_name, so only when no local name is close"""
+    match = NAME_ERROR_PATTERN.match(error.message)
+    if error.kind != "NameError" or not match:
+        return None
+    statement = _import_for(match.group(1))
+    return _insert_import(code, statement) if statement else None
+
+
+def fix_print_statement(code: str, error: CodeError):
+    if error.kind != "SyntaxError" or "Missing parentheses in call to 'print'" not in error.message:
+        return None
+    lines = _lines(code)
+    changed = False
+    for number, line in enumerate(lines):
+        match = PY2_PRINT_PATTERN.match(line)
+        if not match:
+            continue
+        body, comment = _split_comment(match.group(2))
+        if body.startswith(">>"):
+            return None  # print >>f, x needs a file= rewrite; leave it to the crew
+        trailing_comma = body.endswith(",")
+        arguments = body.rstrip(",").rstrip()
+        end = ', end=" "' if trailing_comma else ""
+        lines[number] = f"{match.group(1)}print({arguments}{end})" + (f"  {comment}" if comment else "")
+        changed = True
+    return _join(lines) if changed else None
+
+
+def fix_indentation(code: str, error: CodeError):
+    if error.kind == "TabError":
+        return _join([_indent(line).expandtabs(4) + line.lstrip() for line in _lines(code)])
+    if error.kind != "IndentationError" or not error.line:
+        return None
+    lines = _lines(code)
+    index = error.line - 1
+    if index >= len(lines):
+        return None
+    previous = next((lines[i] for i in range(index - 1, -1, -1) if lines[i].strip()), "")
+    body = lines[index].lstrip()
+
+    if error.message.startswith("expected an indented block"):
+        # Only the first line is moved into the block: where a longer body ends is a guess left to the crew
+        header = next((i for i in range(index - 1, -1, -1) if lines[i].strip()), None)
+        if header is None:
+            return None
+        lines[index] = _indent(lines[header]) + "    " + body
+        return _join(lines)
+
+    if error.message == "unexpected indent":
+        indent = _indent(previous) + ("    " if previous.rstrip().endswith(":") else "")
+        lines[index] = indent + body
+        return _join(lines)
+
+    if error.message.startswith("unindent does not match"):
+        # Snap to the nearest indentation level already in use, preferring the deeper one on a tie
+        current = len(_indent(lines[index]))
+        levels = {len(_indent(line)) for line in lines[:index] if line.strip()} or {0}
+        target = min(levels, key=lambda level: (abs(level - current), -level))
+        lines[index] = " " * target + body
+        return _join(lines)
+    return None
+
+
+NEVER_CLOSED_PATTERN = re.compile(r"'([(\[{])' was never closed")
+UNMATCHED_PATTERN = re.compile(r"unmatched '([)\]}])'")
+MISMATCH_PATTERN = re.compile(r"closing parenthesis '([)\]}])' does not match opening parenthesis '([(\[{])'")
+
+
+def fix_brackets(code: str, error: CodeError):
+    if error.kind != "SyntaxError" or not error.line:
+        return None
+    lines = _lines(code)
+    index = error.line - 1
+
+    match = NEVER_CLOSED_PATTERN.search(error.message)
+    if match:
+        # Close it at the end of the statement's line (before a compound statement's colon)
+        body, comment = _split_comment(lines[index])
+        closer = CLOSERS[match.group(1)]
+        if body.endswith(":") and COMPOUND_PATTERN.match(body):
+            body = body[:-1] + closer + ":"
+        else:
+            body += closer
+        lines[index] = body + (f"  {comment}" if comment else "")
+        return _join(lines)
+
+    match = UNMATCHED_PATTERN.search(error.message)
+    if match and error.offset:
+        line = lines[index]
+        col = error.offset - 1
+        if col < len(line) and line[col] == match.group(1):
+            lines[index] = line[:col] + line[col + 1:]
+            return _join(lines)
+
+    match = MISMATCH_PATTERN.search(error.message)
+    if match and error.offset:
+        line = lines[index]
+        col = error.offset - 1
+        if col < len(line) and line[col] == match.group(1):
+            lines[index] = line[:col] + CLOSERS[match.group(2)] + line[col + 1:]
+            return _join(lines)
+    return None
+
+
+def fix_missing_colon(code: str, error: CodeError):
+    if error.kind != "SyntaxError" or error.message != "expected ':'" or not error.line:
+        return None
+    lines = _lines(code)
+    body, comment = _split_comment(lines[error.line - 1])
+    if not COMPOUND_PATTERN.match(body) or body.endswith(":"):
+        return None
+    lines[error.line - 1] = body + ":" + (f"  {comment}" if comment else "")
+    return _join(lines)
+
+
+class Rule:
+    def __init__(self, name: str, kinds: tuple, fix):
+        self.name = name
+        self.kinds = kinds
+        self.fix = fix
+
+
+# A NameError is first read as a typo of a name the program defines, then as a missing import
+RULES = [
+    Rule("misspelled_name", ("NameError",), fix_misspelled_name),
+    Rule("missing_import", ("NameError",), fix_missing_import),
+    Rule("print_statement", ("SyntaxError",), fix_print_statement),
+    Rule("indentation", ("IndentationError", "TabError"), fix_indentation),
+    Rule("brackets", ("SyntaxError",), fix_brackets),
+    Rule("missing_colon", ("SyntaxError",), fix_missing_colon),
+]
+
+
+class AutofixResult:
+    """Code repaired by the rule engine, with the rules applied in order"""
+
+    def __init__(self, code: str, applied: list, errors: list, seconds: float):
+        self.code = code
+        self.applied = applied
+        self.errors = errors
+        self.seconds = seconds
+
+    def summary(self) -> str:
+        steps = [f"- {error} -> fixed by rule '{rule}'" for rule, error in zip(self.applied, self.errors)]
+        return "Fixed without the AI agents by deterministic rules:\n" + "\n".join(steps)
+
+
+def autofix(code: str, max_rounds: int = None, rules: list = None, error: CodeError = None, cwd=None,
+            extra_path: list = None):
+    """Repair `code` with the rule engine; returns an AutofixResult, or None to fall back to the crew.
+
+    Each round finds the first error, applies the first rule that rewrites
+    the code for it, and tries again, until the code runs cleanly in the
+    sandbox. Code that already runs cleanly, or hits an error no rule can
+    fix, returns None. A caller that already ran the code passes its
+    `error` to skip the first run; `cwd` and `extra_path` go to find_error.
+    """
+    started = time.perf_counter()
+    max_rounds = max_rounds or settings.AUTOFIX_MAX_ROUNDS
+    rules = rules or RULES
+    applied, errors = [], []
+    for round_number in range(max_rounds):
+        if round_number or error is None:
+            error = find_error(code, timeout=settings.AUTOFIX_TIMEOUT, cwd=cwd, extra_path=extra_path)
+        if error is None:
+            break
+        for rule in rules:
+            if error.kind not in rule.kinds:
+                continue
+            try:
+                rewritten = rule.fix(code, error)
+            except (SyntaxError, tokenize.TokenError, ValueError, IndexError):
+                rewritten = None
+            if rewritten is not None and rewritten != code:
+                metrics.increment(f"autofix.{rule.name}.attempts")
+                code = rewritten
+                applied.append(rule.name)
+                errors.append(str(error))
+                break
+        else:
+            _record_misses(applied)
+            metrics.increment("autofix.fallbacks")
+            logger.info("🩹 No autofix rule for %s, falling back to the crew", error)
+            return None
+    else:
+        _record_misses(applied)
+        return None
+
+    if not applied:
+        return None
+    metrics.increment("autofix.resolved")
+    for name in applied:
+        metrics.increment(f"autofix.{name}.hits")
+    result = AutofixResult(code, applied, errors, time.perf_counter() - started)
+    logger.info("🩹 Autofixed in %.0f ms with rules: %s", result.seconds * 1000, ", ".join(applied))
+    return result
+
+
+def _record_misses(applied: list):
+    for name in applied:
+        metrics.increment(f"autofix.{name}.misses")
+
+
+def rule_stats() -> dict:
+    """Per rule: times applied and how often the code then ran cleanly"""
+    counters = metrics.counters()
+    stats = {}
+    for rule in RULES:
+        attempts = counters.get(f"autofix.{rule.name}.attempts", 0)
+        hits = counters.get(f"autofix.{rule.name}.hits", 0)
+        if attempts:
+            stats[rule.name] = {"attempts": attempts, "hits": hits, "hit_rate": hits / attempts}
+    return stats
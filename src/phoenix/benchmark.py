@@ -0,0 +1,155 @@
+import json
+import statistics
+
+from phoenix import settings
+from phoenix.sandbox import run_python
+
+REPORT_MARKER = "__PHOENIX_BENCHMARK__"
+
+# Runs the whole program `warmup` times untimed, then up to `repeat` timed runs (each in fresh
+# globals, output captured) until the time budget is spent, and prints a JSON summary after a marker.
+_HARNESS = r'''
+import contextlib, io, json, sys, time
+
+SOURCE = {source!r}
+WARMUP = {warmup!r}
+REPEAT = {repeat!r}
+BUDGET = {budget!r}
+
+
+def run_once(code):
+    output = io.StringIO()
+    error = None
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        try:
+            exec(code, {{"__name__": "__main__"}})
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                error = f"SystemExit: {{e.code}}"
+        except BaseException as e:
+            error = type(e).__name__
+    return time.perf_counter() - started, output.getvalue(), error
+
+
+report = {{"timings": [], "outputs": [], "error": None}}
+try:
+    code = compile(SOURCE, "user_code.py", "exec")
+except SyntaxError as e:
+    report["error"] = f"SyntaxError: {{e.msg}}"
+else:
+    deadline = time.perf_counter() + BUDGET
+    for _ in range(WARMUP):
+        run_once(code)
+    for _ in range(REPEAT):
+        seconds, output, error = run_once(code)
+        report["timings"].append(seconds)
+        report["outputs"].append(output)
+        report["error"] = error
+        if time.perf_counter() > deadline:
+            break
+print({marker!r} + json.dumps(report))
+'''
+
+
+class BenchmarkRun:
+    """Timings and output of one program under the benchmark harness"""
+
+    def __init__(self, data: dict = None, failure: str = ""):
+        data = data or {}
+        self.timings = data.get("timings", [])
+        self.outputs = data.get("outputs", [])
+        self.error = data.get("error") or failure
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.timings) if self.timings else float("inf")
+
+    @property
+    def best(self) -> float:
+        return min(self.timings) if self.timings else float("inf")
+
+    @property
+    def output(self) -> str:
+        return self.outputs[0] if self.outputs else ""
+
+    @property
+    def deterministic(self) -> bool:
+        return len(set(self.outputs)) <= 1
+
+
+def benchmark_code(code: str, warmup: int = None, repeat: int = None, budget: float = None) -> BenchmarkRun:
+    """Time `code` in the sandbox with warmup runs and repetitions"""
+    budget = budget or settings.BENCHMARK_BUDGET
+    harness = _HARNESS.format(
+        source=code,
+        warmup=settings.BENCHMARK_WARMUP if warmup is None else warmup,
+        repeat=repeat or settings.BENCHMARK_REPEAT,
+        budget=float(budget),
+        marker=REPORT_MARKER,
+    )
+    result = run_python(harness, timeout=budget + settings.SANDBOX_TIMEOUT)
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith(REPORT_MARKER):
+            return BenchmarkRun(json.loads(line[len(REPORT_MARKER):]))
+    return BenchmarkRun(failure=result.error() or "the benchmark produced no report")
+
+
+class BenchmarkComparison:
+    """Side-by-side benchmark of the fixer's code (baseline) and the verifier's (candidate).
+
+    The candidate is accepted when it behaves the same as the baseline (same
+    output and same exception, if any) and is not slower than the baseline
+    by more than ``tolerance`` (relative) and ``min_difference`` seconds.
+    Without a baseline that runs cleanly there is nothing to compare against,
+    so such a candidate is not accepted.
+    """
+
+    def __init__(self, baseline: BenchmarkRun, candidate: BenchmarkRun, tolerance: float = None,
+                 min_difference: float = 0.0005):
+        self.baseline = baseline
+        self.candidate = candidate
+        self.tolerance = settings.BENCHMARK_TOLERANCE if tolerance is None else tolerance
+        self.min_difference = min_difference
+        self.accepted, self.reason = self._decide()
+
+    @property
+    def speedup(self) -> float:
+        if not self.baseline.timings or not self.candidate.timings or not self.candidate.median:
+            return 0.0
+        return self.baseline.median / self.candidate.median
+
+    def _decide(self):
+        if not self.candidate.timings:
+            return False, f"the optimized code could not be run ({self.candidate.error})"
+        if not self.baseline.timings or self.baseline.error:
+            return False, f"the fixed code fails ({self.baseline.error}), so there is no baseline to compare against"
+        if self.candidate.error != self.baseline.error:
+            return False, f"behavior changed: the optimized code raised {self.candidate.error}"
+        if not self.baseline.deterministic:
+            equivalence = "output varies between runs, so it was not compared"
+        elif self.candidate.output != self.baseline.output:
+            return False, "behavior changed: the optimized code prints different output"
+        else:
+            equivalence = "same output"
+        slowdown = self.candidate.median - self.baseline.median
+        if slowdown > max(self.baseline.median * self.tolerance, self.min_difference):
+            return False, f"performance regression: {self.speedup:.2f}x the speed of the fixed code"
+        return True, f"{equivalence}, {self.speedup:.2f}x the speed of the fixed code"
+
+    def rows(self) -> list:
+        """Timing table, one row per version"""
+        return [
+            {
+                "version": name,
+                "runs": len(run.timings),
+                "median_ms": round(run.median * 1000, 3) if run.timings else None,
+                "best_ms": round(run.best * 1000, 3) if run.timings else None,
+                "error": run.error or "",
+            }
+            for name, run in (("fixed", self.baseline), ("optimized", self.candidate))
+        ]
+
+
+def compare_code(baseline_code: str, candidate_code: str) -> BenchmarkComparison:
+    return BenchmarkComparison(benchmark_code(baseline_code), benchmark_code(candidate_code))
@@ -0,0 +1,160 @@
+import contextlib
+import contextvars
+import logging
+import threading
+import time
+
+from phoenix import settings
+from phoenix.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_current_token = contextvars.ContextVar("phoenix_cancellation", default=None)
+
+
+class Cancelled(BaseException):
+    """Raised at a cancellation checkpoint once the run's token is cancelled.
+
+    Like asyncio.CancelledError this derives from BaseException, so crewAI's
+    retry loops (which catch Exception) don't swallow it and retry the work.
+    """
+
+
+class CancellationToken:
+    """Cooperative cancellation flag shared by everything a run does"""
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.reason = ""
+        self.started = time.time()
+        self._event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled"):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+            logger.info("🛑 Cancelling %s: %s", self.label or "run", reason)
+
+
+def current_token():
+    return _current_token.get()
+
+
+def sleep(seconds: float):
+    """Sleep, waking up early (and raising Cancelled) when the current run is cancelled"""
+    token = _current_token.get()
+    if token is None:
+        time.sleep(seconds)
+    else:
+        token._event.wait(seconds)
+    check()
+
+
+def check(counter: str = None):
+    """Raise Cancelled if the current run was cancelled; `counter` names the work being skipped"""
+    token = _current_token.get()
+    if token is not None and token.cancelled:
+        if counter:
+            metrics.increment(counter)
+        raise Cancelled(token.reason)
+
+
+@contextlib.contextmanager
+def cancellable(token: CancellationToken):
+    """Run the block under `token`; records the run as cancelled if it was"""
+    reset = _current_token.set(token)
+    try:
+        yield token
+    except Cancelled:
+        metrics.increment("runs_cancelled")
+        metrics.increment("cancelled_run_seconds", round(time.time() - token.started))
+        raise
+    finally:
+        _current_token.reset(reset)
+
+
+class SessionRegistry:
+    """In-flight runs per UI session: newer submissions supersede older ones.
+
+    A run is cancelled when its session submits again, when the submitted
+    code is edited while it runs, when the session goes away (per the
+    optional `is_alive` check) or when the session has been idle longer
+    than ``idle_seconds``.
+    """
+
+    def __init__(self, idle_seconds: float = None, is_alive=None):
+        self.idle_seconds = idle_seconds or settings.SESSION_IDLE_SECONDS
+        self.is_alive = is_alive
+        self._sessions = {}  # session id -> {"token", "code", "last_seen"}
+        self._lock = threading.Lock()
+        self._reaper = None
+
+    def submit(self, session_id: str, code: str = None) -> CancellationToken:
+        token = CancellationToken(label=f"session {session_id[:8]}")
+        with self._lock:
+            previous = self._sessions.get(session_id)
+            if previous and previous["token"]:
+                previous["token"].cancel("superseded by a newer submission")
+            self._sessions[session_id] = {"token": token, "code": code, "last_seen": time.time()}
+        return token
+
+    def in_flight(self, session_id: str) -> bool:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            return bool(entry and entry["token"])
+
+    def touch(self, session_id: str, code: str = None):
+        """Note session activity; cancels the in-flight run if its code has since been edited"""
+        with self._lock:
+            entry = self._sessions.setdefault(session_id, {"token": None, "code": None, "last_seen": 0})
+            entry["last_seen"] = time.time()
+            token = entry["token"]
+            if token and code is not None and entry["code"] is not None and code != entry["code"]:
+                token.cancel("the code was edited while it was being fixed")
+
+    def finish(self, session_id: str, token: CancellationToken):
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry and entry["token"] is token:
+                entry["token"] = None
+
+    def reap(self) -> int:
+        """Cancel runs of abandoned sessions and forget idle ones; returns how many runs were cancelled"""
+        now = time.time()
+        cancelled = 0
+        with self._lock:
+            for session_id, entry in list(self._sessions.items()):
+                idle = now - entry["last_seen"] > self.idle_seconds
+                gone = self.is_alive is not None and not self.is_alive(session_id)
+                if not (idle or gone):
+                    continue
+                if entry["token"] and not entry["token"].cancelled:
+                    entry["token"].cancel("the session was abandoned")
+                    metrics.increment("runs_reaped")
+                    cancelled += 1
+                del self._sessions[session_id]
+        return cancelled
+
+    def start_reaper(self, interval: float = 30.0):
+        """Reap periodically on a daemon thread (once per registry)"""
+        with self._lock:
+            if self._reaper is not None:
+                return
+
+            def loop():
+                while True:
+                    time.sleep(interval)
+                    try:
+                        self.reap()
+                    except Exception as e:
+                        logger.warning("⚠️ Session reaper failed: %s", e)
+
+            self._reaper = threading.Thread(target=loop, name="phoenix-session-reaper", daemon=True)
+            self._reaper.start()
+
+
+sessions = SessionRegistry()
@@ -0,0 +1,144 @@
+import logging
+import re
+import time
+
+from phoenix import cancellation, settings, tracing
+from phoenix.checkpoints import CheckpointStore
+from phoenix.metrics import metrics
+from phoenix.providers import is_transient_error
+
+logger = logging.getLogger(__name__)
+
+CONFIDENCE_PATTERN = re.compile(r"^\s*CONFIDENCE:\s*([01](?:\.\d+)?)\s*$", re.IGNORECASE | re.MULTILINE)
+
+
+class FixResult:
+    """Outcome of a Phoenix run, including which model tier produced it"""
+
+    def __init__(self, raw: str, tier: int, models: dict, confidence=None, sandbox_failures: int = 0,
+                 tasks_output=None, escalations: int = 0, run_id: str = None, profile=None,
+                 tests=None):
+        self.raw = raw
+        self.tier = tier
+        self.models = models
+        self.confidence = confidence
+        self.sandbox_failures = sandbox_failures
+        self.tasks_output = tasks_output or []
+        self.escalations = escalations
+        self.run_id = run_id
+        self.profile = profile
+        self.tests = tests
+        self.benchmark = None
+
+    def __str__(self):
+        return self.raw
+
+
+def split_confidence(text: str):
+    """Strip the verifier's CONFIDENCE line and return (text, confidence)"""
+    matches = list(CONFIDENCE_PATTERN.finditer(text))
+    if not matches:
+        return text, None
+    confidence = min(float(matches[-1].group(1)), 1.0)
+    return CONFIDENCE_PATTERN.sub("", text).rstrip(), confidence
+
+
+def tier_label(tier: int) -> str:
+    models = settings.models_for_tier(tier)
+    return f"tier {tier} ({models['fixer']} / {models['verifier']})"
+
+
+class ModelCascade:
+    """Runs the crew on the cheapest tier first and escalates on failure.
+
+    A tier fails when its run raises, when the fixer's sandbox reports at least
+    ``escalate_after`` failed executions (not counting its first run of the
+    broken code), when the verifier's reported
+    confidence is below ``min_confidence``, or when the code fails the
+    crew's attached tests. Provider errors (rate limits, timeouts, dropped
+    connections) are not quality failures: they are retried on the same
+    tier with backoff and then raised, since escalating would only repeat
+    the call on a more expensive model.
+    """
+
+    def __init__(self, crew_for_tier, escalate_after: int = None, min_confidence: float = None,
+                 store: CheckpointStore = None):
+        self.crew_for_tier = crew_for_tier
+        self.store = store or CheckpointStore()
+        self.escalate_after = settings.ESCALATE_AFTER_FAILURES if escalate_after is None else escalate_after
+        self.min_confidence = settings.MIN_VERIFIER_CONFIDENCE if min_confidence is None else min_confidence
+
+    def kickoff(self, inputs: dict, start_tier: int = 0) -> FixResult:
+        run_id = self.store.new_run(inputs)
+        try:
+            return self._kickoff(run_id, inputs, start_tier)
+        finally:
+            # Failed and cancelled runs leave checkpoints too
+            self.store.gc()
+
+    def _kickoff(self, run_id: str, inputs: dict, start_tier: int) -> FixResult:
+        last_tier = settings.tier_count() - 1
+
+        def save_task(task_output):
+            self.store.save_task(run_id, task_output.name, task_output.description, task_output.raw,
+                                 str(task_output.agent))
+
+        for tier in range(start_tier, last_tier + 1):
+            cancellation.check()
+            phoenix = self.crew_for_tier(tier)
+            started = time.time()
+            try:
+                output = self._kickoff_tier(phoenix, tier, inputs, save_task)
+            except cancellation.Cancelled as e:
+                self.store.finish(run_id, tier=tier, error=f"cancelled: {e}", transcript=phoenix.sandbox_transcript())
+                raise
+            except Exception as e:
+                metrics.record_tier(tier_label(tier), False, time.time() - started)
+                if tier == last_tier or is_transient_error(e):
+                    self.store.finish(run_id, tier=tier, error=str(e), transcript=phoenix.sandbox_transcript())
+                    raise
+                logger.warning("⚠️ Tier %s raised %s, escalating", tier, e)
+                continue
+
+            raw, confidence = split_confidence(getattr(output, "raw", str(output)))
+            failures = phoenix.sandbox_failures()
+            tests = phoenix.run_attached_tests(raw)
+            if tests is not None and tests.error:
+                # A suite that can't run says nothing about the answer; escalating wouldn't change that
+                logger.warning("⚠️ Attached tests can't be used (%s), judging tier %s without them", tests.error, tier)
+            success = (failures < self.escalate_after and (confidence is None or confidence >= self.min_confidence)
+                       and (tests is None or bool(tests.error) or tests.ok))
+            metrics.record_tier(tier_label(tier), success, time.time() - started)
+
+            if success or tier == last_tier:
+                self.store.finish(run_id, tier=tier, models=settings.models_for_tier(tier), raw=raw,
+                                  confidence=confidence, transcript=phoenix.sandbox_transcript())
+                return FixResult(
+                    raw=raw,
+                    tier=tier,
+                    models=settings.models_for_tier(tier),
+                    confidence=confidence,
+                    sandbox_failures=failures,
+                    tasks_output=getattr(output, "tasks_output", []),
+                    escalations=tier - start_tier,
+                    run_id=run_id,
+                    profile=phoenix.last_profile,
+                    tests=tests,
+                )
+            logger.warning("⚠️ Tier %s failed (%s sandbox failures, confidence %s, tests %s), escalating", tier,
+                           failures, confidence, "n/a" if tests is None else f"{tests.passed}/{len(tests.results)}")
+
+    def _kickoff_tier(self, phoenix, tier: int, inputs: dict, task_callback):
+        """Run one tier, retrying it after provider errors with exponential backoff"""
+        for attempt in range(settings.TRANSIENT_RETRIES + 1):
+            phoenix.reset_sandbox()
+            try:
+                with tracing.span(f"cascade {tier_label(tier)}", "cascade"):
+                    return phoenix.crew(task_callback=task_callback).kickoff(inputs=inputs)
+            except Exception as e:
+                if not is_transient_error(e) or attempt == settings.TRANSIENT_RETRIES:
+                    raise
+                delay = settings.TRANSIENT_BACKOFF * 2 ** attempt
+                metrics.increment("transient_retries")
+                logger.warning("⏳ Tier %s hit a provider error (%s), retrying in %.0fs", tier, e, delay)
+                cancellation.sleep(delay)
@@ -0,0 +1,85 @@
+import gzip
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from phoenix import settings
+
+
+class CheckpointStore:
+    """Compact on-disk store of run inputs, task outputs and sandbox transcripts.
+
+    Each run is a single gzip-compressed JSON document named after its run ID,
+    rewritten atomically whenever a task finishes so a crash never loses the
+    outputs of tasks that already completed.
+    """
+
+    def __init__(self, root=None):
+        self.root = Path(root or settings.CHECKPOINT_DIR)
+        self._lock = threading.Lock()
+
+    def _path(self, run_id: str) -> Path:
+        return self.root / f"{run_id}.json.gz"
+
+    def new_run(self, inputs: dict) -> str:
+        run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self._write(run_id, {"run_id": run_id, "created_at": time.time(), "inputs": inputs, "tasks": {}, "transcript": []})
+        return run_id
+
+    def save_task(self, run_id: str, name: str, description: str, raw: str, agent: str = ""):
+        self.update(run_id, lambda record: record["tasks"].__setitem__(
+            name, {"description": description, "raw": raw, "agent": agent}
+        ))
+
+    def finish(self, run_id: str, **fields):
+        self.update(run_id, lambda record: record.update(fields, finished_at=time.time()))
+
+    def update(self, run_id: str, mutate):
+        with self._lock:
+            record = self.load(run_id)
+            mutate(record)
+            self._write(run_id, record)
+
+    def load(self, run_id: str) -> dict:
+        path = self._path(run_id)
+        if not path.exists():
+            raise FileNotFoundError(f"No checkpoint found for run '{run_id}' in {self.root}")
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write(self, run_id: str, record: dict):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path(run_id).with_suffix(".tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(record, f, separators=(",", ":"))
+        os.replace(tmp_path, self._path(run_id))
+
+    def runs(self) -> list:
+        """Run IDs, newest first"""
+        if not self.root.exists():
+            return []
+        paths = sorted(self.root.glob("*.json.gz"), key=lambda p: p.stat().st_mtime, reverse=True)
+        return [p.name[:-len(".json.gz")] for p in paths]
+
+    def latest(self):
+        runs = self.runs()
+        return runs[0] if runs else None
+
+    def gc(self, max_age_days: float = None, keep: int = None) -> int:
+        """Delete checkpoints older than max_age_days beyond the newest `keep` runs"""
+        max_age_days = settings.CHECKPOINT_MAX_AGE_DAYS if max_age_days is None else max_age_days
+        keep = settings.CHECKPOINT_KEEP if keep is None else keep
+        cutoff = time.time() - max_age_days * 86400
+        removed = 0
+        for run_id in self.runs()[keep:]:
+            path = self._path(run_id)
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
@@ -1,8 +1,21 @@
-import os
+import logging
 import warnings
-from crewai import Agent, Crew, Process, Task, LLM
-from crewai_tools import CodeInterpreterTool
-from dotenv import load_dotenv
+from crewai import Agent, Crew, Process, Task
+from crewai.tasks.task_output import TaskOutput
+
+from phoenix import cancellation, settings, tracing
+from phoenix.benchmark import BenchmarkComparison, benchmark_code
+from phoenix.cascade import FixResult, ModelCascade, split_confidence
+from phoenix.checkpoints import CheckpointStore
+from phoenix.crew_spec import TASK_ORDER, load_spec
+from phoenix.logs import log_step, log_task_output
+from phoenix.metrics import metrics
+from phoenix.profiler import profile_code
+from phoenix.prompts import extract_code
+from phoenix.providers import get_llm, install_connection_pool
+from phoenix.testsuite import run_tests
+from phoenix.tools.sandbox_tool import SandboxTool
+from phoenix.tools.test_tool import TestSuiteTool
 
 warnings.filterwarnings("ignore", category=DeprecationWarning, module="pydantic")
 warnings.filterwarnings("ignore", category=DeprecationWarning, module="alembic")
@@ -13,121 +26,275 @@ warnings.filterwarnings("ignore", message=".*Using extra keyword arguments.*")
 warnings.filterwarnings("ignore", message=".*Extra keys.*")
 warnings.filterwarnings("ignore")  # Catch all remaining warnings
 
-load_dotenv()
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+GOOGLE_API_KEY = settings.GOOGLE_API_KEY
 
-if not GOOGLE_API_KEY or GOOGLE_API_KEY == "your_google_api_key_here":
+if settings.requires_google_key() and (not GOOGLE_API_KEY or GOOGLE_API_KEY == "your_google_api_key_here"):
     raise ValueError("Please set a valid GOOGLE_API_KEY environment variable in your .env file.")
 
-try:
-    # Use CrewAI's LLM with Google API
-    llm = LLM(
-        model="gemini/gemini-1.5-flash",
-        api_key=GOOGLE_API_KEY
-    )
-except Exception as e:
-    raise ValueError(f"Failed to initialize LLM: {e}")
+install_connection_pool()
+
+logger = logging.getLogger(__name__)
+
+# Which model of the tier each agent runs on
+AGENT_MODELS = {"fixer_agent": "fixer", "verifier_agent": "verifier"}
+
 
 class Phoenix():
-    """Phoenix crew for code fixing and verification"""
+    """Phoenix crew for code fixing and verification.
 
-    def __init__(self):
-        print("Initializing Phoenix crew...")
-        self._fixer_agent = None
-        self._verifier_agent = None
-        self._fix_task = None
-        self._verify_task = None
+    With ``verbose`` the agents' steps and task outputs go to the Phoenix log
+    at debug level (and so to the current job's log); crewAI's own verbose
+    console output stays off.
+    """
 
-    def fixer_agent(self) -> Agent:
-        if self._fixer_agent is None:
-            self._fixer_agent = Agent(
-                role="Code Fixer",
-                goal="Analyze the provided code, identify errors, and propose corrected versions iteratively until it runs without errors.",
-                backstory="You are an expert debugger specializing in Python code. You use logical reasoning to fix syntax, logic, and runtime errors. You always test your fixes. You provide responses in plain text format without markdown or special formatting.",
-                llm=llm,
-                tools=[CodeInterpreterTool()],
-                verbose=True,
-                allow_delegation=False
+    def __init__(self, tier: int = 0, verbose: bool = False, profile: bool = None, benchmark: bool = None):
+        logger.info("Initializing Phoenix crew (model tier %s)...", tier)
+        self.tier = tier
+        self.verbose = verbose
+        self.profile = settings.PROFILE_ENABLED if profile is None else profile
+        self.last_profile = None
+        self.benchmark = settings.BENCHMARK_ENABLED if benchmark is None else benchmark
+        self.models = settings.models_for_tier(tier)
+        self.tests = ""
+        self._sandbox = SandboxTool()
+        self._test_tool = TestSuiteTool()
+        self._tools = {"sandbox": self._sandbox, "tests": self._test_tool}
+        self._escalated = {tier: self}
+        self._spec = None
+        self._refresh_spec()
+
+    def _refresh_spec(self):
+        """Pick up edits to the YAML config; agents and tasks are rebuilt from the new spec"""
+        spec = load_spec()
+        if spec is not self._spec:
+            self._spec = spec
+            self._agents = {}
+            self._tasks = {}
+
+    def _agent(self, name: str) -> Agent:
+        if name not in self._agents:
+            config = self._spec.agents[name]
+            self._agents[name] = Agent(
+                role=config["role"],
+                goal=config["goal"],
+                backstory=config["backstory"],
+                llm=get_llm(self.models[AGENT_MODELS.get(name, "fixer")]),
+                tools=[self._tools[tool] for tool in config["tools"]],
+                step_callback=self._on_step,
+                verbose=False,
+                allow_delegation=config["allow_delegation"]
             )
-        return self._fixer_agent
+        return self._agents[name]
 
-    def verifier_agent(self) -> Agent:
-        if self._verifier_agent is None:
-            self._verifier_agent = Agent(
-                role="Code Verifier",
-                goal="Review the fixed code for best practices, efficiency, and confirm it meets the user's intent.",
-                backstory="You are a senior code reviewer ensuring the code is clean, efficient, and functional. You provide responses in plain text format without markdown or special formatting.",
-                llm=llm,
-                verbose=True,
-                allow_delegation=False
+    def _on_step(self, step):
+        if self.verbose:
+            log_step(step)
+        tracing.step()
+        cancellation.check()
+
+    def _task(self, name: str) -> Task:
+        if name not in self._tasks:
+            config = self._spec.tasks[name]
+            self._tasks[name] = Task(
+                name=name,
+                description=config["description"],
+                expected_output=config["expected_output"],
+                agent=self._agent(config["agent"])
             )
-        return self._verifier_agent
+        return self._tasks[name]
+
+    def fixer_agent(self) -> Agent:
+        return self._agent("fixer_agent")
+
+    def verifier_agent(self) -> Agent:
+        return self._agent("verifier_agent")
 
     def fix_task(self) -> Task:
-        if self._fix_task is None:
-            self._fix_task = Task(
-                description="""You are a Python code fixing expert. 
-
-                {context}
-                
-                Your approach:
-                1. First, run the provided code using the code interpreter tool to identify any errors
-                2. If errors are found, analyze them carefully and create a fixed version
-                3. Test the fixed code to ensure it runs without errors
-                4. If needed, iterate until the code works properly
-                5. Provide the final working code with explanations of what was fixed
-                
-                Always use the code interpreter tool to test your solutions.
-                
-                IMPORTANT: Provide your response in PLAIN TEXT format only. Do NOT use markdown formatting, code blocks with backticks, or any special formatting. Just provide the clean Python code and explanations in simple text.""",
-                expected_output="Working Python code in plain text format without markdown, along with explanations of any fixes made.",
-                agent=self.fixer_agent()
-            )
-        return self._fix_task
+        return self._task("fix_task")
 
     def verify_task(self) -> Task:
-        if self._verify_task is None:
-            self._verify_task = Task(
-                description="""Review and improve the fixed code from the previous task. Ensure it meets high quality standards.
-                
-                Your tasks:
-                1. Review the fixed code from the previous agent
-                2. Check if the code follows Python best practices
-                3. Verify the code is readable and well-structured
-                4. Suggest any optimizations for performance or clarity
-                5. Provide a final, polished version of the code with explanations
-                
-                Only make necessary improvements - don't over-engineer simple solutions.
-                Always provide the final working Python code.
-                
-                IMPORTANT: Provide your response in PLAIN TEXT format only. Do NOT use markdown formatting, code blocks with backticks, or any special formatting. Just provide the clean Python code and explanations in simple text.""",
-                expected_output="Final, verified Python code in plain text format without markdown, with a summary of quality improvements made.",
-                agent=self.verifier_agent()
-            )
-        return self._verify_task
+        return self._task("verify_task")
 
-    def crew(self) -> Crew:
+    def _attach_profile(self, fixed_output: str):
+        """Profile the fixer's code and hand the report to the verifier"""
+        with tracing.span("profile fixed code", "sandbox"):
+            self.last_profile = profile_code(extract_code(fixed_output))
+        logger.info("📈 Profiled fixed code: %s", self.last_profile.summary().splitlines()[0])
+        # The description is re-interpolated from its template on every kickoff, so this lasts one run
+        self.verify_task().description += f"""
+
+RUNTIME PROFILE OF THE FIXED CODE (measured in a sandbox with cProfile and tracemalloc):
+{self.last_profile.summary()}
+
+Base any performance suggestions on these measured hotspots rather than guesses."""
+
+    def crew(self, task_callback=None, tasks: list = None) -> Crew:
         """Creates the Phoenix crew"""
-        print("Creating Phoenix crew...")
-        try:
-            # Create agents and tasks
-            agents = [self.fixer_agent(), self.verifier_agent()]
-            tasks = [self.fix_task(), self.verify_task()]
+        logger.info("Creating Phoenix crew...")
+        with tracing.span("build crew", "crew_build"):
+            try:
+                # Create agents and tasks
+                if tasks is None:
+                    self._refresh_spec()
+                    tasks = [self._task(name) for name in TASK_ORDER]
+                agents = list({id(task.agent): task.agent for task in tasks}.values())
+                self.last_profile = None
+                profile = self.profile and any(task is self.verify_task() for task in tasks)
+
+                def on_task_done(task_output):
+                    cancellation.check()
+                    if self.verbose:
+                        log_task_output(task_output)
+                    if task_callback:
+                        task_callback(task_output)
+                    if profile and task_output.name == "fix_task":
+                        self._attach_profile(task_output.raw)
+
+                # Tasks are reused across runs; crewAI only sets a task's callback when it has none, so set it here
+                for task in tasks:
+                    task.callback = on_task_done
             
-            print(f"Agents created: {len(agents)}")
-            print(f"Tasks created: {len(tasks)}")
+                logger.debug("Agents created: %d", len(agents))
+                logger.debug("Tasks created: %d", len(tasks))
             
-            crew = Crew(
-                agents=agents,
-                tasks=tasks,
-                process=Process.sequential,
-                verbose=True
-            )
-            print("✅ Crew created successfully")
-            return crew
+                crew = Crew(
+                    agents=agents,
+                    tasks=tasks,
+                    process=Process.sequential,
+                    verbose=False
+                )
+                logger.info("✅ Crew created successfully")
+                return crew
             
-        except Exception as e:
-            print(f"❌ Error while creating crew: {e}")
-            import traceback
-            traceback.print_exc()
-            raise
\ No newline at end of file
+            except Exception as e:
+                logger.exception("❌ Error while creating crew: %s", e)
+                raise
+
+    def reset_sandbox(self):
+        self._sandbox.reset()
+
+    def sandbox_failures(self) -> int:
+        return self._sandbox.failures
+
+    def sandbox_transcript(self) -> list:
+        return self._sandbox.transcript
+
+    def attach_tests(self, tests: str):
+        """Tests the fixed code must pass; the agents can run them and a tier fails if they don't pass"""
+        self.tests = tests or ""
+        self._test_tool.attach(self.tests)
+
+    def run_attached_tests(self, output: str):
+        """Test report of the code in `output`, or None when no tests are attached"""
+        if not self.tests.strip():
+            return None
+        with tracing.span("attached tests", "sandbox"):
+            return run_tests(extract_code(output), self.tests)
+
+    def for_tier(self, tier: int) -> "Phoenix":
+        """Return the Phoenix crew bound to another model tier"""
+        if tier not in self._escalated:
+            self._escalated[tier] = Phoenix(tier=tier, verbose=self.verbose)
+        self._escalated[tier].verbose = self.verbose
+        self._escalated[tier].profile = self.profile
+        self._escalated[tier].benchmark = self.benchmark
+        self._escalated[tier].attach_tests(self.tests)
+        return self._escalated[tier]
+
+    def kickoff(self, inputs: dict, partial: bool = False) -> FixResult:
+        """Run the crew, escalating to stronger model tiers only on failure.
+
+        `partial` means the context holds only part of the program (the units
+        changed since the last submission), which can't be benchmarked on its own.
+        """
+        missing = load_spec().missing_inputs(inputs)
+        if missing:
+            raise ValueError(f"Missing crew inputs: {', '.join(missing)}")
+        result = ModelCascade(self.for_tier).kickoff(inputs, start_tier=self.tier)
+        if self.benchmark and not partial:
+            self._benchmark_gate(result)
+        return result
+
+    def _benchmark_gate(self, result: FixResult):
+        """Keep the fixer's answer when the verifier's code behaves differently or runs slower"""
+        fixer_output = next((out for out in result.tasks_output if out.name == "fix_task"), None)
+        if fixer_output is None:
+            return
+        fixed_code, optimized_code = extract_code(split_confidence(fixer_output.raw)[0]), extract_code(result.raw)
+        if fixed_code.strip() == optimized_code.strip():
+            return
+        with tracing.span("benchmark fixed vs optimized", "sandbox"):
+            baseline = benchmark_code(fixed_code)
+            if baseline.error or not baseline.timings:
+                # A failing fixed version is no reference for behavior or speed, so the verifier's answer stands
+                logger.info("⏱️ Benchmark skipped: the fixed code fails (%s)", baseline.error)
+                metrics.increment("benchmark_skipped")
+                return
+            result.benchmark = BenchmarkComparison(baseline, benchmark_code(optimized_code))
+        metrics.increment("benchmark_accepted" if result.benchmark.accepted else "benchmark_rejected")
+        if result.benchmark.accepted:
+            logger.info("⏱️ Optimized code accepted: %s", result.benchmark.reason)
+        else:
+            logger.warning("⏱️ Optimized code rejected, keeping the fixer's code: %s", result.benchmark.reason)
+            result.raw = fixer_output.raw
+            if result.tests is not None:
+                result.tests = self.run_attached_tests(result.raw)
+
+    def replay(self, from_task: str, run_id: str = None, store: CheckpointStore = None) -> FixResult:
+        """Re-run `from_task` and everything after it using checkpointed upstream outputs.
+
+        The replayed answer goes through the same benchmark gate as a kickoff,
+        against the checkpointed fixer output when the fix task is not re-run.
+        """
+        store = store or CheckpointStore()
+        run_id = run_id or store.latest()
+        if run_id is None:
+            raise FileNotFoundError("No checkpoints found to replay")
+        record = store.load(run_id)
+        if record.get("tier", self.tier) != self.tier:
+            # Replay on the tier that produced the checkpoint
+            return self.for_tier(record["tier"]).replay(from_task, run_id, store)
+
+        self._refresh_spec()
+        start = TASK_ORDER.index(from_task)
+        for name in TASK_ORDER[:start]:
+            if name not in record["tasks"]:
+                raise ValueError(f"Run '{run_id}' has no checkpointed output for '{name}'")
+        tasks = [self._task(name) for name in TASK_ORDER]
+        # Tasks are cached and reused by later kickoffs, so the checkpoint state is undone afterwards
+        original = [(task, task.output, task.context) for task in tasks]
+        try:
+            result = self._replay(tasks[:start], tasks[start:], record, run_id, store)
+            if self.benchmark:
+                self._benchmark_gate(result)
+            return result
+        finally:
+            for task, output, context in original:
+                task.output = output
+                task.context = context
+            store.gc()
+
+    def _replay(self, restored: list, downstream: list, record: dict, run_id: str, store: CheckpointStore) -> FixResult:
+        for task in restored:
+            saved = record["tasks"][task.name]
+            task.output = TaskOutput(name=task.name, description=saved["description"], raw=saved["raw"],
+                                     agent=saved["agent"])
+            logger.info("♻️ Reusing checkpointed output of %s from run %s", task.name, run_id)
+        if restored:
+            downstream[0].context = restored
+
+        replay_id = store.new_run(record["inputs"])
+        for task in restored:
+            store.save_task(replay_id, task.name, task.output.description, task.output.raw, task.output.agent)
+
+        def save_task(task_output):
+            store.save_task(replay_id, task_output.name, task_output.description, task_output.raw, str(task_output.agent))
+
+        self.reset_sandbox()
+        output = self.crew(task_callback=save_task, tasks=downstream).kickoff(inputs=record["inputs"])
+        raw, confidence = split_confidence(output.raw)
+        store.finish(replay_id, tier=self.tier, models=self.models, raw=raw, confidence=confidence,
+                     transcript=self.sandbox_transcript(), replayed_from=run_id)
+        return FixResult(raw=raw, tier=self.tier, models=self.models, confidence=confidence,
+                         sandbox_failures=self.sandbox_failures(), run_id=replay_id,
+                         tasks_output=[task.output for task in restored] + list(output.tasks_output))
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import textwrap
+import threading
+
+import yaml
+
+from phoenix import settings
+
+logger = logging.getLogger(__name__)
+
+# Same placeholder syntax crewAI interpolates inputs into at kickoff
+PLACEHOLDER_PATTERN = re.compile(r"\{([A-Za-z_][A-Za-z0-9_\-]*)\}")
+AGENT_FIELDS = ("role", "goal", "backstory")
+TASK_FIELDS = ("description", "expected_output", "agent")
+# Tasks in execution order; replay can resume from any of them
+TASK_ORDER = ["fix_task", "verify_task"]
+# Tools the crew gives agents, by the name agents.yaml lists them under
+TOOLS = ("sandbox", "tests")
+
+
+def _render(text) -> str:
+    """Normalize a YAML block: folded and literal strings end up with stray indentation and newlines"""
+    return textwrap.dedent(str(text or "")).strip()
+
+
+class CrewSpec:
+    """Agents and tasks compiled from config/agents.yaml and config/tasks.yaml.
+
+    Text is normalized once at load time and the inputs each task needs
+    (its ``{placeholders}``) are collected, so building a crew per request
+    only binds inputs to these templates.
+    """
+
+    def __init__(self, agents: dict, tasks: dict, version: tuple = ()):
+        self.agents = agents
+        self.tasks = tasks
+        self.version = version
+        self.inputs = set()
+        for task in tasks.values():
+            self.inputs.update(task["inputs"])
+        # Changes with the compiled prompts, unlike `version` (file mtimes)
+        content = json.dumps({"agents": agents, "tasks": tasks}, sort_keys=True, default=sorted)
+        self.digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+
+    @classmethod
+    def compile(cls, agents_config: dict, tasks_config: dict, version: tuple = ()) -> "CrewSpec":
+        agents = {}
+        for name, config in (agents_config or {}).items():
+            missing = [field for field in AGENT_FIELDS if not config.get(field)]
+            if missing:
+                raise ValueError(f"Agent '{name}' is missing {', '.join(missing)}")
+            unknown = [tool for tool in config.get("tools") or [] if tool not in TOOLS]
+            if unknown:
+                raise ValueError(f"Agent '{name}' uses unknown tools: {', '.join(map(str, unknown))}")
+            agents[name] = {
+                **{field: _render(config[field]) for field in AGENT_FIELDS},
+                "tools": list(config.get("tools") or []),
+                "allow_delegation": bool(config.get("allow_delegation", False)),
+            }
+
+        tasks = {}
+        for name, config in (tasks_config or {}).items():
+            missing = [field for field in TASK_FIELDS if not config.get(field)]
+            if missing:
+                raise ValueError(f"Task '{name}' is missing {', '.join(missing)}")
+            if config["agent"] not in agents:
+                raise ValueError(f"Task '{name}' uses unknown agent '{config['agent']}'")
+            description = _render(config["description"])
+            expected_output = _render(config["expected_output"])
+            tasks[name] = {
+                "description": description,
+                "expected_output": expected_output,
+                "agent": config["agent"],
+                "inputs": set(PLACEHOLDER_PATTERN.findall(description + expected_output)),
+            }
+        missing = [name for name in TASK_ORDER if name not in tasks]
+        if missing:
+            raise ValueError(f"Crew config has no {', '.join(missing)}")
+        return cls(agents, tasks, version)
+
+    def missing_inputs(self, inputs: dict) -> list:
+        return sorted(self.inputs - set(inputs))
+
+
+def _config_paths(config_dir: str) -> tuple:
+    return os.path.join(config_dir, "agents.yaml"), os.path.join(config_dir, "tasks.yaml")
+
+
+def _mtimes(paths: tuple) -> tuple:
+    return tuple(os.stat(path).st_mtime_ns for path in paths)
+
+
+_specs = {}
+_failed_versions = {}  # config dir -> file versions that failed to load, not retried until the files change
+_specs_lock = threading.Lock()
+MISSING = "missing"
+
+
+def load_spec(config_dir: str = None) -> CrewSpec:
+    """Compiled spec for `config_dir`, recompiled only when a YAML file's mtime changes.
+
+    If an edited file fails to load, or is deleted or renamed, the previous
+    spec stays in use so a half-saved prompt tweak doesn't take the service
+    down.
+    """
+    config_dir = config_dir or settings.CREW_CONFIG_DIR
+    paths = _config_paths(config_dir)
+    cached = _specs.get(config_dir)
+    try:
+        version = _mtimes(paths)
+    except OSError as e:
+        if cached is None:
+            raise
+        if _failed_versions.get(config_dir) != MISSING:
+            logger.warning("⚠️ Crew config in %s is missing, keeping the previous version: %s", config_dir, e)
+            _failed_versions[config_dir] = MISSING
+        return cached
+    if _failed_versions.get(config_dir) == MISSING:
+        _failed_versions.pop(config_dir, None)
+    if cached is not None and version in (cached.version, _failed_versions.get(config_dir)):
+        return cached
+
+    with _specs_lock:
+        cached = _specs.get(config_dir)
+        if cached is not None and version in (cached.version, _failed_versions.get(config_dir)):
+            return cached
+        try:
+            configs = []
+            for path in paths:
+                with open(path, encoding="utf-8") as f:
+                    configs.append(yaml.safe_load(f))
+            spec = CrewSpec.compile(*configs, version=version)
+        except (OSError, yaml.YAMLError, ValueError, AttributeError) as e:
+            if cached is None:
+                raise
+            logger.warning("⚠️ Could not reload crew config from %s, keeping the previous version: %s", config_dir, e)
+            _failed_versions[config_dir] = version  # don't retry until the files change again
+            return cached
+        _failed_versions.pop(config_dir, None)
+        if cached is not None:
+            logger.info("🔄 Reloaded crew config from %s", config_dir)
+        _specs[config_dir] = spec
+        return spec
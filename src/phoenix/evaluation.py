@@ -0,0 +1,231 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from phoenix import settings
+from phoenix.crew_spec import load_spec
+from phoenix.prompts import build_context
+from phoenix.providers import call_gate, is_transient_error
+from phoenix.training import example_id, load_dataset, read_jsonl
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RUBRIC = """Score the FIXED OUTPUT from 1 to 10:
+- 10: runs without errors, matches the expected behavior, clean and idiomatic
+- 7: runs and mostly matches the expected behavior, minor issues
+- 4: partially fixed, still has errors or diverges from the expected behavior
+- 1: not fixed or not Python code
+Answer with a short justification followed by a final line: SCORE: <number>"""
+
+SCORE_PATTERN = re.compile(r"SCORE:\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def load_corpus(path) -> list:
+    """Load broken programs from a dataset file or a directory of .py files.
+
+    In a directory, ``name.py`` may have a sibling ``name.txt`` describing
+    its expected behavior.
+    """
+    path = Path(path)
+    if path.is_file():
+        return load_dataset(path)
+    cases = []
+    for program in sorted(path.glob("*.py")):
+        expected = program.with_suffix(".txt")
+        case = {
+            "code": program.read_text(encoding="utf-8"),
+            "expected_behavior": expected.read_text(encoding="utf-8") if expected.exists() else "",
+        }
+        case["id"] = program.stem
+        cases.append(case)
+    return cases
+
+
+class RateLimitedScheduler:
+    """Token bucket shared by all evaluation workers, with global backoff.
+
+    Workers call ``acquire()`` before every LLM request. When any worker hits a
+    provider rate limit, ``backoff()`` pauses all workers, doubling the pause
+    for consecutive hits, so the pool slows down instead of hammering the API.
+    """
+
+    def __init__(self, requests_per_minute: float, max_backoff: float = 120.0):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self._cooldown_until = 0.0
+        self._penalty = 0.0
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot, self._cooldown_until)
+            self._next_slot = slot + self.interval
+        time.sleep(max(0.0, slot - time.monotonic()))
+
+    def backoff(self) -> float:
+        with self._lock:
+            self._penalty = min(self.max_backoff, (self._penalty * 2) or 5.0)
+            self._cooldown_until = max(self._cooldown_until, time.monotonic() + self._penalty)
+            return self._penalty
+
+    def succeeded(self):
+        with self._lock:
+            self._penalty = 0.0
+
+
+class JudgeCache:
+    """Persistent judge scores keyed by (code hash, output hash, rubric hash)"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._scores = {}
+        for record in read_jsonl(path):
+            self._scores[record["key"]] = record
+
+    @staticmethod
+    def key(code: str, output: str, rubric: str) -> str:
+        return f"{_sha(code)}:{_sha(output)}:{_sha(rubric)}"
+
+    def get(self, code: str, output: str, rubric: str):
+        return self._scores.get(self.key(code, output, rubric))
+
+    def put(self, code: str, output: str, rubric: str, score: float, justification: str) -> dict:
+        record = {"key": self.key(code, output, rubric), "score": score, "justification": justification}
+        with self._lock:
+            self._scores[record["key"]] = record
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        return record
+
+
+class Evaluator:
+    """Runs a corpus of broken programs through the crew and scores the fixes.
+
+    Results are appended to ``results.jsonl`` keyed by a case fingerprint
+    (program, expected behavior, rubric, models, crew config and iteration),
+    so a rerun only evaluates cases that are new or changed.
+    """
+
+    def __init__(self, crew_factory, judge_llm, corpus: list, n_iterations: int = 1, workers: int = 4,
+                 requests_per_minute: float = None, rubric: str = DEFAULT_RUBRIC, output_dir=None, max_retries: int = 3):
+        self.crew_factory = crew_factory
+        self.judge_llm = judge_llm
+        self.corpus = corpus
+        self.n_iterations = n_iterations
+        self.workers = max(1, workers)
+        self.rubric = rubric
+        self.max_retries = max_retries
+        self.output_dir = Path(output_dir or settings.EVAL_DIR)
+        self.results_path = self.output_dir / "results.jsonl"
+        self.scheduler = RateLimitedScheduler(requests_per_minute or settings.EVAL_REQUESTS_PER_MINUTE)
+        self.judge_cache = JudgeCache(self.output_dir / "judge_cache.jsonl")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def fingerprint(self, case: dict, iteration: int) -> str:
+        models = json.dumps([settings.models_for_tier(tier) for tier in range(settings.tier_count())])
+        return _sha("\0".join([example_id(case), self.rubric, models, load_spec().digest, str(iteration)]))[:20]
+
+    def _crew(self):
+        if not hasattr(self._local, "crew"):
+            self._local.crew = self.crew_factory()
+        return self._local.crew
+
+    def _gated(self, call, retries: int = 0):
+        """Run `call` with every LLM request it makes (a crew run makes many) waiting for its own slot.
+
+        Transient provider errors pause all workers. Crew runs are not retried
+        here: the model cascade already retries them.
+        """
+        for attempt in range(retries + 1):
+            try:
+                with call_gate(self.scheduler.acquire):
+                    result = call()
+                self.scheduler.succeeded()
+                return result
+            except Exception as e:
+                if not is_transient_error(e):
+                    raise
+                pause = self.scheduler.backoff()
+                if attempt == retries:
+                    raise
+                logger.warning("⏳ Rate limited, backing off %.0fs", pause)
+
+    def judge(self, case: dict, output: str) -> dict:
+        cached = self.judge_cache.get(case["code"], output, self.rubric)
+        if cached:
+            return dict(cached, cached=True)
+        prompt = (f"{self.rubric}\n\nORIGINAL CODE:\n{case['code']}\n\n"
+                  f"EXPECTED BEHAVIOR: {case['expected_behavior'] or 'Not specified'}\n\nFIXED OUTPUT:\n{output}")
+        reply = str(self._gated(lambda: self.judge_llm.call([{"role": "user", "content": prompt}]), self.max_retries))
+        matches = SCORE_PATTERN.findall(reply)
+        score = float(matches[-1]) if matches else 0.0
+        return dict(self.judge_cache.put(case["code"], output, self.rubric, score, reply.strip()), cached=False)
+
+    def _evaluate(self, case: dict, iteration: int, fingerprint: str) -> dict:
+        started = time.time()
+        record = {"fingerprint": fingerprint, "id": case["id"], "iteration": iteration}
+        try:
+            context = build_context(case["code"], case["expected_behavior"])
+            result = self._gated(lambda: self._crew().kickoff(inputs={"context": context}))
+            verdict = self.judge(case, result.raw)
+            record.update(score=verdict["score"], judge_cached=verdict["cached"], tier=result.tier,
+                          output=result.raw, error=None)
+        except Exception as e:
+            record.update(score=None, error=str(e))
+        record["seconds"] = round(time.time() - started, 3)
+        with self._lock:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.results_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        return record
+
+    def run(self) -> dict:
+        previous = {r["fingerprint"]: r for r in read_jsonl(self.results_path) if not r["error"]}
+        jobs = [
+            (case, iteration, self.fingerprint(case, iteration))
+            for case in self.corpus
+            for iteration in range(self.n_iterations)
+        ]
+        pending = [job for job in jobs if job[2] not in previous]
+        print(f"🧪 Evaluating {len(jobs)} cases: {len(jobs) - len(pending)} unchanged, {len(pending)} to run "
+              f"on {self.workers} workers")
+
+        started = time.time()
+        fresh = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self._evaluate, *job) for job in pending]
+            for finished, future in enumerate(as_completed(futures), 1):
+                record = future.result()
+                fresh[record["fingerprint"]] = record
+                score = "error" if record["error"] else f"{record['score']:.1f}"
+                print(f"  [{finished}/{len(pending)}] {record['id']} #{record['iteration']}: {score} ({record['seconds']:.1f}s)")
+        elapsed = time.time() - started
+
+        records = [fresh.get(fp) or previous.get(fp) for _, _, fp in jobs]
+        scores = [r["score"] for r in records if r and r["score"] is not None]
+        report = {
+            "cases": len(jobs),
+            "evaluated": len(pending),
+            "reused": len(jobs) - len(pending),
+            "errors": sum(1 for r in fresh.values() if r["error"]),
+            "mean_score": sum(scores) / len(scores) if scores else None,
+            "elapsed_seconds": round(elapsed, 2),
+            "cases_per_minute": round(len(pending) / elapsed * 60, 2) if pending and elapsed else None,
+        }
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        (self.output_dir / "report.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
+        return report
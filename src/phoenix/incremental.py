@@ -0,0 +1,167 @@
+import re
+
+UNIT_START_PATTERN = re.compile(r"^(?:async\s+def|def|class)\s+([A-Za-z_]\w*)")
+TRIPLE_QUOTE_PATTERN = re.compile(r"\"\"\"|'''")
+
+
+def _open_string(line: str, quote):
+    """The triple quote still open after `line`, given the one open before it"""
+    for match in TRIPLE_QUOTE_PATTERN.finditer(line):
+        if quote is None:
+            quote = match.group()
+        elif match.group() == quote:
+            quote = None
+    return quote
+
+
+def split_units(code: str) -> list:
+    """Split a program into top-level units: [(key, source)] in source order.
+
+    Functions and classes (with their decorators) are keyed by name, a
+    redefinition by name and occurrence (``name#2``); the module-level
+    statements between them are keyed by position (``__module_0``,
+    ``__module_1``...). This works line by line rather than through ``ast``
+    so that code with syntax errors can still be split. Lines inside a
+    triple-quoted string continue the current unit; quotes inside single-line
+    strings or comments are not told apart and can still mis-split.
+    """
+    units = []
+    key, lines = None, []
+    glue_count = 0
+    decorators = []
+    seen = {}
+    quote = None
+
+    def flush():
+        if lines and "".join(lines).strip():
+            units.append((key, "".join(lines)))
+
+    for line in code.splitlines(keepends=True):
+        in_string, quote = quote is not None, _open_string(line, quote)
+        if in_string or not line.strip() or line[0] in " \t#)]}":
+            # string, blank, indented, comment or closing-bracket lines continue the current unit
+            (decorators or lines).append(line)
+            continue
+        if line.startswith("@"):
+            decorators.append(line)
+            continue
+        match = UNIT_START_PATTERN.match(line)
+        if match:
+            flush()
+            name = match.group(1)
+            seen[name] = seen.get(name, 0) + 1
+            key = name if seen[name] == 1 else f"{name}#{seen[name]}"
+            lines = decorators + [line]
+            decorators = []
+        elif key is not None and key.startswith("__module_") and not decorators:
+            lines.append(line)
+        else:
+            flush()
+            key, lines = f"__module_{glue_count}", decorators + [line]
+            glue_count += 1
+            decorators = []
+    lines.extend(decorators)
+    flush()
+    return units
+
+
+def _signature(source: str) -> str:
+    for line in source.splitlines():
+        if UNIT_START_PATTERN.match(line):
+            return line.rstrip()
+    return ""
+
+
+def _glue_count(units: dict) -> int:
+    return sum(1 for key in units if key.startswith("__module_"))
+
+
+def _keep_spacing(original: str, replacement: str) -> str:
+    """Give a replacement unit the trailing blank lines of the unit it replaces"""
+    trailing = original[len(original.rstrip()):]
+    return replacement.rstrip() + (trailing if trailing.strip("\n") == "" and trailing else "\n")
+
+
+class IncrementalPlan:
+    """What a new submission needs from the crew, relative to the previous one"""
+
+    def __init__(self, units: list, reused: dict, changed: list, context_units: list):
+        self.units = units
+        self.reused = reused
+        self.changed = changed
+        self.context_units = context_units
+
+    @property
+    def total(self) -> int:
+        return len(self.units)
+
+    @property
+    def nothing_changed(self) -> bool:
+        return not self.changed
+
+    def changed_code(self) -> str:
+        return "\n".join(source.rstrip("\n") + "\n" for key, source in self.units if key in self.changed)
+
+    def context_code(self) -> str:
+        """Already-fixed units the changed code can rely on, as signatures only"""
+        return "\n".join(sig for sig in (_signature(source) for source in self.context_units) if sig)
+
+
+class IncrementalSession:
+    """Remembers the last submission and its fix to re-fix only what changed.
+
+    Units whose source is identical to the previous submission reuse the
+    previous fixed version. Module-level code is only reused when the
+    previous fix kept the same number of module-level segments, since those
+    are matched by position rather than by name.
+    """
+
+    def __init__(self):
+        self.original = None
+        self.fixed = None
+
+    def remember(self, code: str, fixed_code: str):
+        self.original = dict(split_units(code))
+        self.fixed = dict(split_units(fixed_code))
+        self._glue_reusable = _glue_count(self.original) == _glue_count(self.fixed)
+
+    def plan(self, code: str):
+        """Return an IncrementalPlan, or None when there is no usable previous submission"""
+        if self.original is None:
+            return None
+        units = split_units(code)
+        reused, changed = {}, []
+        for key, source in units:
+            reusable = key in self.fixed and (self._glue_reusable or not key.startswith("__module_"))
+            if reusable and self.original.get(key) == source:
+                reused[key] = self.fixed[key]
+            else:
+                changed.append(key)
+        if not reused:
+            return None
+        return IncrementalPlan(units, reused, changed, list(reused.values()))
+
+    def assemble(self, plan: IncrementalPlan, fixed_changed_code: str = "") -> str:
+        """Splice the crew's fixes for the changed units into the reused ones"""
+        fixed_changed = dict(split_units(fixed_changed_code)) if fixed_changed_code else {}
+        # Module-level segments of the partial answer are renumbered, so map them in order
+        answer_glue = [source for key, source in fixed_changed.items() if key.startswith("__module_")]
+        changed_glue = [key for key in plan.changed if key.startswith("__module_")]
+        glue_map = dict(zip(changed_glue, answer_glue)) if len(answer_glue) == len(changed_glue) else {}
+
+        # Helpers the crew added alongside the changed units go just before the first of them
+        known = {key for key, _ in plan.units}
+        extras = [source for key, source in fixed_changed.items() if key not in known and not key.startswith("__module_")]
+
+        parts = []
+        for key, source in plan.units:
+            if key in plan.reused:
+                parts.append(plan.reused[key])
+                continue
+            if extras and not key.startswith("__module_"):
+                parts.extend(_keep_spacing("\n\n", extra) for extra in extras)
+                extras = []
+            replacement = glue_map.get(key) if key.startswith("__module_") else fixed_changed.get(key)
+            parts.append(_keep_spacing(source, replacement) if replacement else source)
+        parts.extend(extras)
+        return "".join(part if part.endswith("\n") else part + "\n" for part in parts)
@@ -0,0 +1,342 @@
+import ast
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+
+from phoenix import settings
+
+SKIP_DIRS = {".git", ".hg", ".svn", "__pycache__", ".venv", "venv", "env", "node_modules", "build", "dist",
+             ".tox", ".nox", ".mypy_cache", ".pytest_cache", ".ruff_cache", ".phoenix", "site-packages"}
+TOKEN_PATTERN = re.compile(r"[A-Za-z][a-z0-9]*|[0-9]+")
+DOTTED_PATTERN = re.compile(r"\b[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)+")
+IMPORT_PATTERN = re.compile(r"^\s*import\s+([\w.]+)(?:\s+as\s+(\w+))?", re.MULTILINE)
+IMPORT_LINE_PATTERN = re.compile(r"^\s*(?:from|import)\s.*$", re.MULTILINE)
+# Names in a closed (...) group may span lines; otherwise only the rest of the line is read
+FROM_IMPORT_PATTERN = re.compile(
+    r"^[ \t]*from[ \t]+([\w.]+)[ \t]+import[ \t]*(?:\(([\w\s,]*)\)|\(?([\w \t,]+))", re.MULTILINE
+)
+
+# BM25 parameters
+K1 = 1.5
+B = 0.75
+
+
+def tokenize(text: str) -> list:
+    """Split identifiers and prose into lowercase terms (snake_case and CamelCase aware)"""
+    return [token.lower() for word in re.split(r"[\W_]+", text) for token in TOKEN_PATTERN.findall(word)]
+
+
+def module_name(root: Path, path: Path) -> str:
+    parts = list(path.relative_to(root).with_suffix("").parts)
+    if parts and parts[-1] == "__init__":
+        parts = parts[:-1]
+    if (root / "__init__.py").exists():
+        # The project directory is itself a package
+        parts.insert(0, root.name)
+    return ".".join(parts)
+
+
+def _signature(node) -> str:
+    if isinstance(node, ast.ClassDef):
+        bases = ", ".join(ast.unparse(base) for base in node.bases)
+        return f"class {node.name}({bases})" if bases else f"class {node.name}"
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+    return f"{prefix} {node.name}({ast.unparse(node.args)}){returns}"
+
+
+def _resolve_import(module: str, node: ast.ImportFrom, is_package: bool) -> str:
+    if not node.level:
+        return node.module or ""
+    base = module.split(".") if module else []
+    if not is_package:
+        base = base[:-1]
+    base = base[:len(base) - (node.level - 1)] if node.level > 1 else base
+    return ".".join(base + ([node.module] if node.module else []))
+
+
+def _dotted(node):
+    """`a.b.c` for a chain of attribute accesses on a name, else None"""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    return ".".join([node.id] + parts[::-1]) if isinstance(node, ast.Name) else None
+
+
+def parse_module(source: str, module: str, is_package: bool = False) -> dict:
+    """Definitions and imports of one module"""
+    tree = ast.parse(source)
+    symbols = []
+
+    def visit(body, owner=""):
+        for node in body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                qualname = f"{owner}.{node.name}" if owner else node.name
+                docstring = ast.get_docstring(node) or ""
+                symbols.append({
+                    "name": node.name,
+                    "qualname": qualname,
+                    "module": module,
+                    "kind": "class" if isinstance(node, ast.ClassDef) else "function",
+                    "signature": _signature(node),
+                    "doc": docstring.strip().splitlines()[0] if docstring.strip() else "",
+                    "line": node.lineno,
+                    "terms": tokenize(f"{qualname} {docstring}"),
+                })
+                if isinstance(node, ast.ClassDef):
+                    visit(node.body, qualname)
+
+    visit(tree.body)
+    imports = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            target = _resolve_import(module, node, is_package)
+            if target:
+                imports.add(target)
+    return {"symbols": symbols, "imports": sorted(imports)}
+
+
+class ProjectIndex:
+    """Persisted symbol table, import graph and BM25 index of a local project.
+
+    The index lives under ``INDEX_DIR`` and is refreshed incrementally:
+    only files whose mtime or size changed since the last scan are re-parsed.
+    """
+
+    def __init__(self, root, index_dir=None):
+        self.root = Path(root).resolve()
+        self.path = self.path_for(self.root, index_dir)
+        self._lock = threading.Lock()
+        self.files = {}  # relative path -> {"mtime", "size", "module", "symbols", "imports"}
+        if self.path.exists():
+            try:
+                self.files = json.loads(self.path.read_text(encoding="utf-8"))["files"]
+            except (ValueError, KeyError):
+                self.files = {}
+        self._build_postings()
+
+    @staticmethod
+    def path_for(root, index_dir=None) -> Path:
+        """Where the index of the project at `root` is stored"""
+        root = Path(root).resolve()
+        key = hashlib.sha256(str(root).encode("utf-8")).hexdigest()[:12]
+        return Path(index_dir or settings.INDEX_DIR) / f"{root.name}-{key}.json"
+
+    def _python_files(self):
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+            for filename in filenames:
+                if filename.endswith(".py"):
+                    yield Path(dirpath) / filename
+
+    def update(self) -> dict:
+        """Re-index changed files; returns counts of added/updated/removed files"""
+        with self._lock:
+            seen = set()
+            stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0, "errors": 0}
+            for path in self._python_files():
+                relative = path.relative_to(self.root).as_posix()
+                seen.add(relative)
+                stat = path.stat()
+                cached = self.files.get(relative)
+                if cached and cached["mtime"] == stat.st_mtime and cached["size"] == stat.st_size:
+                    stats["unchanged"] += 1
+                    continue
+                module = module_name(self.root, path)
+                try:
+                    parsed = parse_module(path.read_text(encoding="utf-8", errors="replace"), module,
+                                          is_package=path.name == "__init__.py")
+                except SyntaxError:
+                    parsed = {"symbols": [], "imports": []}
+                    stats["errors"] += 1
+                stats["updated" if cached else "added"] += 1
+                self.files[relative] = {"mtime": stat.st_mtime, "size": stat.st_size, "module": module, **parsed}
+            for relative in set(self.files) - seen:
+                del self.files[relative]
+                stats["removed"] += 1
+            if stats["added"] or stats["updated"] or stats["removed"]:
+                self._build_postings()
+                self._save()
+            return stats
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"root": str(self.root), "files": self.files}, separators=(",", ":")),
+                            encoding="utf-8")
+        tmp_path.replace(self.path)
+
+    def _build_postings(self):
+        """Inverted index: term -> {symbol id: term frequency}"""
+        self.symbols = [symbol for entry in self.files.values() for symbol in entry["symbols"]]
+        self.by_name = {}
+        self.postings = {}
+        for symbol_id, symbol in enumerate(self.symbols):
+            self.by_name.setdefault(symbol["name"], []).append(symbol_id)
+            for term, count in Counter(symbol["terms"]).items():
+                self.postings.setdefault(term, {})[symbol_id] = count
+        lengths = [len(symbol["terms"]) for symbol in self.symbols]
+        self.avg_length = sum(lengths) / len(lengths) if lengths else 0.0
+
+    def import_graph(self) -> dict:
+        """module -> project modules it imports"""
+        modules = {entry["module"] for entry in self.files.values()}
+        graph = {}
+        for entry in self.files.values():
+            deps = set()
+            for imported in entry["imports"]:
+                # `import pkg.mod` and `from pkg import mod` both resolve to the deepest project module
+                parts = imported.split(".")
+                for end in range(len(parts), 0, -1):
+                    candidate = ".".join(parts[:end])
+                    if candidate in modules:
+                        deps.add(candidate)
+                        break
+            deps.discard(entry["module"])
+            graph[entry["module"]] = sorted(deps)
+        return graph
+
+    def search(self, query: str, limit: int = 5) -> list:
+        """BM25-ranked symbols for a free-text query"""
+        scores = Counter()
+        total = len(self.symbols)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for symbol_id, tf in postings.items():
+                length = len(self.symbols[symbol_id]["terms"])
+                norm = tf + K1 * (1 - B + B * length / (self.avg_length or 1))
+                scores[symbol_id] += idf * tf * (K1 + 1) / norm
+        return [self.symbols[symbol_id] for symbol_id, _ in scores.most_common(limit)]
+
+    def lookup(self, name: str, module: str = None) -> list:
+        matches = [self.symbols[i] for i in self.by_name.get(name, [])]
+        if module:
+            in_module = [s for s in matches if s["module"] == module or s["module"].endswith("." + module)]
+            matches = in_module or matches
+        return matches
+
+    def _project_module(self, name: str):
+        """The indexed module an import of `name` refers to, or None.
+
+        Besides exact matches, a module may match by suffix (relative imports,
+        or a project indexed from above its import root), except for bare
+        standard library names.
+        """
+        relative = name.startswith(".")
+        name = name.lstrip(".")
+        if not name:
+            return None
+        modules = {entry["module"] for entry in self.files.values()}
+        if name in modules:
+            return name
+        if not relative and "." not in name and name in sys.stdlib_module_names:
+            return None
+        matches = [module for module in modules if module.endswith("." + name)]
+        return min(matches, key=len) if matches else None
+
+    def _bind_imports(self, imports) -> tuple:
+        """Module aliases and (name, module) wants for the project imports in `imports`.
+
+        `imports` yields ``(module, [(name, alias)])`` for ``from`` imports and
+        ``(None, [(module, alias)])`` for plain imports.
+        """
+        modules, wanted = {}, []
+        for source, names in imports:
+            for name, alias in names:
+                if source is None:
+                    module = self._project_module(name)
+                    if module:
+                        modules[alias or name] = module
+                    continue
+                # `from pkg import mod` binds a module, `from pkg.mod import f` a definition
+                prefix = source if source.endswith(".") else source + "."
+                submodule = self._project_module(prefix + name)
+                if submodule:
+                    modules[alias or name] = submodule
+                elif name != "*" and self._project_module(source):
+                    wanted.append((name, self._project_module(source)))
+        return modules, wanted
+
+    def referenced_symbols(self, code: str, limit: int = None) -> list:
+        """Project definitions referenced by `code`, resolved through its imports.
+
+        Only names imported from project modules and attributes of imported
+        project modules are looked up, so common names used locally don't
+        pull in unrelated definitions.
+        """
+        limit = limit or settings.INDEX_MAX_SYMBOLS
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            # Broken code is the norm here, so fall back to a lexical scan
+            imports = [(module, [(name.split(" as ")[0].strip(), None)
+                                 for name in (grouped or names).split(",") if name.strip()])
+                       for module, grouped, names in FROM_IMPORT_PATTERN.findall(code)]
+            imports += [(None, [(module, alias or None)]) for module, alias in IMPORT_PATTERN.findall(code)]
+            chains = DOTTED_PATTERN.findall(IMPORT_LINE_PATTERN.sub("", code))
+        else:
+            imports, chains = [], []
+            for node in ast.walk(tree):
+                if isinstance(node, ast.ImportFrom):
+                    source = "." * node.level + (node.module or "")
+                    imports.append((source, [(alias.name, alias.asname) for alias in node.names]))
+                elif isinstance(node, ast.Import):
+                    imports.append((None, [(alias.name, alias.asname) for alias in node.names]))
+                elif isinstance(node, ast.Attribute) and _dotted(node):
+                    chains.append(_dotted(node))
+        modules, wanted = self._bind_imports(imports)
+        for chain in dict.fromkeys(chains):
+            parts = chain.split(".")
+            for end in range(len(parts) - 1, 0, -1):
+                module = modules.get(".".join(parts[:end]))
+                if module:
+                    wanted.append((parts[end], module))
+                    break
+
+        found, seen = [], set()
+        for name, module in wanted:
+            for symbol in self.lookup(name, module):
+                key = (symbol["module"], symbol["qualname"])
+                if symbol["module"] == module and key not in seen:
+                    seen.add(key)
+                    found.append(symbol)
+            if len(found) >= limit:
+                break
+        return found[:limit]
+
+    def context_for(self, code: str) -> str:
+        """Signatures (not bodies) of the project definitions the code uses"""
+        lines = []
+        for symbol in self.referenced_symbols(code):
+            line = f"# {symbol['module']}\n{symbol['signature']}"
+            if symbol["doc"]:
+                line += f"\n    \"\"\"{symbol['doc']}\"\"\""
+            lines.append(line)
+        return "\n".join(lines)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(root) -> ProjectIndex:
+    """Shared, up-to-date index for a project directory"""
+    root = str(Path(root).resolve())
+    with _indexes_lock:
+        if root not in _indexes:
+            _indexes[root] = ProjectIndex(root)
+    index = _indexes[root]
+    index.update()
+    return index
@@ -0,0 +1,263 @@
+import contextlib
+import contextvars
+import logging
+import os
+import threading
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from phoenix import settings
+
+LOG_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+
+# Verbosity names accepted by LOG_LEVEL and the UI
+LEVELS = {"quiet": logging.WARNING, "normal": logging.INFO, "verbose": logging.DEBUG}
+
+_current_job = contextvars.ContextVar("phoenix_job_logger", default=None)
+
+
+def resolve_level(level) -> int:
+    if isinstance(level, int):
+        return level
+    name = str(level).lower()
+    if name in LEVELS:
+        return LEVELS[name]
+    number = logging.getLevelName(name.upper())
+    if not isinstance(number, int):
+        raise ValueError(f"Unknown log level '{level}' (use {', '.join(LEVELS)} or a logging level name)")
+    return number
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the last `capacity` records in memory; formats only when read"""
+
+    def __init__(self, capacity: int):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def lines(self) -> list:
+        return [self.format(record) for record in list(self.records)]
+
+
+class JobLog:
+    """Log of a single job: a bounded in-memory tail plus a rotating file"""
+
+    def __init__(self, job_id: str, level="normal", log_dir=None):
+        self.job_id = job_id
+        self.level = resolve_level(level)
+        self.path = Path(log_dir or settings.LOG_DIR) / f"{job_id}.log"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        formatter = logging.Formatter(LOG_FORMAT)
+        self.buffer = RingBufferHandler(settings.LOG_RING_SIZE)
+        self.file = RotatingFileHandler(self.path, maxBytes=settings.LOG_MAX_BYTES,
+                                        backupCount=settings.LOG_BACKUPS, encoding="utf-8", delay=True)
+        for handler in (self.buffer, self.file):
+            handler.setFormatter(formatter)
+            handler.setLevel(self.level)
+
+    def handle(self, record):
+        if record.levelno >= self.level:
+            self.buffer.handle(record)
+            self.file.handle(record)
+
+    def tail(self) -> str:
+        return "\n".join(self.buffer.lines())
+
+    def close(self):
+        self.file.close()
+
+
+class _JobRouter(logging.Handler):
+    """Forwards records from the `phoenix` logger to the job active in this context"""
+
+    def emit(self, record):
+        job = _current_job.get()
+        if job is not None:
+            job.handle(record)
+
+
+_root = logging.getLogger("phoenix")
+_root.addHandler(_JobRouter())
+_root.propagate = False
+_active_levels = []
+_levels_lock = threading.Lock()
+_console_level = None
+
+
+def _update_level():
+    """Enable only the most verbose level anyone is listening at.
+
+    Log calls below it return at the ``isEnabledFor`` check, before a record
+    is created or any message is formatted.
+    """
+    levels = list(_active_levels) + ([_console_level] if _console_level is not None else [])
+    _root.setLevel(min(levels) if levels else logging.WARNING)
+
+
+@contextlib.contextmanager
+def job_logging(job_id: str, level="normal"):
+    """Route Phoenix log calls made in this context to the job's log"""
+    job = JobLog(job_id, level)
+    token = _current_job.set(job)
+    with _levels_lock:
+        _active_levels.append(job.level)
+        _update_level()
+    try:
+        yield job
+    finally:
+        with _levels_lock:
+            _active_levels.remove(job.level)
+            _update_level()
+        _current_job.reset(token)
+        job.close()
+        prune_job_logs()
+
+
+def current_job():
+    return _current_job.get()
+
+
+_steps = logging.getLogger("phoenix.steps")
+
+
+def log_step(step):
+    """crewAI step_callback: record agent steps at debug level.
+
+    The step is only turned into text when debug logging is enabled, so large
+    reasoning transcripts cost nothing at lower verbosity.
+    """
+    if _steps.isEnabledFor(logging.DEBUG):
+        _steps.debug("agent step: %s", getattr(step, "text", None) or step)
+
+
+def log_task_output(output):
+    """Record a finished task's full output at debug level"""
+    if _steps.isEnabledFor(logging.DEBUG):
+        _steps.debug("task %s output: %s", output.name, output.raw)
+
+
+def configure(level=None):
+    """Print Phoenix logs to the console at `level` (CLI use)"""
+    global _console_level
+    with _levels_lock:
+        _console_level = resolve_level(level or settings.LOG_LEVEL)
+        _update_level()
+    if not any(isinstance(h, logging.StreamHandler) and not isinstance(h, _JobRouter) for h in _root.handlers):
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _root.addHandler(handler)
+    for handler in _root.handlers:
+        if not isinstance(handler, _JobRouter):
+            handler.setLevel(_console_level)
+
+
+class LogPager:
+    """Lazily pages through a (possibly huge) job log, including its rotated backups.
+
+    The backups (``<job>.log.N`` oldest, down to ``<job>.log.1``) and the
+    live file are paged as one log, oldest line first. Only byte offsets of
+    line starts are indexed; page contents are read with a seek when
+    requested. The index is extended incrementally as the live file grows
+    and rebuilt when the log is rotated.
+    """
+
+    def __init__(self, path, page_size: int = 200):
+        self.path = Path(path)
+        self.page_size = page_size
+        self._lock = threading.Lock()
+        self._files = []  # {"path", "inode", "offsets"} per file, oldest first
+
+    def _paths(self) -> list:
+        backups = []
+        while True:
+            backup = self.path.with_name(f"{self.path.name}.{len(backups) + 1}")
+            if not backup.exists():
+                break
+            backups.append(backup)
+        return backups[::-1] + [self.path]
+
+    @staticmethod
+    def _extend(indexed: dict, size: int):
+        offsets = indexed["offsets"]
+        if size < offsets[-1]:  # truncated
+            del offsets[1:]
+        if size == offsets[-1]:
+            return
+        with open(indexed["path"], "rb") as f:
+            f.seek(offsets[-1])
+            position = offsets[-1]
+            for line in f:
+                position += len(line)
+                if line.endswith(b"\n"):
+                    offsets.append(position)
+
+    def _index(self) -> list:
+        with self._lock:
+            files = []
+            for path in self._paths():
+                try:
+                    files.append((path, path.stat()))
+                except FileNotFoundError:  # rotated away, or not written yet
+                    continue
+            # A rollover shifts every file; a freed inode may even come back as the new live file
+            if [stat.st_ino for _, stat in files] != [indexed["inode"] for indexed in self._files]:
+                self._files = [{"path": path, "inode": stat.st_ino, "offsets": [0]} for path, stat in files]
+            for indexed, (_, stat) in zip(self._files, files):
+                self._extend(indexed, stat.st_size)
+            return list(self._files)
+
+    def line_count(self) -> int:
+        return sum(len(indexed["offsets"]) - 1 for indexed in self._index())
+
+    def page_count(self) -> int:
+        return max(1, -(-self.line_count() // self.page_size))
+
+    def page(self, number: int) -> str:
+        """Lines of 1-based page `number`"""
+        first = (number - 1) * self.page_size
+        last = first + self.page_size
+        chunks = []
+        for indexed in self._index():
+            offsets = indexed["offsets"]
+            lines = len(offsets) - 1
+            start, stop = max(first, 0), min(last, lines)
+            if start < stop:
+                with open(indexed["path"], "rb") as f:
+                    f.seek(offsets[start])
+                    chunks.append(f.read(offsets[stop] - offsets[start]))
+            first, last = first - lines, last - lines
+            if last <= 0:
+                break
+        return b"".join(chunks).decode("utf-8", errors="replace")
+
+
+def job_log_path(job_id: str) -> Path:
+    return Path(settings.LOG_DIR) / f"{job_id}.log"
+
+
+def list_job_logs() -> list:
+    """Job IDs with log files, newest first"""
+    log_dir = Path(settings.LOG_DIR)
+    if not log_dir.exists():
+        return []
+    paths = sorted(log_dir.glob("*.log"), key=os.path.getmtime, reverse=True)
+    return [path.stem for path in paths]
+
+
+def prune_job_logs(keep: int = None) -> int:
+    """Delete log files (and their rotated backups) of all but the newest `keep` jobs"""
+    keep = settings.LOG_KEEP_JOBS if keep is None else keep
+    removed = 0
+    for job_id in list_job_logs()[keep:]:
+        for path in Path(settings.LOG_DIR).glob(f"{job_id}.log*"):
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
@@ -1,10 +1,10 @@
 #!/usr/bin/env python
+import argparse
 import sys
 import os
 import warnings
 import contextlib
 from pathlib import Path
-from datetime import datetime
 
 os.environ["PYTHONWARNINGS"] = "ignore"  # Suppress all warnings
 
@@ -24,7 +24,16 @@ warnings.filterwarnings("ignore")
 
 # Import with stderr suppression for the persistent Pydantic warning
 with suppress_stderr():
-    from phoenix.crew import Phoenix
+    from phoenix.crew import Phoenix, TASK_ORDER
+    from phoenix.checkpoints import CheckpointStore
+    from phoenix.prompts import build_context
+    from phoenix.training import BatchRunner, DatasetTrainer, load_dataset
+    from phoenix.evaluation import Evaluator, load_corpus
+    from phoenix.indexer import ProjectIndex
+    from phoenix.project import ProjectFixer, format_status_table
+    from phoenix.providers import get_llm
+    from phoenix.watch import FileWatcher
+    from phoenix import logs, settings
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 warnings.filterwarnings("ignore", category=DeprecationWarning)
@@ -35,17 +44,30 @@ warnings.filterwarnings("ignore", message=".*Using extra keyword arguments.*")
 warnings.filterwarnings("ignore", message=".*Extra keys.*")
 warnings.filterwarnings("ignore")  # Suppress all remaining warnings
 
+logs.configure()
+
+def _command_args(command: str) -> list:
+    """Arguments after the subcommand, for both `phoenix <command> ...` and `<command> ...`"""
+    args = sys.argv[1:]
+    if args and args[0] == command:
+        args = args[1:]
+    return args
+
+
 def run():
     """
     Run the crew.
     """
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        return COMMANDS[sys.argv[1]]()
+
     query = input("Enter your query: ")
     inputs = {
-        "query": query,
+        "context": query,
     }
     
     try:
-        result = Phoenix().crew().kickoff(inputs=inputs)
+        result = Phoenix(verbose=logs.resolve_level(settings.LOG_LEVEL) <= logs.LEVELS["verbose"]).kickoff(inputs=inputs)
         print(f"Result: {result}")
     except Exception as e:
         print(f"An error occurred while running the crew: {e}")
@@ -54,53 +76,182 @@ def run():
 def train():
     """
     Train the crew for a given number of iterations.
+
+    With --dataset, crewAI training runs on every example, with the example's
+    feedback (or expected behavior) standing in for the human reviewer;
+    --workers examples train in parallel and interrupted runs resume where
+    they stopped.
     """
-    inputs = {
-        "query": "How to center a div in CSS?",
-    }
+    parser = argparse.ArgumentParser(prog="phoenix train", description="Train the Phoenix crew")
+    parser.add_argument("n_iterations", type=int)
+    parser.add_argument("filename", help="trained agents data file (.pkl; agents load trained_agents_data.pkl)")
+    parser.add_argument("--dataset", help=".jsonl/.json file of {code, expected_behavior, feedback} examples")
+    parser.add_argument("--workers", type=int, default=4, help="examples trained in parallel with --dataset (default: 4)")
+    args = parser.parse_args(_command_args("train"))
+
     try:
-        Phoenix().crew().train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs)
+        if args.dataset:
+            DatasetTrainer(Phoenix, load_dataset(args.dataset), args.n_iterations, args.filename,
+                           workers=args.workers).run()
+        else:
+            inputs = {
+                "context": build_context("def average(numbers):\n    return sum(numbers) / len(numbers)\n\nprint(average([]))"),
+            }
+            Phoenix().crew().train(n_iterations=args.n_iterations, filename=args.filename, inputs=inputs)
     except Exception as e:
         print(f"An error occurred while training the crew: {e}")
 
+def batch():
+    """
+    Run every example of a dataset through the crew in parallel and collect the outputs.
+    """
+    parser = argparse.ArgumentParser(prog="phoenix batch", description="Run a dataset through the crew")
+    parser.add_argument("n_iterations", type=int)
+    parser.add_argument("filename", help="JSON output file")
+    parser.add_argument("--dataset", required=True, help=".jsonl/.json file of {code, expected_behavior} examples")
+    parser.add_argument("--workers", type=int, default=4, help="parallel crew runs (default: 4)")
+    args = parser.parse_args(_command_args("batch"))
+
+    try:
+        BatchRunner(Phoenix, load_dataset(args.dataset), args.n_iterations, args.filename, workers=args.workers).run()
+    except Exception as e:
+        print(f"An error occurred while running the batch: {e}")
+
 def replay():
     """
     Replay the crew execution from a specific task.
+
+    With --from, upstream task outputs are reloaded from the checkpoint store
+    and only the downstream tasks are run again.
     """
+    parser = argparse.ArgumentParser(prog="phoenix replay", description="Replay a Phoenix run")
+    parser.add_argument("task_id", nargs="?", help="crewAI task ID to replay (crewAI's own replay)")
+    parser.add_argument("--from", dest="from_task", choices=TASK_ORDER, help="re-run from this task using checkpointed upstream outputs")
+    parser.add_argument("--run", dest="run_id", help="checkpoint run ID (default: latest run)")
+    parser.add_argument("--list", action="store_true", help="list checkpointed runs")
+    parser.add_argument("--gc", action="store_true", help="delete expired checkpoints")
+    args = parser.parse_args(_command_args("replay"))
+
+    store = CheckpointStore()
     try:
-        Phoenix().crew().replay(task_id=sys.argv[1])
+        if args.list:
+            for run_id in store.runs():
+                record = store.load(run_id)
+                print(f"{run_id}  tasks={','.join(record['tasks'])}  tier={record.get('tier', '-')}")
+        elif args.gc:
+            print(f"Removed {store.gc()} expired checkpoints")
+        elif args.from_task:
+            result = Phoenix().replay(args.from_task, run_id=args.run_id, store=store)
+            print(f"Result (run {result.run_id}): {result}")
+        elif args.task_id:
+            Phoenix().crew().replay(task_id=args.task_id)
+        else:
+            parser.print_usage()
     except Exception as e:
         print(f"An error occurred while replaying the crew: {e}")
 
 def test():
     """
-    Test the crew execution and returns the results.
+    Evaluate the crew on a corpus of broken programs and report scores and throughput.
     """
-    inputs = {
-        "topic": "AI LLMs",
-        "current_year": str(datetime.now().year)
-    }
-    
+    parser = argparse.ArgumentParser(prog="phoenix test", description="Evaluate the Phoenix crew")
+    parser.add_argument("n_iterations", type=int)
+    parser.add_argument("eval_llm", help="judge model, e.g. gemini-2.5-pro")
+    parser.add_argument("--corpus", required=True, help="dataset file or directory of broken .py programs")
+    parser.add_argument("--workers", type=int, default=4, help="parallel crew runs (default: 4)")
+    parser.add_argument("--rpm", type=float, help="max LLM requests per minute, crew and judge together")
+    parser.add_argument("--output", help="results directory (default: .phoenix/eval)")
+    args = parser.parse_args(_command_args("test"))
+
     try:
-        Phoenix().crew().test(n_iterations=int(sys.argv[1]), eval_llm=sys.argv[2], inputs=inputs)
+        judge = get_llm(settings.qualify_model(args.eval_llm))
+        report = Evaluator(Phoenix, judge, load_corpus(args.corpus), n_iterations=args.n_iterations,
+                           workers=args.workers, requests_per_minute=args.rpm, output_dir=args.output).run()
+        mean_score = "n/a" if report["mean_score"] is None else f"{report['mean_score']:.2f}"
+        print(f"📊 Mean score: {mean_score} over {report['cases']} cases "
+              f"({report['reused']} reused, {report['errors']} errors)")
+        print(f"⚡ Throughput: {report['cases_per_minute'] or 0} cases/min in {report['elapsed_seconds']}s")
     except Exception as e:
         print(f"An error occurred while testing the crew: {e}")
 
+def index():
+    """
+    Build or incrementally update the symbol index of a project directory.
+    """
+    parser = argparse.ArgumentParser(prog="phoenix index", description="Index a project for context lookup")
+    parser.add_argument("path", help="project directory")
+    parser.add_argument("--search", help="show the best matching definitions for a query")
+    args = parser.parse_args(_command_args("index"))
+
+    project_index = ProjectIndex(args.path)
+    stats = project_index.update()
+    print(f"📚 Indexed {len(project_index.symbols)} definitions in {len(project_index.files)} files "
+          f"({stats['added']} added, {stats['updated']} updated, {stats['removed']} removed) -> {project_index.path}")
+    if args.search:
+        for symbol in project_index.search(args.search):
+            print(f"  {symbol['module']}: {symbol['signature']}")
+
+def project():
+    """
+    Fix a multi-module project in dependency order.
+    """
+    parser = argparse.ArgumentParser(prog="phoenix project", description="Fix every module of a project")
+    parser.add_argument("path", help="project directory")
+    parser.add_argument("--output", help="write fixed project here (default: <path>_phoenix)")
+    parser.add_argument("--in-place", action="store_true", help="fix the project's files in place")
+    parser.add_argument("--workers", type=int, default=4, help="modules processed in parallel (default: 4)")
+    parser.add_argument("--expected", default="", help="expected behavior of the project")
+    args = parser.parse_args(_command_args("project"))
+
+    output = None if args.in_place else (args.output or f"{args.path.rstrip('/')}_phoenix")
+    fixer = ProjectFixer(args.path, Phoenix, workers=args.workers, output_dir=output,
+                         expected_behavior=args.expected)
+    statuses = fixer.run(on_status=lambda s: print(f"  {s['module']}: {s['status']}"))
+    print(format_status_table(statuses))
+    print(f"📦 Project written to {fixer.root}")
+
+def watch():
+    """
+    Re-fix Python files whenever they are saved, printing each fix as a diff.
+    """
+    parser = argparse.ArgumentParser(prog="phoenix watch", description="Re-fix files on save")
+    parser.add_argument("path", help="file or directory to watch")
+    parser.add_argument("--write", action="store_true", help="write fixes back to the files")
+    parser.add_argument("--debounce", type=float, help=f"seconds a file must be quiet after a save (default: {settings.WATCH_DEBOUNCE:g})")
+    parser.add_argument("--workers", type=int, default=2, help="files fixed in parallel (default: 2)")
+    parser.add_argument("--expected", default="", help="expected behavior of the watched code")
+    args = parser.parse_args(_command_args("watch"))
+
+    if not Path(args.path).exists():
+        print(f"❌ No such file or directory: {args.path}")
+        return
+    FileWatcher(args.path, Phoenix, debounce=args.debounce, write=args.write, workers=args.workers,
+                expected_behavior=args.expected).run()
+    print("👋 Stopped watching")
+
+COMMANDS = {
+    "train": train,
+    "batch": batch,
+    "replay": replay,
+    "test": test,
+    "index": index,
+    "project": project,
+    "watch": watch,
+}
+
 # Add main execution logic
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        command = sys.argv[1]
-        if command == "train" and len(sys.argv) >= 4:
-            train()
-        elif command == "replay" and len(sys.argv) >= 3:
-            replay()
-        elif command == "test" and len(sys.argv) >= 4:
-            test()
-        else:
-            print("Usage:")
-            print("  python main.py train <n_iterations> <filename>")
-            print("  python main.py replay <task_id>")
-            print("  python main.py test <n_iterations> <eval_llm>")
-            print("  python main.py (for interactive run)")
+    if len(sys.argv) > 1 and sys.argv[1] not in COMMANDS:
+        print("Usage:")
+        print("  python main.py train <n_iterations> <filename.pkl> [--dataset FILE]")
+        print("  python main.py batch <n_iterations> <output.json> --dataset FILE [--workers N]")
+        print("  python main.py replay <task_id>")
+        print("  python main.py replay --from verify_task [--run RUN_ID]")
+        print("  python main.py replay --list | --gc")
+        print("  python main.py test <n_iterations> <eval_llm> --corpus PATH [--workers N] [--rpm R]")
+        print("  python main.py index <project_dir> [--search QUERY]")
+        print("  python main.py project <project_dir> [--output DIR | --in-place] [--workers N]")
+        print("  python main.py watch <path> [--write] [--debounce S] [--workers N]")
+        print("  python main.py (for interactive run)")
     else:
         run()
@@ -0,0 +1,40 @@
+import threading
+
+
+class Metrics:
+    """Process-wide counters and latency samples shared by all sessions"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tiers = {}
+        self._counters = {}
+
+    def record_tier(self, tier: str, success: bool, seconds: float):
+        with self._lock:
+            stats = self._tiers.setdefault(tier, {"runs": 0, "successes": 0, "total_seconds": 0.0})
+            stats["runs"] += 1
+            stats["successes"] += int(success)
+            stats["total_seconds"] += seconds
+
+    def increment(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def counters(self) -> dict:
+        with self._lock:
+            return dict(self._counters)
+
+    def tier_stats(self) -> dict:
+        """Success rate and mean latency per model tier"""
+        with self._lock:
+            return {
+                tier: {
+                    "runs": stats["runs"],
+                    "success_rate": stats["successes"] / stats["runs"],
+                    "avg_latency": stats["total_seconds"] / stats["runs"],
+                }
+                for tier, stats in self._tiers.items()
+            }
+
+
+metrics = Metrics()
@@ -0,0 +1,130 @@
+import json
+
+from phoenix import settings
+from phoenix.sandbox import run_python
+
+REPORT_MARKER = "__PHOENIX_PROFILE__"
+
+# Runs the code under cProfile and tracemalloc and prints a JSON summary after a marker line.
+# An interval timer stops runaway code so that a partial profile is still reported.
+_HARNESS = r'''
+import cProfile, json, pstats, signal, tracemalloc
+
+SOURCE = {source!r}
+LIMIT = {limit!r}
+TOP = {top!r}
+
+
+class TimeLimit(BaseException):
+    pass
+
+
+def stop(signum, frame):
+    raise TimeLimit()
+
+
+error = None
+timed_out = False
+signal.signal(signal.SIGALRM, stop)
+tracemalloc.start()
+profiler = cProfile.Profile()
+signal.setitimer(signal.ITIMER_REAL, LIMIT)
+try:
+    code = compile(SOURCE, "user_code.py", "exec")
+    profiler.enable()
+    exec(code, {{"__name__": "__main__"}})
+except TimeLimit:
+    timed_out = True
+except BaseException as e:
+    error = f"{{type(e).__name__}}: {{e}}"
+finally:
+    profiler.disable()
+    signal.setitimer(signal.ITIMER_REAL, 0)
+
+_, peak = tracemalloc.get_traced_memory()
+snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(True, "user_code.py")])
+tracemalloc.stop()
+
+# Leave out the harness's own frames
+HARNESS_FRAMES = ("<built-in method builtins.exec>", "<method 'disable' of '_lsprof.Profiler' objects>")
+stats = {{
+    func: row for func, row in (pstats.Stats(profiler).stats if profiler.getstats() else {{}}).items()
+    if func[0] != __file__ and func[2] not in HARNESS_FRAMES
+}}
+total = sum(tt for _, _, tt, _, _ in stats.values())
+rows = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:TOP]
+print()
+print({marker!r} + json.dumps({{
+    "total_seconds": total,
+    "timed_out": timed_out,
+    "limit": LIMIT,
+    "error": error,
+    "peak_bytes": peak,
+    "hotspots": [
+        {{"location": pstats.func_std_string(func), "calls": nc, "primitive_calls": cc, "self_seconds": tt,
+          "cumulative_seconds": ct}}
+        for func, (cc, nc, tt, ct, _) in rows
+    ],
+    "allocations": [
+        {{"line": stat.traceback[0].lineno, "bytes": stat.size, "count": stat.count}}
+        for stat in snapshot.statistics("lineno")[:TOP] if stat.traceback[0].lineno
+    ],
+}}))
+'''
+
+
+class ProfileReport:
+    """Hotspots, call counts and peak memory of one profiled run"""
+
+    def __init__(self, data: dict = None, failure: str = ""):
+        data = data or {}
+        self.total_seconds = data.get("total_seconds", 0.0)
+        self.timed_out = data.get("timed_out", False)
+        self.limit = data.get("limit", 0.0)
+        self.error = data.get("error") or failure
+        self.peak_bytes = data.get("peak_bytes", 0)
+        self.hotspots = data.get("hotspots", [])
+        self.allocations = data.get("allocations", [])
+
+    @property
+    def ok(self) -> bool:
+        return bool(self.hotspots)
+
+    def summary(self) -> str:
+        """Compact plain-text report for the agents' context"""
+        if not self.ok:
+            return f"Profiling failed: {self.error or 'no profile data'}"
+        lines = [f"Profiled run: {self.total_seconds:.3f}s of CPU time in Python, peak memory {_size(self.peak_bytes)}"]
+        if self.timed_out:
+            lines.append(f"The run was stopped after {self.limit:g}s; figures cover only that part")
+        if self.error:
+            lines.append(f"The run ended with {self.error}")
+        lines.append("Hotspots (by time spent in the function itself):")
+        for spot in self.hotspots:
+            share = spot["self_seconds"] / self.total_seconds if self.total_seconds else 0.0
+            calls = spot["calls"] if spot["calls"] == spot["primitive_calls"] else f"{spot['calls']}/{spot['primitive_calls']}"
+            lines.append(f"  {spot['location']}: {calls} calls, {spot['self_seconds']:.4f}s self ({share:.0%}), "
+                         f"{spot['cumulative_seconds']:.4f}s cumulative")
+        if self.allocations:
+            lines.append("Largest allocations still alive at the end of the run:")
+            lines.extend(f"  line {a['line']}: {_size(a['bytes'])} in {a['count']} blocks" for a in self.allocations)
+        return "\n".join(lines)
+
+
+def _size(n: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GiB"
+
+
+def profile_code(code: str, limit: float = None, top: int = None) -> ProfileReport:
+    """Run `code` in the sandbox under cProfile and tracemalloc, for at most `limit` seconds"""
+    limit = limit or settings.PROFILE_TIMEOUT
+    harness = _HARNESS.format(source=code, limit=float(limit), top=top or settings.PROFILE_TOP, marker=REPORT_MARKER)
+    result = run_python(harness, timeout=limit + settings.SANDBOX_TIMEOUT)
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith(REPORT_MARKER):
+            return ProfileReport(json.loads(line[len(REPORT_MARKER):]))
+    return ProfileReport(failure=result.error() or "the profiler produced no report")
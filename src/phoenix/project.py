@@ -0,0 +1,232 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from graphlib import CycleError, TopologicalSorter
+from pathlib import Path
+
+from phoenix import settings
+from phoenix.indexer import SKIP_DIRS, ProjectIndex
+from phoenix.prompts import build_context, extract_code
+from phoenix.sandbox import run_python
+
+# Imports the module by name so import-time errors in it and its dependencies surface
+IMPORT_CHECK = "import importlib, sys; importlib.import_module(sys.argv[1])"
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def acyclic(graph: dict) -> dict:
+    """Drop edges inside import cycles so the graph can be ordered"""
+    graph = {module: set(deps) for module, deps in graph.items()}
+    while True:
+        try:
+            TopologicalSorter(graph).prepare()
+            return graph
+        except CycleError as e:
+            cycle = e.args[1]
+            graph[cycle[0]].discard(cycle[1])
+
+
+class ProjectFixer:
+    """Fixes a multi-module project in dependency order.
+
+    Modules are checked (compiled and imported in the sandbox) in
+    topological order of the import graph, with independent modules
+    processed in parallel. Only modules that fail their check go through the
+    crew. A module is re-checked only if its source changed since its last
+    successful check or a module it imports changed in this run; state is
+    kept in ``.phoenix/projects``.
+
+    With an `output_dir`, only files that are new or changed in the source
+    since they were last copied are copied over, so earlier fixes of
+    unchanged files are kept.
+    """
+
+    def __init__(self, root, crew_factory, workers: int = 4, output_dir=None, expected_behavior: str = ""):
+        source = Path(root).resolve()
+        self.root = Path(output_dir).resolve() if output_dir else source
+        self.crew_factory = crew_factory
+        self.workers = max(1, workers)
+        self.expected_behavior = expected_behavior
+        self.state_path = state_path(self.root)
+        saved = json.loads(self.state_path.read_text(encoding="utf-8")) if self.state_path.exists() else {}
+        self.state = saved.get("modules", {})
+        self.sources = saved.get("sources", {})  # relative path -> hash of the source file last copied
+        if self.root != source:
+            self._sync(source)
+        self.index = ProjectIndex(self.root)
+        self.statuses = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _crew(self):
+        if not hasattr(self._local, "crew"):
+            self._local.crew = self.crew_factory()
+        return self._local.crew
+
+    def _sync(self, source: Path):
+        """Copy new and changed files of `source` into the output directory and drop deleted ones"""
+        seen = set()
+        for dirpath, dirnames, filenames in os.walk(source):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+            for filename in filenames:
+                path = Path(dirpath) / filename
+                relative = path.relative_to(source).as_posix()
+                seen.add(relative)
+                digest = hashlib.sha256(path.read_bytes()).hexdigest()
+                target = self.root / relative
+                if self.sources.get(relative) != digest or not target.exists():
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copy2(path, target)
+                    self.sources[relative] = digest
+        for relative in set(self.sources) - seen:
+            (self.root / relative).unlink(missing_ok=True)
+            del self.sources[relative]
+
+    def _path(self, module: str) -> Path:
+        return self._paths[module]
+
+    def _import_root(self) -> Path:
+        # Module names of a project that is itself a package start with its own name
+        return self.root.parent if (self.root / "__init__.py").exists() else self.root
+
+    def check(self, module: str, source: str):
+        """Return an error message, or None when the module compiles and imports cleanly"""
+        try:
+            compile(source, str(self._path(module)), "exec")
+        except SyntaxError as e:
+            return f"SyntaxError: {e.msg} (line {e.lineno})"
+        result = run_python(args=["-c", IMPORT_CHECK, module], cwd=self.root, extra_path=[self._import_root()])
+        return None if result.ok else (result.error() or "import failed")
+
+    def _process(self, module: str, dependency_changed: bool, dependency_failed: bool = False) -> dict:
+        started = time.time()
+        path = self._path(module)
+        source = path.read_text(encoding="utf-8")
+        source_hash = _hash(source)
+        previous = self.state.get(module, {})
+
+        if previous.get("hash") == source_hash and previous.get("ok") and not dependency_changed:
+            return {"module": module, "status": "unchanged", "changed": False, "seconds": 0.0, "detail": ""}
+
+        error = self.check(module, source)
+        if error is None:
+            # An edited module that still imports cleanly changed too, so its dependents are re-checked
+            status = {"module": module, "status": "ok", "changed": previous.get("hash") != source_hash, "detail": ""}
+        elif dependency_failed:
+            # The error most likely comes from the broken dependency; don't spend a crew run on it
+            status = {"module": module, "status": "blocked", "changed": False, "detail": error}
+        else:
+            context = build_context(source, self.expected_behavior, self.index.context_for(source))
+            context += f"\nMODULE: {module} ({path.relative_to(self.root)})\nERROR WHEN IMPORTING: {error}\n"
+            fixed = None
+            try:
+                fixed = extract_code(self._crew().kickoff(inputs={"context": context}).raw)
+                path.write_text(fixed, encoding="utf-8")
+                remaining = self.check(module, fixed)
+                if remaining is not None:
+                    path.write_text(source, encoding="utf-8")  # keep the original over a failed attempt
+            except Exception as e:
+                remaining = str(e)
+                path.write_text(source, encoding="utf-8")
+            changed = remaining is None and fixed != source
+            if changed:
+                source_hash = _hash(fixed)
+            status = {
+                "module": module,
+                "status": "fixed" if remaining is None else "failed",
+                "changed": changed,
+                "detail": error if remaining is None else remaining,
+            }
+
+        with self._lock:
+            self.state[module] = {"hash": source_hash, "ok": status["status"] in ("ok", "fixed")}
+        status["seconds"] = round(time.time() - started, 2)
+        return status
+
+    def run(self, on_status=None) -> list:
+        """Process every module; `on_status` is called with each module's status as it finishes"""
+        self.index.update()
+        self._paths = {entry["module"]: self.root / relative for relative, entry in self.index.files.items()}
+        graph = acyclic(self.index.import_graph())
+        sorter = TopologicalSorter(graph)
+        sorter.prepare()
+        changed = set()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            running = {}
+            while sorter.is_active():
+                for module in sorter.get_ready():
+                    dependency_changed = any(dep in changed for dep in graph[module])
+                    dependency_failed = any(self.statuses[dep]["status"] in ("failed", "blocked") for dep in graph[module])
+                    running[pool.submit(self._process, module, dependency_changed, dependency_failed)] = module
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    module = running.pop(future)
+                    try:
+                        status = future.result()
+                    except Exception as e:
+                        status = {"module": module, "status": "failed", "changed": False, "seconds": 0.0, "detail": str(e)}
+                    if status["changed"]:
+                        changed.add(module)
+                    self.statuses[module] = status
+                    if on_status:
+                        on_status(status)
+                    sorter.done(module)
+
+        self._save_state()
+        return [self.statuses[module] for module in sorted(self.statuses)]
+
+    def _save_state(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        self.state_path.write_text(json.dumps({"modules": self.state, "sources": self.sources}, indent=1),
+                                   encoding="utf-8")
+
+
+def state_path(root) -> Path:
+    """Where ProjectFixer keeps the per-module state of the project at `root`"""
+    root = Path(root).resolve()
+    return Path(settings.PHOENIX_HOME) / "projects" / f"{root.name}-{_hash(str(root))[:12]}.json"
+
+
+def upload_workdir(data: bytes) -> Path:
+    """Working directory for an uploaded project archive, the same for the same upload.
+
+    Re-running an upload therefore reuses its fixed copy and state. Only the
+    newest ``PROJECT_UPLOAD_KEEP`` working directories are kept; older ones
+    are removed together with their project state and index.
+    """
+    uploads = Path(settings.PROJECT_UPLOAD_DIR)
+    workdir = uploads / hashlib.sha256(data).hexdigest()[:16]
+    workdir.mkdir(parents=True, exist_ok=True)
+    os.utime(workdir)
+    stale = sorted((path for path in uploads.iterdir() if path.is_dir()), key=os.path.getmtime, reverse=True)
+    for old in stale[settings.PROJECT_UPLOAD_KEEP:]:
+        if old != workdir:
+            remove_workdir(old)
+    return workdir
+
+
+def remove_workdir(workdir: Path):
+    """Delete an upload's working directory and the state and index of the project fixed in it"""
+    fixed = Path(workdir) / "fixed"
+    roots = [fixed] + ([path for path in fixed.iterdir() if path.is_dir()] if fixed.is_dir() else [])
+    for root in roots:
+        state_path(root).unlink(missing_ok=True)
+        ProjectIndex.path_for(root).unlink(missing_ok=True)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+def format_status_table(statuses: list) -> str:
+    icons = {"ok": "✅", "fixed": "🔧", "failed": "❌", "blocked": "⛔", "unchanged": "⏭️"}
+    width = max([len(s["module"]) for s in statuses] + [6])
+    lines = [f"{'Module':<{width}}  Status      Time    Detail"]
+    for s in statuses:
+        lines.append(f"{s['module']:<{width}}  {icons.get(s['status'], '')} {s['status']:<9} {s['seconds']:>5.1f}s  {s['detail']}")
+    return "\n".join(lines)
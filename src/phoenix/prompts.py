@@ -0,0 +1,83 @@
+import ast
+import re
+
+FENCED_BLOCK_PATTERN = re.compile(r"```(?:python|py)?\s*\n(.*?)```", re.DOTALL)
+CODE_START_PATTERN = re.compile(r"^(?:def |class |import |from |@|async def |if |for |while |try:|with |print\(|[A-Za-z_][\w.]*\s*(?:=|\())")
+MAX_SCAN_LINES = 400
+
+
+def build_context(user_code: str, expected_behavior: str = "", project_context: str = "", tests: str = "",
+                  test_results: str = "") -> str:
+    """Create the formatted context passed to the crew as the {context} input"""
+    if project_context:
+        project_context = f"""
+PROJECT DEFINITIONS USED BY THIS CODE (signatures only, from the user's project):
+{project_context}
+"""
+    test_context, test_instructions = "", ""
+    if tests:
+        test_context = f"""
+ATTACHED TESTS (pytest-style; the code under test is importable as `solution`):
+```python
+{tests}
+```
+"""
+        if test_results:
+            test_context += f"""
+RESULTS OF THE ATTACHED TESTS ON THE USER'S CODE:
+{test_results}
+"""
+        test_instructions = "\n- Run the attached tests with the test tool; the final code must pass all of them"
+    return f"""
+TASK: Fix and optimize the following Python code
+
+USER'S CODE:
+```python
+{user_code}
+```
+
+EXPECTED BEHAVIOR: {expected_behavior or 'Not specified'}
+{project_context}{test_context}
+INSTRUCTIONS:
+- Analyze the code for syntax errors, logical errors, or runtime issues
+- Test the code using the code interpreter tool
+- Fix any issues found systematically
+- Provide working, optimized Python code{test_instructions}
+"""
+
+
+def _parses(code: str) -> bool:
+    try:
+        ast.parse(code)
+    except (SyntaxError, ValueError):
+        return False
+    return True
+
+
+def extract_code(text: str) -> str:
+    """Pull the final Python program out of an agent's plain-text answer.
+
+    Agents are told not to use markdown, so besides fenced blocks this looks
+    for the longest run of lines that parses as Python and still contains a
+    statement, which drops the surrounding explanations.
+    """
+    blocks = [block.strip() for block in FENCED_BLOCK_PATTERN.findall(text) if block.strip()]
+    if blocks:
+        parsing = [block for block in blocks if _parses(block)]
+        return max(parsing or blocks, key=len) + "\n"
+
+    lines = text.strip().splitlines()
+    if len(lines) > MAX_SCAN_LINES or _parses(text):
+        return text.strip() + "\n"
+
+    best = ""
+    starts = [i for i, line in enumerate(lines) if CODE_START_PATTERN.match(line)]
+    for start in starts:
+        for end in range(len(lines), start, -1):
+            if end - start <= best.count("\n") + 1:
+                break
+            candidate = "\n".join(lines[start:end]).strip()
+            if _parses(candidate):
+                best = candidate
+                break
+    return (best or text.strip()) + "\n"
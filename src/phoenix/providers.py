@@ -0,0 +1,103 @@
+import contextvars
+import threading
+from contextlib import contextmanager
+
+import httpx
+import litellm
+from crewai import LLM
+from litellm.llms.custom_httpx.http_handler import HTTPHandler
+
+from phoenix import cancellation, settings
+
+# Provider errors that say nothing about the answer's quality; a stronger tier would hit them too
+TRANSIENT_ERRORS = (litellm.RateLimitError, litellm.Timeout, litellm.APIConnectionError,
+                    litellm.ServiceUnavailableError, litellm.InternalServerError, httpx.TransportError)
+TRANSIENT_MARKERS = ("429", "rate limit", "ratelimit", "resource_exhausted", "too many requests", "timed out",
+                     "connection error", "service unavailable")
+
+_lock = threading.Lock()
+_llms = {}
+_pool_installed = False
+_gemini_client = None
+_call_gate = contextvars.ContextVar("phoenix_llm_call_gate", default=None)
+
+
+def install_connection_pool(pool_size: int = None, timeout: float = None):
+    """Share one keep-alive HTTP connection pool between every LLM client.
+
+    LiteLLM reuses ``litellm.client_session``/``aclient_session`` for
+    OpenAI-compatible endpoints only; its Gemini handler takes an explicit
+    ``client`` instead, so Gemini LLMs are given a handler wrapping the same
+    pooled ``httpx.Client``. Either way all sessions and worker threads talk
+    to the model server over the same connections.
+    """
+    global _pool_installed, _gemini_client
+    with _lock:
+        if _pool_installed:
+            return
+        pool_size = pool_size or settings.LLM_POOL_SIZE
+        limits = httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=60,
+        )
+        client_timeout = httpx.Timeout(timeout or settings.LLM_TIMEOUT, connect=10)
+        litellm.client_session = httpx.Client(limits=limits, timeout=client_timeout)
+        litellm.aclient_session = httpx.AsyncClient(limits=limits, timeout=client_timeout)
+        _gemini_client = HTTPHandler(timeout=client_timeout, client=litellm.client_session)
+        _pool_installed = True
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Rate limits, timeouts and transport errors, also when crewAI re-raises them wrapped"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, TRANSIENT_ERRORS):
+            return True
+        message = f"{type(error).__name__} {error}".lower()
+        if any(marker in message for marker in TRANSIENT_MARKERS):
+            return True
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return False
+
+
+@contextmanager
+def call_gate(acquire):
+    """Call `acquire()` before every LLM request made in this context, e.g. to share a rate limit"""
+    reset = _call_gate.set(acquire)
+    try:
+        yield
+    finally:
+        _call_gate.reset(reset)
+
+
+class CancellableLLM(LLM):
+    """LLM client that stops at the current run's cancellation token before and after each call"""
+
+    def call(self, *args, **kwargs):
+        cancellation.check("llm_calls_avoided")
+        acquire = _call_gate.get()
+        if acquire is not None:
+            acquire()
+        response = super().call(*args, **kwargs)
+        cancellation.check()
+        return response
+
+
+def _client_options() -> dict:
+    if settings.LLM_PROVIDER == "local":
+        return {"base_url": settings.LLM_BASE_URL, "api_key": settings.LLM_API_KEY}
+    return {"api_key": settings.GOOGLE_API_KEY, "client": _gemini_client}
+
+
+def get_llm(model: str) -> CancellableLLM:
+    """Return the shared LLM client for a model, creating it on first use"""
+    install_connection_pool()
+    with _lock:
+        if model not in _llms:
+            try:
+                _llms[model] = CancellableLLM(model=model, timeout=settings.LLM_TIMEOUT, **_client_options())
+            except Exception as e:
+                raise ValueError(f"Failed to initialize LLM {model}: {e}")
+        return _llms[model]
@@ -0,0 +1,174 @@
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from phoenix import cancellation, settings
+
+POLL_INTERVAL = 0.1
+
+
+class SandboxResult:
+    """Outcome of running Python code in a sandboxed subprocess"""
+
+    def __init__(self, returncode: int, stdout: str, stderr: str, seconds: float, timed_out: bool = False):
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.seconds = seconds
+        self.timed_out = timed_out
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.timed_out
+
+    def error(self) -> str:
+        """Last line of the traceback, e.g. "NameError: name 'x' is not defined" """
+        if self.timed_out:
+            return f"TimeoutError: execution exceeded the time limit ({self.seconds:.1f}s)"
+        lines = [line for line in self.stderr.strip().splitlines() if line.strip()]
+        return lines[-1].strip() if lines else ""
+
+
+def _host_command(argv: list, scratch: str, cwd, extra_path: list) -> tuple:
+    """The local interpreter in isolated mode; resource limits are set by the bootstrap in the child"""
+    env = {"PATH": os.environ.get("PATH", ""), "PYTHONIOENCODING": "utf-8", "PYTHONHASHSEED": "0"}
+    if extra_path:
+        env["PHOENIX_SANDBOX_PATH"] = os.pathsep.join(str(p) for p in extra_path)
+    if os.name == "posix":
+        memory = settings.SANDBOX_MEMORY_MB * 1024 * 1024
+        env["PHOENIX_SANDBOX_LIMITS"] = f"{memory},{int(settings.SANDBOX_TIMEOUT) + 1}"
+    return [sys.executable, "-I", "-c", _BOOTSTRAP] + argv, env, cwd or scratch
+
+
+def _docker_command(argv: list, scratch: str, cwd, extra_path: list, container: str) -> tuple:
+    """A throwaway container without network; the scratch dir, `cwd` and `extra_path` are mounted into it"""
+    if shutil.which("docker") is None:
+        raise RuntimeError("SANDBOX_BACKEND=docker but the docker CLI was not found; install Docker "
+                           "or set SANDBOX_BACKEND=host to run code directly on this machine")
+    mounts = {scratch: "/sandbox"}
+    if cwd:
+        mounts.setdefault(str(Path(cwd).resolve()), "/work")
+    for number, entry in enumerate(extra_path):
+        mounts.setdefault(str(Path(entry).resolve()), f"/path{number}")
+
+    def inside(value: str) -> str:
+        for host, mounted in mounts.items():
+            if value == host or value.startswith(host + os.sep):
+                return mounted + value[len(host):].replace(os.sep, "/")
+        return value
+
+    command = ["docker", "run", "--rm", "-i", "--name", container, "--pull", "never", "--network", "none",
+               "--memory", f"{settings.SANDBOX_MEMORY_MB}m", "--cpus", "1", "--pids-limit", "128",
+               "--read-only", "--tmpfs", "/tmp", "-e", "PYTHONIOENCODING=utf-8", "-e", "PYTHONHASHSEED=0"]
+    if hasattr(os, "getuid"):
+        command += ["--user", f"{os.getuid()}:{os.getgid()}"]
+    for host, mounted in mounts.items():
+        command += ["-v", f"{host}:{mounted}" + ("" if host == scratch else ":ro")]
+    if extra_path:
+        command += ["-e", "PHOENIX_SANDBOX_PATH=" + ":".join(inside(str(Path(p).resolve())) for p in extra_path)]
+    command += ["-w", inside(str(Path(cwd).resolve())) if cwd else "/sandbox", settings.SANDBOX_IMAGE,
+                "python", "-I", "-c", _BOOTSTRAP] + [inside(arg) for arg in argv]
+    return command, dict(os.environ), None
+
+
+def run_python(code: str = None, args: list = None, cwd=None, timeout: float = None, stdin: str = "",
+               extra_path: list = None) -> SandboxResult:
+    """Run `code` (or a script with `args`) in an isolated Python process.
+
+    With ``SANDBOX_BACKEND=docker`` (the default) the code runs in a
+    throwaway container without network access, with memory, CPU and
+    process limits and a read-only filesystem apart from its scratch
+    directory. ``SANDBOX_BACKEND=host`` must be opted into: it runs the
+    local interpreter in isolated mode (-I: no user site-packages, no
+    PYTHON* environment variables) with memory and CPU limits on POSIX
+    systems, but with the user's file and network access. Either way the
+    code runs in a scratch directory unless `cwd` is given, `extra_path`
+    entries are prepended to sys.path, e.g. a project root, and the child
+    is killed as soon as the current run is cancelled.
+    """
+    timeout = timeout or settings.SANDBOX_TIMEOUT
+    if settings.SANDBOX_BACKEND not in ("docker", "host"):
+        raise ValueError(f"Unknown SANDBOX_BACKEND '{settings.SANDBOX_BACKEND}', expected docker or host")
+    with tempfile.TemporaryDirectory(prefix="phoenix-sandbox-") as scratch:
+        argv = []
+        if code is not None:
+            script = os.path.join(scratch, "main.py")
+            with open(script, "w", encoding="utf-8") as f:
+                f.write(code)
+            argv.append(script)
+        argv.extend(args or [])
+
+        container = None
+        if settings.SANDBOX_BACKEND == "docker":
+            container = f"phoenix-sandbox-{uuid.uuid4().hex[:12]}"
+            command, env, workdir = _docker_command(argv, scratch, cwd, extra_path or [], container)
+        else:
+            command, env, workdir = _host_command(argv, scratch, cwd, extra_path or [])
+
+        cancellation.check("sandbox_runs_avoided")
+        started = time.perf_counter()
+        # A new session (no preexec_fn, which is unsafe with threads) lets _kill reach the whole process group
+        process = subprocess.Popen(
+            command, cwd=workdir, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE, text=True, start_new_session=os.name == "posix",
+        )
+        # Wait in short slices so a cancelled run stops its child promptly
+        pending_input = stdin
+        while True:
+            try:
+                stdout, stderr = process.communicate(pending_input, timeout=POLL_INTERVAL)
+                break
+            except subprocess.TimeoutExpired:
+                pending_input = None
+                token = cancellation.current_token()
+                if token is not None and token.cancelled:
+                    _kill(process, container)
+                    process.communicate()
+                    cancellation.check("sandbox_runs_killed")
+                if time.perf_counter() - started > timeout:
+                    _kill(process, container)
+                    stdout, stderr = process.communicate()
+                    return SandboxResult(-1, stdout, stderr, time.perf_counter() - started, timed_out=True)
+        return SandboxResult(process.returncode, stdout, stderr, time.perf_counter() - started)
+
+
+def _kill(process, container: str = None):
+    """Kill the child and anything it spawned (it leads its own session on POSIX), or its container"""
+    if container:
+        subprocess.run(["docker", "kill", container], capture_output=True, timeout=30)
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+# Runs in the child before the code: applies PHOENIX_SANDBOX_LIMITS (memory bytes, CPU seconds) and
+# prepends PHOENIX_SANDBOX_PATH to sys.path (-I ignores PYTHONPATH), then runs the script in argv[1]
+# as __main__, or the code of a `-c CODE` pair
+_BOOTSTRAP = """
+import os, runpy, sys
+limits = os.environ.pop("PHOENIX_SANDBOX_LIMITS", "")
+if limits:
+    import resource
+    memory, cpu = (int(value) for value in limits.split(","))
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu))
+path = os.environ.pop("PHOENIX_SANDBOX_PATH", "")
+if path:
+    sys.path[:0] = path.split(os.pathsep)
+if sys.argv[1] == "-c":
+    code, sys.argv = sys.argv[2], ["-c"] + sys.argv[3:]
+    exec(compile(code, "<string>", "exec"), {"__name__": "__main__"})
+else:
+    sys.argv = sys.argv[1:]
+    runpy.run_path(sys.argv[0], run_name="__main__")
+"""
@@ -0,0 +1,137 @@
+import os
+import sys
+from dotenv import load_dotenv
+
+load_dotenv()
+
+GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+
+# LLM provider: "gemini" (remote) or "local" (OpenAI-compatible server, e.g. vLLM/Ollama)
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini").strip().lower()
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "http://127.0.0.1:8000/v1")
+LLM_API_KEY = os.getenv("LLM_API_KEY", "not-needed")
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "20"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "120"))
+
+_PROVIDER_PREFIXES = {"gemini": "gemini", "local": "openai"}
+
+if LLM_PROVIDER not in _PROVIDER_PREFIXES:
+    raise ValueError(f"Unknown LLM_PROVIDER '{LLM_PROVIDER}', expected one of: {', '.join(_PROVIDER_PREFIXES)}")
+
+
+def requires_google_key() -> bool:
+    return LLM_PROVIDER == "gemini"
+
+
+def qualify_model(model: str) -> str:
+    """Prefix bare model names with the LiteLLM provider for LLM_PROVIDER."""
+    model = model.strip()
+    return model if "/" in model else f"{_PROVIDER_PREFIXES[LLM_PROVIDER]}/{model}"
+
+
+def _model_list(value: str) -> list:
+    return [qualify_model(name) for name in value.split(",") if name.strip()]
+
+
+# Fast model first, stronger models only when the cascade escalates
+MODEL = qualify_model(os.getenv("MODEL", "gemini-2.5-flash"))
+STRONG_MODEL = qualify_model(os.getenv("STRONG_MODEL", "gemini-2.5-pro"))
+
+# Per-agent tiers, e.g. FIXER_MODELS=gemini-2.5-flash,gemini-2.5-pro
+FIXER_MODELS = _model_list(os.getenv("FIXER_MODELS", "")) or [MODEL, STRONG_MODEL]
+VERIFIER_MODELS = _model_list(os.getenv("VERIFIER_MODELS", "")) or [MODEL, STRONG_MODEL]
+
+# Escalation policy
+ESCALATE_AFTER_FAILURES = int(os.getenv("ESCALATE_AFTER_FAILURES", "3"))
+MIN_VERIFIER_CONFIDENCE = float(os.getenv("MIN_VERIFIER_CONFIDENCE", "0.6"))
+# Rate limits, timeouts and connection errors are retried on the same tier (with exponential backoff) instead of escalating
+TRANSIENT_RETRIES = int(os.getenv("TRANSIENT_RETRIES", "2"))
+TRANSIENT_BACKOFF = float(os.getenv("TRANSIENT_BACKOFF", "5"))
+
+# Agent and task definitions (agents.yaml, tasks.yaml); edits are picked up without a restart
+CREW_CONFIG_DIR = os.getenv("CREW_CONFIG_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "config"))
+
+# UI sessions idle for this long have their in-flight run cancelled and are forgotten
+SESSION_IDLE_SECONDS = float(os.getenv("SESSION_IDLE_SECONDS", "900"))
+
+# phoenix watch: a save is handled once the file has been quiet this long; files are polled every WATCH_INTERVAL
+WATCH_DEBOUNCE = float(os.getenv("WATCH_DEBOUNCE", "0.5"))
+WATCH_INTERVAL = float(os.getenv("WATCH_INTERVAL", "0.25"))
+
+# Local state (checkpoints, caches, logs)
+PHOENIX_HOME = os.path.abspath(os.getenv("PHOENIX_HOME", ".phoenix"))
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", os.path.join(PHOENIX_HOME, "checkpoints"))
+CHECKPOINT_MAX_AGE_DAYS = float(os.getenv("CHECKPOINT_MAX_AGE_DAYS", "7"))
+CHECKPOINT_KEEP = int(os.getenv("CHECKPOINT_KEEP", "50"))
+
+# Sandbox used for checks, profiling, benchmarks and tests: a network-less Docker container by default;
+# "host" runs the code with the local interpreter and the user's permissions and must be chosen explicitly
+SANDBOX_BACKEND = os.getenv("SANDBOX_BACKEND", "docker").strip().lower()
+SANDBOX_IMAGE = os.getenv("SANDBOX_IMAGE", "python:%s.%s-slim" % sys.version_info[:2])
+SANDBOX_TIMEOUT = float(os.getenv("SANDBOX_TIMEOUT", "10"))
+SANDBOX_MEMORY_MB = int(os.getenv("SANDBOX_MEMORY_MB", "512"))
+
+# Rule-based autofix tried before the crew for common errors (missing imports, indentation, brackets...)
+AUTOFIX_ENABLED = os.getenv("AUTOFIX_ENABLED", "true").strip().lower() in ("1", "true", "yes")
+AUTOFIX_MAX_ROUNDS = int(os.getenv("AUTOFIX_MAX_ROUNDS", "8"))
+# Seconds a candidate may run; longer-running code is left to the crew
+AUTOFIX_TIMEOUT = float(os.getenv("AUTOFIX_TIMEOUT", "3"))
+
+# Profiling of the fixer's code; the report is added to the verifier's task
+PROFILE_ENABLED = os.getenv("PROFILE_ENABLED", "true").strip().lower() in ("1", "true", "yes")
+PROFILE_TIMEOUT = float(os.getenv("PROFILE_TIMEOUT", "5"))
+PROFILE_TOP = int(os.getenv("PROFILE_TOP", "8"))
+
+# Benchmark gate: the verifier's code must match the fixer's output and not run slower
+BENCHMARK_ENABLED = os.getenv("BENCHMARK_ENABLED", "true").strip().lower() in ("1", "true", "yes")
+BENCHMARK_WARMUP = int(os.getenv("BENCHMARK_WARMUP", "1"))
+BENCHMARK_REPEAT = int(os.getenv("BENCHMARK_REPEAT", "5"))
+BENCHMARK_BUDGET = float(os.getenv("BENCHMARK_BUDGET", "5"))
+BENCHMARK_TOLERANCE = float(os.getenv("BENCHMARK_TOLERANCE", "0.10"))
+
+# Project mode uploads: working copies are kept per upload for incremental re-runs, newest PROJECT_UPLOAD_KEEP only;
+# archives are refused beyond PROJECT_ZIP_MAX_MB uncompressed or PROJECT_ZIP_MAX_FILES entries
+PROJECT_UPLOAD_DIR = os.getenv("PROJECT_UPLOAD_DIR", os.path.join(PHOENIX_HOME, "uploads"))
+PROJECT_UPLOAD_KEEP = int(os.getenv("PROJECT_UPLOAD_KEEP", "5"))
+PROJECT_ZIP_MAX_MB = float(os.getenv("PROJECT_ZIP_MAX_MB", "50"))
+PROJECT_ZIP_MAX_FILES = int(os.getenv("PROJECT_ZIP_MAX_FILES", "2000"))
+
+# Project indexer: persisted symbol tables of indexed projects
+INDEX_DIR = os.getenv("INDEX_DIR", os.path.join(PHOENIX_HOME, "index"))
+INDEX_MAX_SYMBOLS = int(os.getenv("INDEX_MAX_SYMBOLS", "20"))
+
+# Logging: LOG_LEVEL is quiet, normal or verbose (verbose also logs agent transcripts)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "normal")
+LOG_DIR = os.getenv("LOG_DIR", os.path.join(PHOENIX_HOME, "logs"))
+LOG_RING_SIZE = int(os.getenv("LOG_RING_SIZE", "500"))
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(1024 * 1024)))
+LOG_BACKUPS = int(os.getenv("LOG_BACKUPS", "3"))
+LOG_KEEP_JOBS = int(os.getenv("LOG_KEEP_JOBS", "200"))
+
+# Request tracing (Chrome trace-event JSON, open in chrome://tracing or ui.perfetto.dev)
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "false").strip().lower() in ("1", "true", "yes")
+TRACE_DIR = os.getenv("TRACE_DIR", os.path.join(PHOENIX_HOME, "traces"))
+TRACE_KEEP = int(os.getenv("TRACE_KEEP", "20"))
+
+# Attached test suites: sharded over TEST_WORKERS sandboxes, each test limited to TEST_TIMEOUT seconds
+TEST_WORKERS = int(os.getenv("TEST_WORKERS", str(os.cpu_count() or 2)))
+TEST_TIMEOUT = float(os.getenv("TEST_TIMEOUT", "5"))
+TEST_DIR = os.getenv("TEST_DIR", os.path.join(PHOENIX_HOME, "tests"))
+# Suite results cached in TEST_DIR; only the newest TEST_KEEP are kept
+TEST_KEEP = int(os.getenv("TEST_KEEP", "5000"))
+
+# Evaluation harness
+EVAL_DIR = os.getenv("EVAL_DIR", os.path.join(PHOENIX_HOME, "eval"))
+EVAL_REQUESTS_PER_MINUTE = float(os.getenv("EVAL_REQUESTS_PER_MINUTE", "30"))
+
+
+def tier_count() -> int:
+    return max(len(FIXER_MODELS), len(VERIFIER_MODELS))
+
+
+def models_for_tier(tier: int) -> dict:
+    """Return the fixer/verifier models used at a cascade tier."""
+    return {
+        "fixer": FIXER_MODELS[min(tier, len(FIXER_MODELS) - 1)],
+        "verifier": VERIFIER_MODELS[min(tier, len(VERIFIER_MODELS) - 1)],
+    }
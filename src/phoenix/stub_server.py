@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""Minimal OpenAI-compatible chat server used as a local stand-in model.
+
+Run with ``python -m phoenix.stub_server --port 8000`` and set
+``LLM_PROVIDER=local`` to exercise the full Phoenix pipeline without any
+network access or API quota. Every request is answered with a fixed
+final answer, so runs are fast and deterministic. Gemini's
+``generateContent`` endpoint is answered too, and the server counts the
+TCP connections it accepted, so tests can check connection reuse.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = "Thought: I now know the final answer\nFinal Answer: print('Hello from the Phoenix stub model')\nCONFIDENCE: 1.0"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like a real model server
+    reply = DEFAULT_REPLY
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections_opened += 1
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "phoenix-stub", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        with self.server.lock:
+            self.server.requests_served += 1
+        if ":generateContent" in self.path:
+            self._send_json(200, {
+                "candidates": [{"content": {"role": "model", "parts": [{"text": self.reply}]}, "finishReason": "STOP"}],
+                "usageMetadata": {"promptTokenCount": 0, "candidatesTokenCount": 0, "totalTokenCount": 0},
+            })
+            return
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+        self._send_json(200, {
+            "id": f"chatcmpl-stub-{self.server.requests_served}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "phoenix-stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": self.reply},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        })
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0, reply: str = None) -> ThreadingHTTPServer:
+    """Start the stub server on a background thread and return it.
+
+    ``port=0`` picks a free port; the bound address is ``server.server_address``.
+    Call ``server.shutdown()`` when done.
+    """
+    handler = type("ConfiguredStubHandler", (StubHandler,), {"reply": reply or DEFAULT_REPLY})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.requests_served = 0
+    server.connections_opened = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stand-in model server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    server = start_stub_server(args.host, args.port)
+    host, port = server.server_address[:2]
+    print(f"🧪 Phoenix stub model listening on http://{host}:{port}/v1")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+import ast
+import contextvars
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from phoenix import settings
+from phoenix.metrics import metrics
+from phoenix.prompts import extract_code
+from phoenix.sandbox import run_python
+from phoenix.training import read_jsonl
+
+logger = logging.getLogger(__name__)
+
+RESULT_MARKER = "__PHOENIX_TEST__"
+OUTCOMES = ("passed", "failed", "error", "timeout")
+
+# Imports the code under test as module `solution` (also importable as `main`), then runs each test
+# of the shard with its own timer and prints one JSON line per test, so results survive a crashed shard.
+# Code that can't be imported fails every test; tests that can't be loaded are reported once, as a
+# problem of the suite rather than of the code.
+_HARNESS = r'''
+import contextlib, io, json, linecache, signal, sys, time, traceback, types
+
+SOURCE = {source!r}
+TESTS = {tests!r}
+NAMES = {names!r}
+TIMEOUT = {timeout!r}
+MARKER = {marker!r}
+
+
+class TestTimeout(BaseException):
+    pass
+
+
+def on_alarm(signum, frame):
+    raise TestTimeout()
+
+
+def report(test_id, outcome, message="", seconds=0.0):
+    print(MARKER + json.dumps({{"id": test_id, "outcome": outcome, "message": message[:2000],
+                                "seconds": round(seconds, 4)}}), flush=True)
+
+
+def failure_message(error):
+    if str(error):
+        return f"{{type(error).__name__}}: {{error}}"
+    frames = [frame for frame in traceback.extract_tb(error.__traceback__) if frame.filename == "test_solution.py"]
+    line = frames[-1].line if frames else ""
+    return f"{{type(error).__name__}}" + (f" at: {{line}}" if line else "")
+
+
+def resolve(namespace, test_id):
+    if "::" in test_id:
+        class_name, method = test_id.split("::")
+        return getattr(namespace[class_name](), method)
+    return namespace[test_id]
+
+
+# Let tracebacks show the failing lines of the exec'd sources
+for filename, text in (("solution.py", SOURCE), ("test_solution.py", TESTS)):
+    linecache.cache[filename] = (len(text), None, text.splitlines(True), filename)
+
+solution = types.ModuleType("solution")
+solution.__file__ = "solution.py"
+sys.modules["solution"] = sys.modules["main"] = solution
+try:
+    with contextlib.redirect_stdout(io.StringIO()):
+        exec(compile(SOURCE, "solution.py", "exec"), solution.__dict__)
+except BaseException as e:
+    for test_id in NAMES:
+        report(test_id, "error", f"could not import the code: {{type(e).__name__}}: {{e}}")
+    sys.exit(0)
+
+namespace = dict(solution.__dict__, __name__="test_solution")
+try:
+    with contextlib.redirect_stdout(io.StringIO()):
+        exec(compile(TESTS, "test_solution.py", "exec"), namespace)
+except BaseException as e:
+    if isinstance(e, ImportError) and e.name in ("solution", "main"):
+        # The code lacks a name the tests import: that's the code's fault
+        for test_id in NAMES:
+            report(test_id, "error", f"could not import from the code: {{e}}")
+    else:
+        # e.g. the tests import a package the sandbox doesn't have
+        print(MARKER + json.dumps({{"load_error": f"{{type(e).__name__}}: {{e}}"}}), flush=True)
+    sys.exit(0)
+
+signal.signal(signal.SIGALRM, on_alarm)
+for test_id in NAMES:
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            test = resolve(namespace, test_id)
+            signal.setitimer(signal.ITIMER_REAL, TIMEOUT)
+            try:
+                test()
+            finally:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+    except TestTimeout:
+        report(test_id, "timeout", f"exceeded {{TIMEOUT:g}}s", time.perf_counter() - started)
+    except AssertionError as e:
+        report(test_id, "failed", failure_message(e), time.perf_counter() - started)
+    except BaseException as e:
+        outcome = "failed" if type(e).__name__ == "Failed" else "error"  # pytest.fail / pytest.raises
+        report(test_id, outcome, failure_message(e), time.perf_counter() - started)
+    else:
+        report(test_id, "passed", "", time.perf_counter() - started)
+'''
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _takes_no_arguments(function: ast.FunctionDef, method: bool = False) -> bool:
+    args = function.args
+    positional = args.posonlyargs + args.args
+    required = len(positional) - len(args.defaults) - (1 if method else 0)
+    return required <= 0 and not [arg for arg, default in zip(args.kwonlyargs, args.kw_defaults) if default is None]
+
+
+def collect_tests(tests: str) -> list:
+    """Test ids in file order: module-level ``test_*`` functions and ``Test*::test_*`` methods.
+
+    Like pytest, classes with an ``__init__`` are skipped. Fixtures are not
+    supported, so tests that require arguments are skipped too.
+    """
+    ids = []
+    for node in ast.parse(tests).body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if node.name.startswith("test") and isinstance(node, ast.FunctionDef) and _takes_no_arguments(node):
+                ids.append(node.name)
+        elif isinstance(node, ast.ClassDef) and node.name.startswith("Test"):
+            methods = [item for item in node.body if isinstance(item, ast.FunctionDef)]
+            if any(method.name == "__init__" for method in methods):
+                continue
+            ids.extend(f"{node.name}::{method.name}" for method in methods
+                       if method.name.startswith("test") and _takes_no_arguments(method, method=True))
+    return ids
+
+
+def suite_problem(tests: str) -> str:
+    """Why the suite can't be run, e.g. it doesn't parse or has no tests; "" when it can"""
+    try:
+        ids = collect_tests(tests)
+    except SyntaxError as e:
+        return f"the tests don't parse: {e.msg} (line {e.lineno})"
+    return "" if ids else "no test functions found (name them test_*)"
+
+
+class TestReport:
+    """Per-test outcomes of one suite run against one version of the code"""
+
+    def __init__(self, results: list, seconds: float = 0.0, shards: int = 0, error: str = "", cached: bool = False):
+        self.results = results  # [{"id", "outcome", "message", "seconds"}] in collection order
+        self.seconds = seconds
+        self.shards = shards
+        self.error = error
+        self.cached = cached
+
+    @property
+    def counts(self) -> dict:
+        counts = dict.fromkeys(OUTCOMES, 0)
+        for result in self.results:
+            counts[result["outcome"]] += 1
+        return counts
+
+    @property
+    def passed(self) -> int:
+        return self.counts["passed"]
+
+    @property
+    def ok(self) -> bool:
+        return not self.error and bool(self.results) and self.passed == len(self.results)
+
+    def failures(self) -> list:
+        return [result for result in self.results if result["outcome"] != "passed"]
+
+    def to_dict(self) -> dict:
+        return {"passed": self.passed, "total": len(self.results), "counts": self.counts, "error": self.error,
+                "failures": self.failures()}
+
+    def summary(self) -> str:
+        if self.error:
+            return f"Tests could not be run: {self.error}"
+        lines = [f"{self.passed}/{len(self.results)} tests passed"]
+        lines += [f"- {result['id']}: {result['outcome']} {result['message']}".rstrip() for result in self.failures()]
+        return "\n".join(lines)
+
+    @classmethod
+    def from_dict(cls, data: dict, cached: bool = False) -> "TestReport":
+        return cls(data["results"], data.get("seconds", 0.0), data.get("shards", 0), data.get("error", ""), cached)
+
+
+class TestResultCache:
+    """Persistent suite results keyed by (code hash, tests hash, per-test timeout).
+
+    Only the newest `keep` results are kept: the append-only file is
+    rewritten without older and superseded lines when it is loaded with
+    more than that, or grows to twice that.
+    """
+
+    def __init__(self, path: Path = None, keep: int = None):
+        self.path = Path(path or Path(settings.TEST_DIR) / "results.jsonl")
+        self.keep = max(1, settings.TEST_KEEP if keep is None else keep)
+        self._lock = threading.Lock()
+        self._reports = {}
+        records = read_jsonl(self.path)
+        for record in records:
+            self._reports.pop(record["key"], None)
+            self._reports[record["key"]] = record
+        self._lines = len(records)
+        if self._lines > self.keep:
+            self._compact()
+
+    @staticmethod
+    def key(code: str, tests: str, timeout: float) -> str:
+        return f"{_sha(code)}:{_sha(tests)}:{float(timeout):g}"
+
+    def get(self, code: str, tests: str, timeout: float):
+        record = self._reports.get(self.key(code, tests, timeout))
+        return TestReport.from_dict(record, cached=True) if record else None
+
+    def put(self, code: str, tests: str, timeout: float, report: TestReport):
+        record = {"key": self.key(code, tests, timeout), "results": report.results, "seconds": report.seconds,
+                  "shards": report.shards, "error": report.error}
+        with self._lock:
+            self._reports.pop(record["key"], None)
+            self._reports[record["key"]] = record
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+            self._lines += 1
+            if self._lines >= 2 * self.keep:
+                self._compact()
+
+    def _compact(self):
+        self._reports = dict(list(self._reports.items())[-self.keep:])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text("".join(json.dumps(record) + "\n" for record in self._reports.values()), encoding="utf-8")
+        tmp_path.replace(self.path)
+        self._lines = len(self._reports)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def result_cache() -> TestResultCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TestResultCache()
+        return _cache
+
+
+def shard(ids: list, count: int) -> list:
+    """Split test ids round-robin into at most `count` non-empty shards"""
+    count = max(1, min(count, len(ids)))
+    return [ids[index::count] for index in range(count)]
+
+
+def _run_shard(code: str, tests: str, names: list, timeout: float) -> tuple:
+    """(results, why the tests could not be loaded or "") of one shard"""
+    harness = _HARNESS.format(source=code, tests=tests, names=names, timeout=float(timeout), marker=RESULT_MARKER)
+    # The whole shard may take every test's timeout plus interpreter startup and import of the code
+    result = run_python(harness, timeout=timeout * len(names) + settings.SANDBOX_TIMEOUT)
+    results = {}
+    for line in result.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            entry = json.loads(line[len(RESULT_MARKER):])
+            if "load_error" in entry:
+                return [], entry["load_error"]
+            results[entry["id"]] = entry
+    reason = "the test run timed out" if result.timed_out else (result.error() or "the test process exited early")
+    for name in names:
+        results.setdefault(name, {"id": name, "outcome": "error", "message": f"not run: {reason}", "seconds": 0.0})
+    return [results[name] for name in names], ""
+
+
+def run_tests(code: str, tests: str, workers: int = None, timeout: float = None, use_cache: bool = True) -> TestReport:
+    """Run the pytest-style `tests` against `code` in the sandbox, sharded over parallel workers.
+
+    Results are cached per (code, tests, timeout), so re-checking a version that
+    was already tested costs nothing. Runs with a timed-out test are not
+    cached, since the outcome may depend on load. When the tests themselves
+    can't be loaded, the report has an ``error`` and no results.
+    """
+    timeout = timeout or settings.TEST_TIMEOUT
+    cache = result_cache() if use_cache else None
+    if cache is not None:
+        cached = cache.get(code, tests, timeout)
+        if cached is not None:
+            metrics.increment("test_cache_hits")
+            return cached
+
+    started = time.perf_counter()
+    problem = suite_problem(tests)
+    if problem:
+        return TestReport([], error=problem)
+    ids = collect_tests(tests)
+    shards = shard(ids, workers or settings.TEST_WORKERS)
+    with ThreadPoolExecutor(max_workers=len(shards), thread_name_prefix="phoenix-tests") as pool:
+        # Each shard runs in the caller's context so a cancelled run kills its sandboxes
+        futures = [pool.submit(contextvars.copy_context().run, _run_shard, code, tests, names, timeout)
+                   for names in shards]
+        shard_results = [future.result() for future in futures]
+    load_error = next((error for _, error in shard_results if error), "")
+    if load_error:
+        # Not cached: it usually depends on the sandbox (e.g. a missing package), not on the code
+        logger.warning("⚠️ The attached tests could not be loaded: %s", load_error)
+        return TestReport([], time.perf_counter() - started, len(shards),
+                          error=f"the tests could not be loaded: {load_error}")
+    by_id = {result["id"]: result for results, _ in shard_results for result in results}
+    report = TestReport([by_id[test_id] for test_id in ids], time.perf_counter() - started, len(shards))
+
+    metrics.increment("tests_run", len(ids))
+    metrics.increment("test_shards", len(shards))
+    logger.info("🧪 %s/%s tests passed in %.1fs over %s shards", report.passed, len(ids), report.seconds, len(shards))
+    if cache is not None and not report.counts["timeout"]:
+        cache.put(code, tests, timeout, report)
+    return report
+
+
+GENERATE_PROMPT = """Write pytest-style tests for the Python code below.
+
+CODE:
+```python
+{code}
+```
+
+EXPECTED BEHAVIOR: {expected_behavior}
+
+Rules:
+- Test the behavior described above, not the current (possibly buggy) implementation
+- Only plain test_* functions with assert statements; no fixtures, no parameters, no file or network access
+- The code's functions and classes are importable with: from solution import <name>
+- Keep each test fast (well under a second)
+Answer with only the Python test code."""
+
+_generated = {}
+_generated_lock = threading.Lock()
+
+
+def generate_tests(code: str, expected_behavior: str, llm=None) -> str:
+    """Ask the fixer's model once for tests of `expected_behavior`; reused for the same code and behavior"""
+    key = f"{_sha(code)}:{_sha(expected_behavior)}"
+    with _generated_lock:
+        if key in _generated:
+            return _generated[key]
+    if llm is None:
+        from phoenix.providers import get_llm
+        llm = get_llm(settings.models_for_tier(0)["fixer"])
+    prompt = GENERATE_PROMPT.format(code=code, expected_behavior=expected_behavior)
+    tests = extract_code(str(llm.call([{"role": "user", "content": prompt}])))
+    metrics.increment("tests_generated")
+    with _generated_lock:
+        _generated[key] = tests
+    return tests
@@ -0,0 +1,34 @@
+from crewai_tools import CodeInterpreterTool
+from pydantic import PrivateAttr
+
+from phoenix import cancellation
+
+FAILURE_MARKERS = ("Something went wrong while running the code", "An error occurred:", "Traceback (most recent call last)")
+
+
+class SandboxTool(CodeInterpreterTool):
+    """Code interpreter that keeps a transcript of every execution"""
+
+    _transcript: list = PrivateAttr(default_factory=list)
+
+    def _run(self, **kwargs) -> str:
+        cancellation.check("sandbox_runs_avoided")
+        output = super()._run(**kwargs)
+        self._transcript.append({
+            "code": kwargs.get("code", ""),
+            "output": str(output),
+            "failed": any(marker in str(output) for marker in FAILURE_MARKERS),
+        })
+        return output
+
+    @property
+    def transcript(self) -> list:
+        return list(self._transcript)
+
+    @property
+    def failures(self) -> int:
+        """Failed executions, not counting the first: the fixer is told to start by running the broken code"""
+        return sum(1 for entry in self._transcript[1:] if entry["failed"])
+
+    def reset(self):
+        self._transcript.clear()
@@ -0,0 +1,34 @@
+import json
+from typing import Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field, PrivateAttr
+
+from phoenix import cancellation
+from phoenix.prompts import extract_code
+from phoenix.testsuite import run_tests
+
+
+class TestSuiteInput(BaseModel):
+    code: str = Field(..., description="The complete Python program to test")
+
+
+class TestSuiteTool(BaseTool):
+    """Runs the tests attached to the current request against a candidate program"""
+
+    name: str = "Run attached tests"
+    description: str = (
+        "Runs the user's test suite against a complete Python program and returns JSON with the number "
+        "of passed tests and, for each failing test, its outcome (failed, error or timeout) and message."
+    )
+    args_schema: Type[BaseModel] = TestSuiteInput
+    _tests: str = PrivateAttr(default="")
+
+    def attach(self, tests: str):
+        self._tests = tests or ""
+
+    def _run(self, code: str) -> str:
+        cancellation.check("sandbox_runs_avoided")
+        if not self._tests.strip():
+            return "No tests are attached to this request."
+        return json.dumps(run_tests(extract_code(code) or code, self._tests).to_dict(), indent=1)
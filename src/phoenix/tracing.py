@@ -0,0 +1,229 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from phoenix import settings
+
+_current_trace = contextvars.ContextVar("phoenix_trace", default=None)
+_install_lock = threading.Lock()
+_installed = False
+
+
+class Trace:
+    """Spans of one request, exported in the Chrome trace-event format.
+
+    Spans are opened and closed per thread (crewAI runs a crew's tasks, LLM
+    calls and tools on the calling thread), so nesting follows the call
+    stack and every span is written as a complete ("X") event.
+    """
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.started = time.perf_counter()
+        self.events = []
+        self._open = {}  # thread id -> stack of [name, category, start, args]
+        self._step_started = {}  # thread id -> start of the current agent step
+        self._threads = {}
+        self._lock = threading.Lock()
+
+    def _now(self) -> float:
+        return (time.perf_counter() - self.started) * 1e6
+
+    def _tid(self) -> int:
+        ident = threading.get_ident()
+        if ident not in self._threads:
+            self._threads[ident] = len(self._threads) + 1
+            self.events.append({"ph": "M", "name": "thread_name", "pid": 1, "tid": self._threads[ident],
+                                "args": {"name": threading.current_thread().name}})
+        return self._threads[ident]
+
+    def begin(self, name: str, category: str, args: dict = None):
+        with self._lock:
+            self._open.setdefault(self._tid(), []).append([name, category, self._now(), args or {}])
+
+    def end(self, category: str, args: dict = None):
+        """Close the innermost open span of `category`, and any spans left open inside it"""
+        with self._lock:
+            tid = self._tid()
+            stack = self._open.get(tid, [])
+            if not any(span[1] == category for span in stack):
+                return
+            now = self._now()
+            while stack:
+                name, span_category, start, span_args = stack.pop()
+                if span_category == category:
+                    span_args.update(args or {})
+                else:
+                    span_args["unfinished"] = True
+                self._complete(tid, name, span_category, start, now, span_args)
+                if span_category == category:
+                    break
+
+    def step(self, name: str):
+        """Record an agent step that ran from the previous step (or agent start) until now"""
+        with self._lock:
+            tid = self._tid()
+            now = self._now()
+            start = self._step_started.get(tid)
+            if start is not None:
+                self._complete(tid, name, "step", start, now, {})
+            self._step_started[tid] = now
+
+    def start_steps(self):
+        with self._lock:
+            self._step_started[self._tid()] = self._now()
+
+    def _complete(self, tid: int, name: str, category: str, start: float, end: float, args: dict):
+        self.events.append({"ph": "X", "name": name, "cat": category, "pid": 1, "tid": tid,
+                            "ts": round(start, 1), "dur": round(end - start, 1), "args": args})
+
+    def to_json(self) -> dict:
+        with self._lock:
+            for tid, stack in self._open.items():
+                now = self._now()
+                for name, category, start, args in reversed(stack):
+                    self._complete(tid, name, category, start, now, {**args, "unfinished": True})
+                stack.clear()
+            return {"traceEvents": list(self.events), "displayTimeUnit": "ms",
+                    "otherData": {"trace_id": self.trace_id}}
+
+
+class _Span:
+    def __init__(self, trace: Trace, name: str, category: str, args: dict):
+        self.trace = trace
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.trace.begin(self.name, self.category, self.args)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.trace.end(self.category, {"error": repr(exc)} if exc is not None else None)
+        return False
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def span(name: str, category: str = "phoenix", **args):
+    """Context manager timing a block in the current trace; a shared no-op when tracing is off"""
+    trace = _current_trace.get()
+    if trace is None:
+        return _NO_SPAN
+    return _Span(trace, name, category, args)
+
+
+def begin(name: str, category: str = "phoenix", **args):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.begin(name, category, args)
+
+
+def end(category: str = "phoenix", **args):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.end(category, args)
+
+
+def step(name: str = "agent step"):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.step(name)
+
+
+def start(trace_id: str):
+    """Start tracing the current context; returns a handle for finish()"""
+    install()
+    trace = Trace(trace_id)
+    return trace, _current_trace.set(trace)
+
+
+def finish(handle, trace_dir=None) -> Path:
+    """Stop tracing and write the trace file; returns its path"""
+    if handle is None:
+        return None
+    trace, token = handle
+    _current_trace.reset(token)
+    directory = Path(trace_dir or settings.TRACE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{trace.trace_id}.json"
+    path.write_text(json.dumps(trace.to_json()), encoding="utf-8")
+    prune_traces(directory)
+    return path
+
+
+def list_traces(trace_dir=None) -> list:
+    """Trace files, newest first"""
+    directory = Path(trace_dir or settings.TRACE_DIR)
+    if not directory.exists():
+        return []
+    return sorted(directory.glob("*.json"), key=lambda path: path.stat().st_mtime, reverse=True)
+
+
+def prune_traces(trace_dir=None, keep: int = None):
+    keep = settings.TRACE_KEEP if keep is None else keep
+    for path in list_traces(trace_dir)[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def install():
+    """Turn crewAI's events into spans of the current trace (once per process)"""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        from crewai.events import (
+            AgentExecutionCompletedEvent, AgentExecutionErrorEvent, AgentExecutionStartedEvent,
+            CrewKickoffCompletedEvent, CrewKickoffFailedEvent, CrewKickoffStartedEvent, LLMCallCompletedEvent,
+            LLMCallFailedEvent, LLMCallStartedEvent, TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent,
+            ToolUsageErrorEvent, ToolUsageFinishedEvent, ToolUsageStartedEvent, crewai_event_bus,
+        )
+
+        def on(event_type, handler):
+            def traced(source, event):
+                trace = _current_trace.get()
+                if trace is not None:
+                    handler(trace, event)
+            crewai_event_bus.register_handler(event_type, traced)
+
+        on(CrewKickoffStartedEvent, lambda trace, event: trace.begin("crew kickoff", "crew"))
+        on(CrewKickoffCompletedEvent, lambda trace, event: trace.end("crew"))
+        on(CrewKickoffFailedEvent, lambda trace, event: trace.end("crew", {"error": event.error}))
+        on(TaskStartedEvent, lambda trace, event: trace.begin(f"task {getattr(event.task, 'name', '')}", "task"))
+        on(TaskCompletedEvent, lambda trace, event: trace.end("task"))
+        on(TaskFailedEvent, lambda trace, event: trace.end("task", {"error": event.error}))
+
+        def agent_started(trace, event):
+            trace.begin(f"agent {event.agent.role}", "agent")
+            trace.start_steps()
+
+        on(AgentExecutionStartedEvent, agent_started)
+        on(AgentExecutionCompletedEvent, lambda trace, event: trace.end("agent"))
+        on(AgentExecutionErrorEvent, lambda trace, event: trace.end("agent", {"error": event.error}))
+        on(LLMCallStartedEvent, lambda trace, event: trace.begin(f"llm {event.model}", "llm"))
+        on(LLMCallCompletedEvent, lambda trace, event: trace.end("llm"))
+        on(LLMCallFailedEvent, lambda trace, event: trace.end("llm", {"error": event.error}))
+        on(ToolUsageStartedEvent, lambda trace, event: trace.begin(f"tool {event.tool_name}", "tool"))
+        on(ToolUsageFinishedEvent, lambda trace, event: trace.end("tool", {"from_cache": event.from_cache}))
+        on(ToolUsageErrorEvent, lambda trace, event: trace.end("tool", {"error": str(event.error)}))
+        _installed = True
@@ -0,0 +1,308 @@
+import contextlib
+import hashlib
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from phoenix.prompts import build_context
+
+# crewAI agents only pick up trained suggestions from this file in the working directory
+TRAINED_AGENTS_FILE = "trained_agents_data.pkl"
+
+
+def example_id(example: dict) -> str:
+    """Stable ID of a dataset example, so resumed runs survive reordering"""
+    digest = hashlib.sha256()
+    digest.update(example["code"].encode("utf-8"))
+    digest.update(b"\0")
+    digest.update((example.get("expected_behavior") or "").encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def load_dataset(path) -> list:
+    """Load code/expected-behavior pairs from a .jsonl or .json file.
+
+    Each example needs a ``code`` field and may have ``expected_behavior``,
+    ``feedback`` (used by ``phoenix train``) and ``id`` fields.
+    """
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".jsonl":
+        examples = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        examples = json.loads(text)
+    for example in examples:
+        if "code" not in example:
+            raise ValueError(f"Dataset example is missing a 'code' field: {example}")
+        example["expected_behavior"] = example.get("expected_behavior") or ""
+        example["feedback"] = example.get("feedback") or ""
+        example.setdefault("id", example_id(example))
+    return examples
+
+
+def read_jsonl(path: Path) -> list:
+    records = []
+    if path.exists():
+        for line in path.read_text(encoding="utf-8").splitlines():
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                pass  # torn write from an interrupted run
+    return records
+
+
+class BatchRunner:
+    """Runs a dataset through the crew for n iterations on a bounded worker pool.
+
+    This only collects the crew's outputs (e.g. to review them or to build
+    evaluation data); it does not train the agents, see DatasetTrainer.
+    Each worker appends its results to its own ``<filename>.worker-<n>.jsonl``
+    file. Those files double as the progress checkpoint: a rerun skips every
+    (example, iteration) pair already recorded, and the final results of all
+    workers are merged into ``filename``.
+    """
+
+    def __init__(self, crew_factory, dataset: list, n_iterations: int, filename: str, workers: int = 4):
+        self.crew_factory = crew_factory
+        self.dataset = dataset
+        self.n_iterations = n_iterations
+        self.output_path = Path(filename)
+        self.workers = max(1, workers)
+        self._local = threading.local()
+        self._worker_ids = {}
+        self._lock = threading.Lock()
+
+    def _worker_path(self, worker: int) -> Path:
+        return self.output_path.with_name(f"{self.output_path.name}.worker-{worker}.jsonl")
+
+    def _worker_files(self) -> list:
+        return sorted(self.output_path.parent.glob(f"{self.output_path.name}.worker-*.jsonl"))
+
+    def completed(self) -> set:
+        """(example, iteration) pairs that already succeeded; failed ones are retried"""
+        return {
+            (record["id"], record["iteration"])
+            for path in self._worker_files()
+            for record in read_jsonl(path)
+            if not record["error"]
+        }
+
+    def _worker(self):
+        """Per-thread crew and result file"""
+        if not hasattr(self._local, "crew"):
+            with self._lock:
+                worker = self._worker_ids.setdefault(threading.get_ident(), len(self._worker_ids))
+            self._local.crew = self.crew_factory()
+            self._local.path = self._worker_path(worker)
+        return self._local.crew, self._local.path
+
+    def _run_one(self, example: dict, iteration: int) -> dict:
+        crew, path = self._worker()
+        started = time.time()
+        record = {"id": example["id"], "iteration": iteration, "code": example["code"],
+                  "expected_behavior": example["expected_behavior"]}
+        try:
+            result = crew.kickoff(inputs={"context": build_context(example["code"], example["expected_behavior"])})
+            record.update(output=result.raw, tier=result.tier, confidence=result.confidence,
+                          sandbox_failures=result.sandbox_failures, run_id=result.run_id, error=None)
+        except Exception as e:
+            record.update(output=None, error=str(e))
+        record["seconds"] = round(time.time() - started, 3)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        return record
+
+    def run(self) -> list:
+        done = self.completed()
+        pending = [
+            (example, iteration)
+            for iteration in range(self.n_iterations)
+            for example in self.dataset
+            if (example["id"], iteration) not in done
+        ]
+        total = len(self.dataset) * self.n_iterations
+        print(f"📦 Running {len(self.dataset)} examples x {self.n_iterations} iterations "
+              f"({total - len(pending)} already done, {len(pending)} to run, {self.workers} workers)")
+
+        started = time.time()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self._run_one, example, iteration) for example, iteration in pending]
+            for finished, future in enumerate(as_completed(futures), 1):
+                record = future.result()
+                status = "❌" if record["error"] else "✅"
+                print(f"{status} [{finished}/{len(pending)}] example {record['id']} iteration {record['iteration']} "
+                      f"({record['seconds']:.1f}s)")
+
+        results = self.merge()
+        print(f"✅ Batch finished in {time.time() - started:.1f}s, results in {self.output_path}")
+        return results
+
+    def merge(self) -> list:
+        """Merge every worker's results into the output file"""
+        latest = {}  # a successful attempt wins over failed ones
+        for path in self._worker_files():
+            for record in read_jsonl(path):
+                key = (record["id"], record["iteration"])
+                if key not in latest or latest[key]["error"]:
+                    latest[key] = record
+        results = sorted(latest.values(), key=lambda r: (r["id"], r["iteration"]))
+        tmp_path = self.output_path.with_name(self.output_path.name + ".tmp")
+        tmp_path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        tmp_path.replace(self.output_path)
+        return results
+
+
+def training_feedback(example: dict) -> str:
+    """Feedback given to the agents in place of a human reviewer during training"""
+    if example.get("feedback"):
+        return example["feedback"]
+    if example.get("expected_behavior"):
+        return (f"The code must do this: {example['expected_behavior']}\n"
+                "Check the result against it, run it, and fix anything that doesn't match.")
+    return ""
+
+
+@contextlib.contextmanager
+def dataset_feedback(feedback: str):
+    """Answer crewAI's training prompts (normally read with input()) with `feedback`"""
+    from crewai.agents.crew_agent_executor import CrewAgentExecutor
+
+    original = CrewAgentExecutor._ask_human_input
+    CrewAgentExecutor._ask_human_input = lambda executor, final_answer: feedback
+    try:
+        yield
+    finally:
+        CrewAgentExecutor._ask_human_input = original
+
+
+def merge_trained_data(merged: dict, trained: dict, examples: int) -> dict:
+    """Fold one example's trained data (per agent role) into the running merge of `examples` earlier ones"""
+    for role, data in trained.items():
+        current = merged.get(role)
+        if current is None:
+            merged[role] = {"suggestions": list(data["suggestions"]), "quality": data["quality"],
+                            "final_summary": data["final_summary"]}
+            continue
+        current["suggestions"] += [s for s in data["suggestions"] if s not in current["suggestions"]]
+        current["quality"] = (current["quality"] * examples + data["quality"]) / (examples + 1)
+        current["final_summary"] = f"{current['final_summary']}\n{data['final_summary']}".strip()
+    return merged
+
+
+def _factory_path(crew_factory) -> str:
+    return f"{crew_factory.__module__}:{crew_factory.__qualname__}"
+
+
+def _load_factory(path: str):
+    module, _, name = path.partition(":")
+    factory = importlib.import_module(module)
+    for attr in name.split("."):
+        factory = getattr(factory, attr)
+    return factory
+
+
+def train_example(crew_factory, example: dict, n_iterations: int, filename: str):
+    """Run crewAI's Crew.train on one example; both pickle files land in the working directory"""
+    inputs = {"context": build_context(example["code"], example["expected_behavior"])}
+    with dataset_feedback(training_feedback(example)):
+        crew_factory().crew().train(n_iterations=n_iterations, filename=filename, inputs=inputs)
+
+
+class DatasetTrainer:
+    """Trains the crew with crewAI's Crew.train on every example of a dataset.
+
+    crewAI asks a human for feedback on each task's answer during training;
+    here the example's ``feedback`` (or a review request built from its
+    expected behavior) is given instead. crewAI keeps the raw training data
+    in a single file in the working directory, so each example is trained in
+    a subprocess with its own temporary working directory, up to ``workers``
+    at a time. Their suggestions per agent role are merged into ``filename``
+    as they finish. Finished examples are recorded in
+    ``<filename>.progress.jsonl`` and skipped when the run is resumed.
+    """
+
+    WORKER_FILE = "trained.pkl"
+
+    def __init__(self, crew_factory, dataset: list, n_iterations: int, filename: str, workers: int = 4):
+        self.crew_factory = crew_factory
+        self.dataset = dataset
+        self.n_iterations = n_iterations
+        self.output_path = Path(filename)
+        self.progress_path = self.output_path.with_name(self.output_path.name + ".progress.jsonl")
+        self.workers = max(1, workers)
+
+    def _train_in_worker(self, example: dict) -> dict:
+        """Train one example in a subprocess and return its trained data"""
+        from crewai.utilities.training_handler import CrewTrainingHandler
+
+        # The worker imports the same code as this process, whatever its working directory
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(os.path.abspath(path) for path in sys.path if path))
+        with tempfile.TemporaryDirectory(prefix="phoenix-train-") as workdir:
+            (Path(workdir) / "example.json").write_text(json.dumps(example), encoding="utf-8")
+            process = subprocess.run(
+                [sys.executable, "-m", "phoenix.training", _factory_path(self.crew_factory),
+                 "example.json", str(self.n_iterations), self.WORKER_FILE],
+                cwd=workdir, env=env, capture_output=True, text=True,
+            )
+            if process.returncode != 0:
+                lines = (process.stderr or process.stdout).strip().splitlines()
+                raise RuntimeError(lines[-1] if lines else f"training worker exited with {process.returncode}")
+            return CrewTrainingHandler(str(Path(workdir) / self.WORKER_FILE)).load() or {}
+
+    def _train_one(self, example: dict) -> tuple:
+        started = time.time()
+        if not training_feedback(example):
+            return {}, "no feedback or expected_behavior to train on", 0.0
+        try:
+            return self._train_in_worker(example), None, round(time.time() - started, 3)
+        except Exception as e:
+            return {}, str(e), round(time.time() - started, 3)
+
+    def run(self) -> dict:
+        from crewai.utilities.training_handler import CrewTrainingHandler
+
+        if self.output_path.name != TRAINED_AGENTS_FILE:
+            print(f"⚠️ crewAI agents only load trained data from ./{TRAINED_AGENTS_FILE}; "
+                  f"copy {self.output_path} there to use it")
+        done = [record for record in read_jsonl(self.progress_path) if not record["error"]]
+        merged = done[-1]["trained"] if done else {}
+        skipped = {record["id"] for record in done}
+        pending = [example for example in self.dataset if example["id"] not in skipped]
+        print(f"🏋️ Training on {len(self.dataset)} examples x {self.n_iterations} iterations "
+              f"({len(skipped)} already done, {len(pending)} to run, {self.workers} workers)")
+
+        trained_examples = len(done)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self._train_one, example): example for example in pending}
+            for finished, future in enumerate(as_completed(futures), 1):
+                example = futures[future]
+                trained, error, seconds = future.result()
+                record = {"id": example["id"], "error": error}
+                if not error:
+                    merged = merge_trained_data(merged, trained, trained_examples)
+                    trained_examples += 1
+                    record["seconds"] = seconds
+                    CrewTrainingHandler(str(self.output_path)).save(merged)
+                record["trained"] = merged
+                with open(self.progress_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+                status = f"❌ {error}" if error else "✅"
+                print(f"{status} [{finished}/{len(pending)}] example {example['id']}")
+
+        print(f"✅ Training finished: {trained_examples} examples, suggestions for "
+              f"{', '.join(merged) or 'no agents'} in {self.output_path}")
+        return merged
+
+
+if __name__ == "__main__":
+    # Training worker started by DatasetTrainer: <factory> <example.json> <n_iterations> <filename>
+    factory_path, example_path, iterations, trained_file = sys.argv[1:5]
+    train_example(_load_factory(factory_path), json.loads(Path(example_path).read_text(encoding="utf-8")),
+                  int(iterations), trained_file)
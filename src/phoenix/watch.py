@@ -0,0 +1,219 @@
+import difflib
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from phoenix import cancellation, settings
+from phoenix.autofix import autofix, find_error
+from phoenix.indexer import SKIP_DIRS
+from phoenix.metrics import metrics
+from phoenix.prompts import build_context, extract_code
+
+logger = logging.getLogger(__name__)
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def unified_diff(before: str, after: str, name: str) -> str:
+    lines = difflib.unified_diff(before.splitlines(keepends=True), after.splitlines(keepends=True),
+                                 fromfile=f"a/{name}", tofile=f"b/{name}")
+    return "".join(line if line.endswith("\n") else line + "\n" for line in lines)
+
+
+class FileWatcher:
+    """Re-fixes Python files as they are saved.
+
+    The path (a file or a directory) is polled for modification times. A
+    save is handled once the file has been quiet for ``debounce`` seconds,
+    so editors that write in bursts trigger a single fix, and content whose
+    hash was already handled (including Phoenix's own writes) is skipped.
+    A newer save cancels the fix still running for the same file. Files
+    that run cleanly are only reported; failing ones go through the rule
+    engine and then the crew, and the result is reported as a diff.
+    """
+
+    def __init__(self, path, crew_factory, debounce: float = None, interval: float = None, write: bool = False,
+                 workers: int = 2, expected_behavior: str = "", report=print):
+        self.path = Path(path).resolve()
+        self.crew_factory = crew_factory
+        self.debounce = settings.WATCH_DEBOUNCE if debounce is None else debounce
+        self.interval = interval or settings.WATCH_INTERVAL
+        self.write = write
+        self.expected_behavior = expected_behavior
+        self.report = report
+        self.files = {}  # path -> {"stamp", "due", "hash", "token"}
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="phoenix-watch")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _crew(self):
+        if not hasattr(self._local, "crew"):
+            self._local.crew = self.crew_factory()
+        return self._local.crew
+
+    def _name(self, path: Path) -> str:
+        return path.name if self.path.is_file() else str(path.relative_to(self.path))
+
+    def _python_files(self):
+        if self.path.is_file():
+            yield self.path
+            return
+        for dirpath, dirnames, filenames in os.walk(self.path):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+            for filename in filenames:
+                if filename.endswith(".py"):
+                    yield Path(dirpath) / filename
+
+    def _stamps(self) -> dict:
+        stamps = {}
+        for path in self._python_files():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue  # deleted between the walk and the stat
+            stamps[path] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
+
+    def prime(self):
+        """Treat the files as they are now as handled, so only later saves trigger fixes"""
+        for path, stamp in self._stamps().items():
+            try:
+                source = path.read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError):
+                continue
+            self.files[path] = {"stamp": stamp, "due": None, "hash": _hash(source), "token": None}
+
+    def poll(self, now: float = None) -> list:
+        """Scan once; starts fixes for files that settled and returns their paths"""
+        now = time.monotonic() if now is None else now
+        stamps = self._stamps()
+        started = []
+        with self._lock:
+            for path in list(self.files):
+                if path not in stamps:
+                    entry = self.files.pop(path)
+                    if entry["token"]:
+                        entry["token"].cancel("the file was deleted")
+            for path, stamp in stamps.items():
+                entry = self.files.setdefault(path, {"stamp": None, "due": None, "hash": None, "token": None})
+                if entry["stamp"] != stamp:
+                    if entry["due"] is not None:
+                        metrics.increment("watch_saves_debounced")
+                    entry["stamp"] = stamp
+                    entry["due"] = now + self.debounce
+                if entry["due"] is not None and entry["due"] <= now:
+                    entry["due"] = None
+                    if self._start(path, entry):
+                        started.append(path)
+        return started
+
+    def _start(self, path: Path, entry: dict) -> bool:
+        try:
+            source = path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError) as e:
+            self.report(f"⚠️ {self._name(path)}: could not read ({e})")
+            return False
+        source_hash = _hash(source)
+        if source_hash == entry["hash"]:
+            metrics.increment("watch_unchanged_skipped")
+            return False
+        entry["hash"] = source_hash
+        if entry["token"]:
+            entry["token"].cancel("superseded by a newer save")
+        token = cancellation.CancellationToken(label=self._name(path))
+        entry["token"] = token
+        self._pool.submit(self._run, path, source, token)
+        return True
+
+    def _run(self, path: Path, source: str, token: cancellation.CancellationToken):
+        name = self._name(path)
+        try:
+            with cancellation.cancellable(token):
+                self._fix(path, name, source)
+        except cancellation.Cancelled as e:
+            self.report(f"🛑 {name}: fix cancelled ({e})")
+        except Exception as e:
+            self.report(f"❌ {name}: {e}")
+        finally:
+            with self._lock:
+                entry = self.files.get(path)
+                if entry and entry["token"] is token:
+                    entry["token"] = None
+
+    def _fix(self, path: Path, name: str, source: str):
+        started = time.time()
+        # Run the file from the watched root with its own directory on sys.path, as `python <file>` would
+        root = self.path.parent if self.path.is_file() else self.path
+        run_in = {"cwd": root, "extra_path": list(dict.fromkeys([path.parent, root]))}
+        error = find_error(source, **run_in)
+        if error is None:
+            self.report(f"✅ {name}: runs cleanly")
+            return
+        self.report(f"🔍 {name}: {error}, fixing...")
+
+        fixed, fixed_by = None, "crew"
+        if settings.AUTOFIX_ENABLED and not self.expected_behavior:
+            autofixed = autofix(source, error=error, **run_in)
+            if autofixed is not None:
+                fixed, fixed_by = autofixed.code, f"rules: {', '.join(autofixed.applied)}"
+        if fixed is None:
+            cancellation.check()
+            context = build_context(source, self.expected_behavior)
+            context += f"\nFILE: {name}\nERROR WHEN RUNNING: {error}\n"
+            fixed = extract_code(self._crew().kickoff(inputs={"context": context}).raw)
+        cancellation.check()
+
+        seconds = time.time() - started
+        if fixed.strip() == source.strip():
+            self.report(f"🤷 {name}: no changes proposed ({seconds:.1f}s)")
+            return
+        diff = unified_diff(source, fixed, name)
+        self.report(f"🔧 {name}: fixed by {fixed_by} in {seconds:.1f}s\n{diff}".rstrip())
+        metrics.increment("watch_fixes")
+        if self.write:
+            self._write(path, name, source, fixed)
+
+    def _write(self, path: Path, name: str, source: str, fixed: str):
+        with self._lock:
+            entry = self.files.get(path)
+            try:
+                current = path.read_text(encoding="utf-8")
+            except OSError:
+                return
+            if entry is None or _hash(current) != _hash(source):
+                self.report(f"⏭️ {name}: changed on disk since the fix started, not writing")
+                return
+            path.write_text(fixed, encoding="utf-8")
+            stat = path.stat()
+            # Our own write must not trigger another fix
+            entry["stamp"] = (stat.st_mtime_ns, stat.st_size)
+            entry["hash"] = _hash(fixed)
+            entry["due"] = None
+        self.report(f"💾 {name}: written")
+
+    def run(self, stop: threading.Event = None):
+        """Poll until `stop` is set (or Ctrl+C), then cancel whatever is still running"""
+        stop = stop or threading.Event()
+        self.prime()
+        self.report(f"👀 Watching {self.path} ({len(self.files)} files, debounce {self.debounce:g}s)")
+        try:
+            while not stop.is_set():
+                self.poll()
+                stop.wait(self.interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        with self._lock:
+            for entry in self.files.values():
+                if entry["token"]:
+                    entry["token"].cancel("the watcher stopped")
+        self._pool.shutdown(wait=True)
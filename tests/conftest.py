@@ -0,0 +1,28 @@
+import os
+import tempfile
+
+import pytest
+
+from phoenix.stub_server import start_stub_server
+
+# Settings are read at import time, so state goes to a scratch dir and every crew talks to a
+# local stub model before anything from phoenix (other than the stub) is imported
+_stub = start_stub_server()
+os.environ.update({
+    "PHOENIX_HOME": tempfile.mkdtemp(prefix="phoenix-tests-"),
+    "LLM_PROVIDER": "local",
+    "LLM_BASE_URL": "http://%s:%s/v1" % _stub.server_address[:2],
+    "GOOGLE_API_KEY": "test-key",
+    "CREWAI_DISABLE_TELEMETRY": "true",
+    "CREWAI_TRACING_ENABLED": "false",
+    "OTEL_SDK_DISABLED": "true",
+    "PROFILE_ENABLED": "false",
+    "BENCHMARK_ENABLED": "false",
+    "SANDBOX_BACKEND": "host",
+})
+
+
+@pytest.fixture
+def crew_stub():
+    """The stub model every crew in the test session talks to"""
+    return _stub
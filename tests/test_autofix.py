@@ -0,0 +1,29 @@
+import pytest
+
+from phoenix.autofix import autofix
+from phoenix.incremental import IncrementalSession
+
+
+@pytest.mark.parametrize("code, fixed", [
+    ("tokens = [1, 2]\nprint(token)\n", "tokens = [1, 2]\nprint(tokens)\n"),
+    ("fields = [1]\nresult = field\nprint(result)\n", "fields = [1]\nresult = fields\nprint(result)\n"),
+    ("times = 3\nprint(time)\n", "times = 3\nprint(times)\n"),
+])
+def test_close_local_names_win_over_imports(code, fixed):
+    result = autofix(code)
+    assert result.applied == ["misspelled_name"] and result.code == fixed
+
+
+def test_missing_import_when_nothing_local_is_close():
+    result = autofix("print(math.sqrt(4))\n")
+    assert result.applied == ["missing_import"] and result.code.startswith("import math\n")
+
+
+def test_plan_programs_keep_earlier_fixes():
+    session = IncrementalSession()
+    session.remember("def total(xs):\n    return sum(xs\n\n\nprint(total([1]))\n",
+                     "def total(xs):\n    return sum(xs)\n\n\nprint(total([1]))\n")
+    plan = session.plan("def total(xs):\n    return sum(xs\n\n\nprint(totl([1]))\n")
+
+    result = autofix(session.assemble(plan))
+    assert result.code == "def total(xs):\n    return sum(xs)\n\n\nprint(total([1]))\n"
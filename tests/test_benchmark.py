@@ -0,0 +1,35 @@
+from types import SimpleNamespace
+
+from phoenix import cascade
+from phoenix.cascade import FixResult
+from phoenix.crew import Phoenix
+
+
+def answer(fixed: str, optimized: str) -> FixResult:
+    fix_output = SimpleNamespace(name="fix_task", raw=f"```python\n{fixed}\n```")
+    return FixResult(raw=f"```python\n{optimized}\n```", tier=0, models={}, tasks_output=[fix_output])
+
+
+def test_gate_rejects_changed_behavior():
+    result = answer("print(sum(range(10)))", "print(sum(range(11)))")
+    Phoenix(benchmark=True)._benchmark_gate(result)
+
+    assert result.benchmark is not None and not result.benchmark.accepted
+    assert "range(10)" in result.raw
+
+
+def test_gate_is_skipped_when_the_fixed_code_fails():
+    result = answer("raise ValueError('still broken')", "print('works')")
+    Phoenix(benchmark=True)._benchmark_gate(result)
+
+    assert result.benchmark is None
+    assert "works" in result.raw
+
+
+def test_partial_programs_are_not_benchmarked(monkeypatch):
+    phoenix = Phoenix(benchmark=True)
+    monkeypatch.setattr(cascade.ModelCascade, "kickoff",
+                        lambda self, inputs, start_tier=0: answer("print(1)", "print(2)"))
+
+    assert phoenix.kickoff({"context": "def changed(): ..."}, partial=True).benchmark is None
+    assert phoenix.kickoff({"context": "print(1)"}).benchmark is not None
@@ -0,0 +1,42 @@
+import time
+
+from phoenix.cancellation import SessionRegistry
+
+
+def test_a_new_submission_supersedes_the_running_one():
+    registry = SessionRegistry()
+    first = registry.submit("session", "print(1)")
+    second = registry.submit("session", "print(2)")
+
+    assert first.cancelled and first.reason == "superseded by a newer submission"
+    assert not second.cancelled
+
+    registry.finish("session", first)  # the superseded run finishing late changes nothing
+    assert registry.in_flight("session")
+    registry.finish("session", second)
+    assert not registry.in_flight("session")
+
+
+def test_editing_the_code_cancels_the_run():
+    registry = SessionRegistry()
+    token = registry.submit("session", "print(1)")
+
+    registry.touch("session", "print(1)")
+    registry.touch("session")
+    assert not token.cancelled
+
+    registry.touch("session", "print(2)")
+    assert token.cancelled and "edited" in token.reason
+
+
+def test_reap_cancels_runs_of_idle_and_closed_sessions():
+    alive = {"open", "idle"}
+    registry = SessionRegistry(idle_seconds=0.05, is_alive=lambda session_id: session_id in alive)
+    idle = registry.submit("idle")
+    time.sleep(0.1)
+    running, closed = registry.submit("open"), registry.submit("closed")
+    registry.finish("idle", idle)
+
+    assert registry.reap() == 1  # the idle session had no run left to cancel
+    assert closed.cancelled and not running.cancelled
+    assert not registry.in_flight("closed") and registry.in_flight("open")
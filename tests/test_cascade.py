@@ -0,0 +1,112 @@
+from types import SimpleNamespace
+
+import pytest
+
+from phoenix import settings
+from phoenix.cancellation import Cancelled
+from phoenix.cascade import ModelCascade, split_confidence
+from phoenix.metrics import metrics
+from phoenix.testsuite import TestReport
+from phoenix.tools.sandbox_tool import SandboxTool
+
+
+class FakeTier:
+    """Stands in for a Phoenix crew bound to one tier"""
+
+    def __init__(self, tier, calls, raw="print(1)", failures=0, tests=None, error=None):
+        self.tier, self.calls, self.last_profile = tier, calls, None
+        self.raw, self.failures, self.tests, self.error = raw, failures, tests, error
+
+    def reset_sandbox(self):
+        pass
+
+    def crew(self, task_callback=None):
+        self.calls.append(self.tier)
+        if self.error:
+            raise self.error
+        return SimpleNamespace(kickoff=lambda inputs: SimpleNamespace(raw=self.raw, tasks_output=[]))
+
+    def sandbox_failures(self):
+        return self.failures
+
+    def sandbox_transcript(self):
+        return []
+
+    def run_attached_tests(self, raw):
+        return self.tests
+
+
+@pytest.fixture
+def three_tiers(monkeypatch):
+    monkeypatch.setattr(settings, "tier_count", lambda: 3)
+
+
+def run(tiers: dict, **policy):
+    """Kick off a cascade whose tier N behaves as FakeTier(**tiers.get(N, {}))"""
+    calls = []
+    result = ModelCascade(lambda tier: FakeTier(tier, calls, **tiers.get(tier, {})), **policy).kickoff({"context": "x"})
+    return result, calls
+
+
+def test_escalates_at_the_failure_threshold(three_tiers):
+    result, calls = run({0: {"failures": 3}, 1: {"failures": 4}}, escalate_after=3)
+    assert calls == [0, 1, 2] and result.tier == 2 and result.escalations == 2
+
+    result, calls = run({0: {"failures": 2}}, escalate_after=3)
+    assert calls == [0] and result.sandbox_failures == 2
+
+
+def test_the_fixers_first_run_is_not_a_failure():
+    tool = SandboxTool()
+    tool._transcript.extend({"code": "", "output": "", "failed": True} for _ in range(3))
+    assert tool.failures == 2
+
+
+def test_escalates_on_low_confidence(three_tiers):
+    result, calls = run({0: {"raw": "print(1)\nCONFIDENCE: 0.3"}, 1: {"raw": "print(2)\nCONFIDENCE: 0.9"}},
+                        min_confidence=0.6)
+    assert calls == [0, 1] and result.raw == "print(2)" and result.confidence == 0.9
+
+
+def test_last_tier_answers_even_when_it_fails(three_tiers):
+    result, calls = run({tier: {"raw": "x\nCONFIDENCE: 0.1"} for tier in range(3)}, min_confidence=0.6)
+    assert calls == [0, 1, 2] and result.tier == 2 and result.confidence == 0.1
+
+
+def test_escalate_after_zero_escalates_every_tier(three_tiers):
+    result, calls = run({}, escalate_after=0)
+    assert calls == [0, 1, 2] and result.tier == 2
+
+
+def test_raising_tier_escalates_but_the_last_one_raises(three_tiers):
+    result, calls = run({0: {"error": RuntimeError("bad answer")}})
+    assert calls == [0, 1] and result.tier == 1
+
+    with pytest.raises(RuntimeError):
+        run({tier: {"error": RuntimeError("bad answer")} for tier in range(3)})
+
+
+def test_unusable_suite_does_not_escalate(three_tiers):
+    unusable = TestReport([], error="no test functions found (name them test_*)")
+    result, calls = run({0: {"tests": unusable}})
+    assert calls == [0] and result.tier == 0
+
+
+@pytest.mark.parametrize("text, stripped, confidence", [
+    ("print(1)\nCONFIDENCE: 0.85\n", "print(1)", 0.85),
+    ("print(1)\n  confidence: 1\n", "print(1)", 1.0),
+    ("print(1)\nCONFIDENCE: 0.2\nCONFIDENCE: 0.7", "print(1)", 0.7),
+    ("print('CONFIDENCE: 0.5')", "print('CONFIDENCE: 0.5')", None),
+    ("print(1)", "print(1)", None),
+])
+def test_split_confidence(text, stripped, confidence):
+    assert split_confidence(text) == (stripped, confidence)
+
+
+def test_cancelled_runs_are_not_tier_failures(three_tiers):
+    before = metrics.tier_stats()
+
+    with pytest.raises(Cancelled):
+        run({0: {"error": Cancelled("superseded by a newer submission")}})
+
+    assert metrics.tier_stats() == before
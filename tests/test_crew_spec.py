@@ -0,0 +1,58 @@
+import os
+import shutil
+
+import pytest
+
+from phoenix import settings
+from phoenix.crew_spec import load_spec
+
+
+@pytest.fixture
+def config_dir(tmp_path):
+    target = tmp_path / "config"
+    shutil.copytree(settings.CREW_CONFIG_DIR, target)
+    return target
+
+
+def touch(path, seconds: int):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 10**9))
+
+
+def test_deleted_config_keeps_the_cached_spec(config_dir):
+    spec = load_spec(str(config_dir))
+    (config_dir / "tasks.yaml").rename(config_dir / "tasks.yaml.bak")
+
+    assert load_spec(str(config_dir)) is spec
+
+
+def test_broken_edit_keeps_the_cached_spec_unchanged(config_dir):
+    spec = load_spec(str(config_dir))
+    version = spec.version
+    tasks = config_dir / "tasks.yaml"
+    good = tasks.read_text()
+
+    tasks.write_text("fix_task: [unclosed")
+    touch(tasks, 1)
+    assert load_spec(str(config_dir)) is spec
+    assert spec.version == version
+
+    tasks.write_text(good + "\n")
+    touch(tasks, 2)
+    reloaded = load_spec(str(config_dir))
+    assert reloaded is not spec and reloaded.version != version
+
+
+@pytest.mark.parametrize("file, old, new", [
+    ("agents.yaml", "- sandbox", "- sandbx"),
+    ("tasks.yaml", "verify_task:", "verify:"),
+])
+def test_edit_the_crew_cannot_run_keeps_the_cached_spec(config_dir, file, old, new):
+    spec = load_spec(str(config_dir))
+    path = config_dir / file
+    assert old in path.read_text()
+
+    path.write_text(path.read_text().replace(old, new))
+    touch(path, 1)
+
+    assert load_spec(str(config_dir)) is spec
@@ -0,0 +1,99 @@
+import json
+from types import SimpleNamespace
+
+from phoenix import evaluation, providers
+from phoenix.evaluation import Evaluator, JudgeCache
+
+
+class CountingScheduler:
+    def __init__(self):
+        self.acquired = 0
+
+    def acquire(self):
+        self.acquired += 1
+
+    def succeeded(self):
+        pass
+
+
+class Result:
+    tier = 0
+
+    def __init__(self, raw):
+        self.raw = raw
+
+
+class TwoCallCrew:
+    """Stands in for a crew run: two LLM requests through the shared clients"""
+
+    def kickoff(self, inputs):
+        llm = providers.get_llm("openai/phoenix-stub")
+        llm.call([{"role": "user", "content": "fix"}])
+        return Result(llm.call([{"role": "user", "content": "verify"}]))
+
+
+def test_every_llm_request_takes_a_rate_limit_slot(tmp_path):
+    judge = providers.get_llm("openai/phoenix-judge")
+    corpus = [{"id": "case", "code": "print(x)", "expected_behavior": ""}]
+    evaluator = Evaluator(TwoCallCrew, judge, corpus, workers=1, output_dir=tmp_path)
+    evaluator.scheduler = CountingScheduler()
+
+    report = evaluator.run()
+
+    assert report["errors"] == 0
+    assert evaluator.scheduler.acquired == 3  # two crew requests and the judge
+    assert json.loads((tmp_path / "report.json").read_text())["cases"] == 1
+
+
+def test_empty_corpus_still_writes_a_report(tmp_path):
+    output_dir = tmp_path / "missing" / "eval"
+    report = Evaluator(TwoCallCrew, None, [], output_dir=output_dir).run()
+
+    assert report["cases"] == 0
+    assert (output_dir / "report.json").exists()
+
+
+def test_judge_cache_is_keyed_on_the_original_code(tmp_path):
+    cache = JudgeCache(tmp_path / "judge_cache.jsonl")
+    cache.put("print(x)", "print(1)", "rubric", 9.0, "fine")
+
+    assert cache.get("print(x)", "print(1)", "rubric")["score"] == 9.0
+    assert cache.get("print(y)", "print(1)", "rubric") is None
+
+
+class RateLimitedCrew:
+    kickoffs = 0
+
+    def kickoff(self, inputs):
+        RateLimitedCrew.kickoffs += 1
+        raise RuntimeError("429 Too Many Requests")
+
+
+class BackoffScheduler(CountingScheduler):
+    backoffs = 0
+
+    def backoff(self):
+        self.backoffs += 1
+        return 5.0
+
+
+def test_rate_limited_crew_runs_are_not_rerun(tmp_path):
+    corpus = [{"id": "case", "code": "print(x)", "expected_behavior": ""}]
+    evaluator = Evaluator(RateLimitedCrew, None, corpus, workers=1, output_dir=tmp_path)
+    evaluator.scheduler = BackoffScheduler()
+
+    report = evaluator.run()
+
+    assert report["errors"] == 1
+    assert RateLimitedCrew.kickoffs == 1  # the cascade retries transient errors itself
+    assert evaluator.scheduler.backoffs == 1  # but every worker still slows down
+
+
+def test_fingerprint_changes_with_the_crew_config(monkeypatch):
+    case = {"id": "case", "code": "print(x)", "expected_behavior": ""}
+    evaluator = Evaluator(TwoCallCrew, None, [case])
+    before = evaluator.fingerprint(case, 0)
+
+    monkeypatch.setattr(evaluation, "load_spec", lambda: SimpleNamespace(digest="edited prompts"))
+
+    assert evaluator.fingerprint(case, 0) != before
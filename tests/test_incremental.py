@@ -0,0 +1,63 @@
+from phoenix.incremental import IncrementalSession, split_units
+
+PROGRAM = '''import os
+
+@cache
+@retry(times=3)
+def load(path):
+    return open(path).read(
+
+
+SETTINGS = dict(
+    debug=True,
+)
+print(load(os.sep))
+'''
+
+
+def keys(code):
+    return [key for key, _ in split_units(code)]
+
+
+def test_decorators_and_brackets_stay_with_their_unit():
+    units = dict(split_units(PROGRAM))
+
+    assert list(units) == ["__module_0", "load", "__module_1"]
+    assert units["load"].startswith("@cache\n@retry(times=3)\ndef load(path):")
+    assert units["__module_1"] == "SETTINGS = dict(\n    debug=True,\n)\nprint(load(os.sep))\n"
+
+
+def test_definitions_inside_strings_and_redefinitions():
+    code = 'HELP = """\nUsage:\ndef x():\n"""\n\ndef f():\n    pass\n\ndef f():\n    return 1\n'
+
+    assert keys(code) == ["__module_0", "f", "f#2"]
+    assert dict(split_units(code))["__module_0"].startswith('HELP = """\nUsage:\ndef x():\n"""')
+
+
+def test_module_code_is_not_reused_when_the_fix_merged_segments():
+    session = IncrementalSession()
+    code = "x = 1\n\ndef f():\n    return x\n\nprint(f())\n"
+    session.remember(code, "x = 1\nprint(f())\n\ndef f():\n    return x\n")
+
+    plan = session.plan(code)
+
+    assert list(plan.reused) == ["f"]
+    assert plan.changed == ["__module_0", "__module_1"]
+
+
+def test_assemble_maps_renumbered_module_code_and_places_new_helpers():
+    session = IncrementalSession()
+    session.remember("def a():\n    return 1\n\nprint(a())\n\ndef b():\n    retrun 2\n\nprint(b())\n",
+                     "def a():\n    return 1\n\nprint(a())\n\ndef b():\n    return 2\n\nprint(b())\n")
+    plan = session.plan("def a():\n    return 1\n\nprint(a()\n\ndef b():\n    retrun 3\n\nprint(b())\n")
+    assert plan.changed == ["__module_0", "b"]
+
+    # The crew only sees the changed units, so its module code comes back as __module_0 after a new helper
+    answer = "def three():\n    return 3\n\nprint(a())\n\ndef b():\n    return three()\n"
+
+    assert session.assemble(plan, answer) == (
+        "def a():\n    return 1\n\nprint(a())\n\n"
+        "def three():\n    return 3\n\n"
+        "def b():\n    return three()\n\n"
+        "print(b())\n"
+    )
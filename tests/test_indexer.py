@@ -0,0 +1,42 @@
+from phoenix import settings
+from phoenix.indexer import ProjectIndex
+
+
+def make_project(tmp_path):
+    root = tmp_path / "shop"
+    (root / "shop").mkdir(parents=True)
+    (root / "shop" / "__init__.py").write_text("")
+    (root / "shop" / "cart.py").write_text("def total(items):\n    return sum(items)\n\n\ndef field():\n    pass\n")
+    (root / "shop" / "tax.py").write_text("def rate(region):\n    '''VAT rate'''\n    return 0.2\n")
+    (root / "shop" / "logging.py").write_text("def info(message):\n    pass\n")
+    index = ProjectIndex(root, index_dir=tmp_path / "index")
+    index.update()
+    return index
+
+
+def names(symbols):
+    return sorted(f"{symbol['module']}.{symbol['name']}" for symbol in symbols)
+
+
+def test_only_imported_project_names_are_resolved(tmp_path):
+    index = make_project(tmp_path)
+    code = "from shop.cart import total\nimport shop.tax as tax\n\nfield = 1\nprint(total([field]), tax.rate('EU'))\n"
+
+    assert names(index.referenced_symbols(code)) == ["shop.cart.total", "shop.tax.rate"]
+
+
+def test_module_imports_and_broken_code(tmp_path):
+    index = make_project(tmp_path)
+
+    assert names(index.referenced_symbols("from shop import cart\ncart.total([1])\n")) == ["shop.cart.total"]
+    # Doesn't parse: falls back to scanning imports and dotted names
+    broken = "import shop.tax\nfrom shop.cart import (total\nprint(shop.tax.rate('EU')\n"
+    assert names(index.referenced_symbols(broken)) == ["shop.cart.total", "shop.tax.rate"]
+    broken = "from shop.cart import (\n    total,\n    field,\n)\nfrom shop import tax\nprint(total([1]) tax.rate('EU'))\n"
+    assert names(index.referenced_symbols(broken)) == ["shop.cart.field", "shop.cart.total", "shop.tax.rate"]
+    # A stdlib import is not taken for the package's own logging module
+    assert index.referenced_symbols("import logging\nlogging.info('x')\n") == []
+
+
+def test_index_lives_under_phoenix_home():
+    assert settings.INDEX_DIR.startswith(settings.PHOENIX_HOME)
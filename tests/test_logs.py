@@ -0,0 +1,56 @@
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from phoenix.logs import LogPager, job_logging, resolve_level
+
+
+def test_resolve_level():
+    assert resolve_level("verbose") == logging.DEBUG
+    assert resolve_level("WARNING") == logging.WARNING
+    assert resolve_level(5) == 5
+    with pytest.raises(ValueError):
+        resolve_level("chatty")
+
+
+def test_pagers_do_not_share_a_lock(tmp_path):
+    assert LogPager(tmp_path / "a.log")._lock is not LogPager(tmp_path / "b.log")._lock
+
+
+def test_verbose_transcripts_go_to_the_job_log_not_crewai(capsys):
+    from phoenix.crew import Phoenix
+
+    phoenix = Phoenix(verbose=True)
+    crew = phoenix.crew()
+    assert not crew.verbose and not any(agent.verbose for agent in crew.agents)
+
+    with job_logging("verbose-job", "verbose") as job:
+        phoenix._on_step(SimpleNamespace(text="Thought: the loop is off by one"))
+        crew.tasks[0].callback(SimpleNamespace(name="fix_task", raw="FIXED CODE: print(1)"))
+
+    assert "Thought: the loop is off by one" in job.tail()
+    assert "task fix_task output: FIXED CODE: print(1)" in job.tail()
+    assert "off by one" not in capsys.readouterr().out
+
+
+def test_pager_reads_rotated_backups_oldest_first(tmp_path):
+    log = tmp_path / "job.log"
+    (tmp_path / "job.log.2").write_text("1\n2\n", encoding="utf-8")
+    (tmp_path / "job.log.1").write_text("3\n4\n5\n", encoding="utf-8")
+    log.write_text("6\n", encoding="utf-8")
+    pager = LogPager(log, page_size=2)
+
+    assert pager.line_count() == 6
+    assert [pager.page(n) for n in range(1, 4)] == ["1\n2\n", "3\n4\n", "5\n6\n"]
+
+    # rollover with two backups kept: .2 is dropped, .1 becomes .2 and the live file .1
+    (tmp_path / "job.log.1").replace(tmp_path / "job.log.2")
+    log.replace(tmp_path / "job.log.1")
+    with open(log, "a", encoding="utf-8") as f:
+        f.write("7\npartial")
+
+    assert pager.line_count() == 5
+    assert pager.page(2) == "5\n6\n"
+    assert pager.page(3) == "7\n"
+    assert pager.page(4) == ""
@@ -0,0 +1,31 @@
+from phoenix.profiler import ProfileReport, profile_code
+
+SPIN = '''
+def spin():
+    while True:
+        pass
+
+
+def slow_sum(n):
+    return sum(i * i for i in range(n))
+
+
+slow_sum(1000)
+spin()
+'''
+
+
+def test_runaway_code_still_gets_a_partial_profile():
+    report = profile_code(SPIN, limit=1)
+
+    assert report.ok and report.timed_out and not report.error
+    assert report.hotspots[0]["location"].endswith("(spin)")
+    summary = report.summary()
+    assert "stopped after 1s" in summary
+    assert "user_code.py:2(spin)" in summary
+
+
+def test_summary_of_a_failed_profile():
+    assert ProfileReport(failure="sandbox unavailable").summary() == "Profiling failed: sandbox unavailable"
+    report = profile_code("import sys\nsys.exit(3)\n", limit=2)
+    assert report.error == "SystemExit: 3" and not report.timed_out
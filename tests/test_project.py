@@ -0,0 +1,56 @@
+from phoenix import settings
+from phoenix.project import ProjectFixer, upload_workdir
+
+
+def no_crew():
+    raise AssertionError("no module should need the crew")
+
+
+def write_project(root, helper="def value():\n    return 1\n"):
+    root.mkdir(exist_ok=True)
+    (root / "helper.py").write_text(helper)
+    (root / "app.py").write_text("from helper import value\n\nRESULT = value()\n")
+
+
+def statuses(fixer):
+    return {status["module"]: (status["status"], status["changed"]) for status in fixer.run()}
+
+
+def test_edited_clean_module_rechecks_its_dependents(tmp_path):
+    source, output = tmp_path / "source", tmp_path / "output"
+    write_project(source)
+    assert statuses(ProjectFixer(source, no_crew, output_dir=output)) == {
+        "helper": ("ok", True), "app": ("ok", True)}
+    assert statuses(ProjectFixer(source, no_crew, output_dir=output))["app"] == ("unchanged", False)
+
+    write_project(source, helper="def value():\n    return 2\n")
+    assert statuses(ProjectFixer(source, no_crew, output_dir=output)) == {
+        "helper": ("ok", True), "app": ("ok", False)}
+
+
+def test_output_keeps_fixes_of_files_unchanged_in_the_source(tmp_path):
+    source, output = tmp_path / "source", tmp_path / "output"
+    write_project(source)
+    ProjectFixer(source, no_crew, output_dir=output).run()
+    (output / "app.py").write_text("from helper import value\n\nRESULT = value()  # fixed\n")
+
+    (source / "helper.py").write_text("def value():\n    return 3\n")
+    (source / "extra.py").write_text("X = 1\n")
+    ProjectFixer(source, no_crew, output_dir=output).run()
+
+    assert "# fixed" in (output / "app.py").read_text()
+    assert "return 3" in (output / "helper.py").read_text()
+    assert (output / "extra.py").exists()
+
+
+def test_upload_workdirs_are_keyed_on_content_and_pruned(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "PROJECT_UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(settings, "PROJECT_UPLOAD_KEEP", 2)
+
+    first = upload_workdir(b"one")
+    assert upload_workdir(b"one") == first
+    upload_workdir(b"two")
+    upload_workdir(b"three")
+
+    assert not first.exists()
+    assert len(list((tmp_path / "uploads").iterdir())) == 2
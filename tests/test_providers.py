@@ -0,0 +1,73 @@
+import litellm
+import pytest
+
+from phoenix import providers, settings
+from phoenix.stub_server import start_stub_server
+
+
+@pytest.fixture
+def stub():
+    server = start_stub_server(reply="pong")
+    host, port = server.server_address[:2]
+    yield server, f"http://{host}:{port}"
+    server.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def fresh_clients(monkeypatch):
+    monkeypatch.setattr(providers, "_llms", {})
+
+
+@pytest.fixture
+def pooled_requests():
+    """URLs of the requests sent through Phoenix's shared connection pool"""
+    providers.install_connection_pool()
+    hooks = litellm.client_session.event_hooks
+    sent = []
+    record = lambda request: sent.append(str(request.url))
+    hooks["request"].append(record)
+    yield sent
+    hooks["request"].remove(record)
+
+
+def test_local_provider_reuses_pooled_connections(stub, pooled_requests, monkeypatch):
+    server, url = stub
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "local")
+    monkeypatch.setattr(settings, "LLM_BASE_URL", f"{url}/v1")
+
+    llm = providers.get_llm("openai/phoenix-stub")
+    for _ in range(5):
+        assert llm.call([{"role": "user", "content": "ping"}]) == "pong"
+
+    assert server.requests_served == 5
+    assert server.connections_opened == 1
+    assert len(pooled_requests) == 5
+
+
+def test_gemini_provider_shares_the_pool(stub, pooled_requests, monkeypatch):
+    server, url = stub
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "gemini")
+
+    llm = providers.get_llm("gemini/gemini-2.5-flash")
+    # LiteLLM appends ":generateContent" to a custom base; the stub answers it in place of Google's API
+    llm.api_base = f"{url}/v1beta/models/gemini-2.5-flash"
+    for _ in range(3):
+        assert llm.call([{"role": "user", "content": "ping"}]) == "pong"
+
+    assert server.requests_served == 3
+    assert server.connections_opened == 1
+    assert len(pooled_requests) == 3 and all(":generateContent" in sent for sent in pooled_requests)
+
+
+def test_llms_are_created_once_per_model(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "local")
+    assert providers.get_llm("openai/a") is providers.get_llm("openai/a")
+    assert providers.get_llm("openai/a") is not providers.get_llm("openai/b")
+
+
+def test_transient_errors_are_recognized():
+    assert providers.is_transient_error(litellm.RateLimitError("slow down", "openai", "m"))
+    wrapped = RuntimeError("crew failed")
+    wrapped.__cause__ = litellm.Timeout("timed out", "m", "openai")
+    assert providers.is_transient_error(wrapped)
+    assert not providers.is_transient_error(ValueError("the answer was wrong"))
@@ -0,0 +1,33 @@
+import pytest
+
+from phoenix.cascade import ModelCascade
+from phoenix.checkpoints import CheckpointStore
+from phoenix.crew import Phoenix
+
+
+def test_replay_leaves_cached_tasks_untouched(crew_stub):
+    phoenix = Phoenix()
+    first = phoenix.kickoff(inputs={"context": "print('hi')"})
+    verify_task, fix_task = phoenix.verify_task(), phoenix.fix_task()
+    context_before, output_before = verify_task.context, fix_task.output
+
+    replayed = phoenix.replay("verify_task", run_id=first.run_id)
+
+    assert replayed.run_id != first.run_id
+    assert CheckpointStore().load(replayed.run_id)["replayed_from"] == first.run_id
+    assert phoenix.verify_task() is verify_task
+    assert verify_task.context is context_before
+    assert fix_task.output is output_before
+
+
+def test_failed_runs_are_garbage_collected(monkeypatch):
+    store = CheckpointStore()
+    collected = []
+    monkeypatch.setattr(store, "gc", lambda: collected.append(True))
+
+    def broken_tier(tier):
+        raise RuntimeError("no crew")
+
+    with pytest.raises(RuntimeError):
+        ModelCascade(broken_tier, store=store).kickoff({"context": "x"})
+    assert collected
@@ -0,0 +1,34 @@
+import pytest
+
+from phoenix import sandbox, settings
+from phoenix.sandbox import run_python
+
+
+def test_host_backend_limits_the_child(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "SANDBOX_MEMORY_MB", 256)
+    result = run_python("import resource\nprint(resource.getrlimit(resource.RLIMIT_AS)[0])")
+    assert result.ok and int(result.stdout) == 256 * 1024 * 1024
+
+    (tmp_path / "helper.py").write_text("VALUE = 42\n")
+    result = run_python(args=["-c", "import sys, helper; print(helper.VALUE, sys.argv[1:])", "arg"],
+                        extra_path=[tmp_path])
+    assert result.stdout.strip() == "42 ['arg']"
+
+
+def test_docker_backend_runs_without_network_and_mounts_read_only(monkeypatch, tmp_path):
+    monkeypatch.setattr(sandbox.shutil, "which", lambda name: "/usr/bin/docker")
+    scratch, project = tmp_path / "scratch", tmp_path / "project"
+    command, _, _ = sandbox._docker_command([str(scratch / "main.py"), "-x"], str(scratch), project,
+                                            [project], "phoenix-sandbox-test")
+
+    assert command[:2] == ["docker", "run"]
+    assert "--network" in command and command[command.index("--network") + 1] == "none"
+    assert f"{scratch}:/sandbox" in command and f"{project}:/work:ro" in command
+    assert command[-2:] == ["/sandbox/main.py", "-x"]
+    assert "PHOENIX_SANDBOX_PATH=/work" in command
+
+
+def test_unknown_backend_is_refused(monkeypatch):
+    monkeypatch.setattr(settings, "SANDBOX_BACKEND", "chroot")
+    with pytest.raises(ValueError, match="SANDBOX_BACKEND"):
+        run_python("print(1)")
@@ -0,0 +1,36 @@
+from phoenix.testsuite import TestResultCache, run_tests, suite_problem
+
+CODE = "def double(x):\n    return 2 * x\n"
+TESTS = "from solution import double\n\ndef test_double():\n    assert double(2) == 4\n"
+
+
+def test_suite_problems():
+    assert suite_problem(TESTS) == ""
+    assert "don't parse" in suite_problem("def test_(:\n")
+    assert "no test functions" in suite_problem("x = 1\n")
+
+
+def test_cache_is_keyed_on_the_timeout_and_compacted(tmp_path):
+    cache = TestResultCache(tmp_path / "results.jsonl", keep=3)
+    report = run_tests(CODE, TESTS, use_cache=False)
+    cache.put(CODE, TESTS, 5, report)
+    assert cache.get(CODE, TESTS, 5).ok
+    assert cache.get(CODE, TESTS, 1) is None
+
+    for number in range(5):
+        cache.put(f"{CODE}# {number}\n", TESTS, 5, report)
+    lines = (tmp_path / "results.jsonl").read_text().splitlines()
+    assert len(lines) < 6
+    reloaded = TestResultCache(tmp_path / "results.jsonl", keep=3)
+    assert len((tmp_path / "results.jsonl").read_text().splitlines()) == 3
+    assert reloaded.get(f"{CODE}# 4\n", TESTS, 5) is not None
+    assert reloaded.get(CODE, TESTS, 5) is None
+
+
+def test_tests_that_cannot_load_are_a_suite_error_not_a_code_failure():
+    report = run_tests(CODE, "import nonexistent_module\n\n" + TESTS, use_cache=False)
+    assert report.results == [] and "nonexistent_module" in report.error
+
+    for code in ("def double(x):\n    return 2 *\n", "def triple(x):\n    return 3 * x\n"):
+        report = run_tests(code, TESTS, use_cache=False)
+        assert not report.error and report.counts["error"] == 1
@@ -0,0 +1,39 @@
+import json
+
+from phoenix import tracing
+
+
+def test_a_kickoff_is_traced_as_nested_spans(tmp_path):
+    from phoenix.crew import Phoenix
+
+    handle = tracing.start("stub-run")
+    try:
+        Phoenix().kickoff({"context": "print('hello'"})
+    finally:
+        path = tracing.finish(handle, trace_dir=tmp_path)
+
+    spans = [event for event in json.loads(path.read_text())["traceEvents"] if event["ph"] == "X"]
+    by_category = {}
+    for event in spans:
+        by_category.setdefault(event["cat"], []).append(event)
+    assert {"cascade", "crew", "task", "agent", "llm"} <= set(by_category)
+    assert not any(event["args"].get("unfinished") for event in spans)
+
+    def inside(inner, outer):
+        return outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+
+    crew = by_category["crew"][0]
+    task = next(event for event in by_category["task"] if inside(event, crew))
+    agent = next(event for event in by_category["agent"] if inside(event, task))
+    assert any(inside(event, agent) for event in by_category["llm"])
+
+
+def test_span_is_a_no_op_without_a_trace():
+    assert tracing.current_trace() is None
+    with tracing.span("untraced", "sandbox") as first, tracing.span("untraced") as second:
+        pass
+    assert first is second
+    tracing.begin("untraced")
+    tracing.end()
+    tracing.step()
+    assert tracing.finish(None) is None
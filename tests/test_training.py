@@ -0,0 +1,86 @@
+import json
+
+from crewai.utilities.training_handler import CrewTrainingHandler
+
+from phoenix.training import (
+    DatasetTrainer, dataset_feedback, example_id, load_dataset, merge_trained_data, read_jsonl, training_feedback,
+)
+
+
+def test_null_expected_behavior_is_treated_as_empty(tmp_path):
+    dataset = tmp_path / "dataset.jsonl"
+    dataset.write_text(json.dumps({"code": "print(1)", "expected_behavior": None}) + "\n", encoding="utf-8")
+
+    [example] = load_dataset(dataset)
+
+    assert example["expected_behavior"] == ""
+    assert example["id"] == example_id({"code": "print(1)"})
+
+
+def test_feedback_falls_back_to_expected_behavior():
+    assert training_feedback({"feedback": "Be brief.", "expected_behavior": "prints 3"}) == "Be brief."
+    assert "prints 3" in training_feedback({"feedback": "", "expected_behavior": "prints 3"})
+    assert training_feedback({"feedback": "", "expected_behavior": ""}) == ""
+
+
+def test_dataset_feedback_replaces_the_human_prompt_temporarily():
+    from crewai.agents.crew_agent_executor import CrewAgentExecutor
+
+    original = CrewAgentExecutor._ask_human_input
+    with dataset_feedback("Use f-strings."):
+        assert CrewAgentExecutor._ask_human_input(None, "final answer") == "Use f-strings."
+    assert CrewAgentExecutor._ask_human_input is original
+
+
+def test_trained_data_of_all_examples_is_kept():
+    merged = merge_trained_data({}, {"Code Fixer": {"suggestions": ["a"], "quality": 6.0, "final_summary": "one"}}, 0)
+    merged = merge_trained_data(merged, {
+        "Code Fixer": {"suggestions": ["a", "b"], "quality": 8.0, "final_summary": "two"},
+        "Code Verifier": {"suggestions": ["c"], "quality": 9.0, "final_summary": "three"},
+    }, 1)
+
+    assert merged["Code Fixer"] == {"suggestions": ["a", "b"], "quality": 7.0, "final_summary": "one\ntwo"}
+    assert merged["Code Verifier"]["suggestions"] == ["c"]
+
+
+FAKE_CREW = '''
+import os
+
+from crewai.agents.crew_agent_executor import CrewAgentExecutor
+from crewai.utilities.training_handler import CrewTrainingHandler
+
+
+class FakeCrew:
+    def train(self, n_iterations, filename, inputs):
+        CrewTrainingHandler("training_data.pkl").save({"cwd": os.getcwd()})  # like crewAI
+        feedback = CrewAgentExecutor._ask_human_input(None, "final answer")
+        CrewTrainingHandler(filename).save({
+            "Code Fixer": {"suggestions": [feedback], "quality": 8.0, "final_summary": feedback},
+        })
+
+
+class FakePhoenix:
+    def crew(self):
+        return FakeCrew()
+'''
+
+
+def test_dataset_examples_train_in_separate_worker_directories(tmp_path, monkeypatch):
+    (tmp_path / "fake_crew.py").write_text(FAKE_CREW, encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    from fake_crew import FakePhoenix
+
+    dataset = [{"code": f"print({n})", "expected_behavior": "", "feedback": f"hint {n}"} for n in range(3)]
+    dataset.append({"code": "print(4)", "expected_behavior": "", "feedback": ""})
+    for example in dataset:
+        example["id"] = example_id(example)
+    trainer = DatasetTrainer(FakePhoenix, dataset, 1, str(tmp_path / "trained.pkl"), workers=3)
+
+    merged = trainer.run()
+
+    assert sorted(merged["Code Fixer"]["suggestions"]) == ["hint 0", "hint 1", "hint 2"]
+    assert CrewTrainingHandler(str(tmp_path / "trained.pkl")).load() == merged
+    assert not (tmp_path / "training_data.pkl").exists()
+    errors = [record["error"] for record in read_jsonl(trainer.progress_path)]
+    assert errors.count(None) == 3 and "no feedback or expected_behavior to train on" in errors
@@ -0,0 +1,28 @@
+from phoenix import autofix as autofix_module
+from phoenix import watch
+from phoenix.watch import FileWatcher
+
+
+def test_fix_runs_from_the_watched_root_once(tmp_path, monkeypatch):
+    (tmp_path / "helper.py").write_text("def greet():\n    return 'hi'\n")
+    main = tmp_path / "main.py"
+    source = "from helper import greet\n\nmessage = greet()\nprint(mesage)\n"
+    main.write_text(source)
+
+    runs = []
+    find_error = autofix_module.find_error
+
+    def counted(code, **kwargs):
+        runs.append(code)
+        return find_error(code, **kwargs)
+
+    monkeypatch.setattr(watch, "find_error", counted)
+    monkeypatch.setattr(autofix_module, "find_error", counted)
+    reports = []
+    watcher = FileWatcher(tmp_path, crew_factory=None, report=reports.append)
+    watcher._fix(main, "main.py", source)
+
+    assert "fixed by rules: misspelled_name" in reports[-1]
+    assert "print(message)" in reports[-1]
+    # The original is run once; autofix only re-runs the rewritten code
+    assert runs.count(source) == 1